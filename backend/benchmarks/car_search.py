@@ -0,0 +1,91 @@
+"""Compare the indexed car search against the old leading-wildcard ILIKE scan.
+
+Runs against DATABASE_URL. Run from backend/:
+
+    python -m benchmarks.car_search --seed 200000 --repeat 20
+
+--seed inserts synthetic cars first; only use it on a scratch database.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from sqlalchemy import func, insert, select
+from crud.car_search import index_cars_by_vin
+from crud.cars import build_car_filters
+from database import async_session, engine
+from migrations import run_migrations
+from models.cars import Car, CarStatus, FuelType, TransmissionType
+
+MAKES = ["TOYOTA", "HONDA", "FORD", "NISSAN", "MITSUBISHI", "HYUNDAI", "KIA", "BMW", "MAZDA", "SUZUKI"]
+MODELS = ["VIOS", "CIVIC", "RANGER", "NAVARA", "MONTERO", "ACCENT", "SEDONA", "X5", "CX5", "JIMNY"]
+COLORS = ["WHITE", "BLACK", "SILVER", "RED", "BLUE", "GRAY"]
+QUERIES = ["toyota", "civic", "ford ranger", "black", "silver mazda", "jim", "VIN00001"]
+
+
+async def seed(rows: int, batch_size: int = 5000):
+  async with async_session() as db:
+    for start in range(0, rows, batch_size):
+      batch = [
+        {
+          "vin": f"VIN{start + i:08d}",
+          "year": random.randint(2000, 2025),
+          "make": random.choice(MAKES),
+          "model": random.choice(MODELS),
+          "color": random.choice(COLORS),
+          "mileage": random.randint(0, 200000),
+          "price": random.randint(300000, 5000000),
+          "transmission_type": random.choice(list(TransmissionType)),
+          "fuel_type": random.choice(list(FuelType)),
+          "status": random.choice(list(CarStatus)),
+          "created_by": "benchmark",
+          "updated_by": "benchmark",
+        }
+        for i in range(min(batch_size, rows - start))
+      ]
+      await db.execute(insert(Car), batch)
+      await index_cars_by_vin(db, [car["vin"] for car in batch])
+    await db.commit()
+
+
+async def time_search(search: str, dialect: str | None, repeat: int, page_size: int) -> tuple[float, int]:
+  timings = []
+  matched = 0
+  async with async_session() as db:
+    for _ in range(repeat):
+      query = select(Car.id).where(*build_car_filters(search=search, dialect=dialect)).limit(page_size)
+      started = time.perf_counter()
+      result = await db.execute(query)
+      matched = len(result.all())
+      timings.append((time.perf_counter() - started) * 1000)
+  return statistics.median(timings), matched
+
+
+async def main(args):
+  engine.echo = False
+  # Tables and the search index, as a deploy would build them
+  async with engine.connect() as conn:
+    await conn.run_sync(run_migrations)
+    await conn.commit()
+  if args.seed:
+    await seed(args.seed)
+
+  async with async_session() as db:
+    total = (await db.execute(select(func.count()).select_from(Car))).scalar_one()
+  dialect = engine.dialect.name
+  print(f"{total} cars on {dialect}, median of {args.repeat} runs, page size {args.page_size}")
+  print(f"{'query':<16}{'ilike ms':>12}{'indexed ms':>12}{'speed-up':>10}")
+  for search in QUERIES:
+    ilike_ms, _ = await time_search(search, None, args.repeat, args.page_size)
+    indexed_ms, _ = await time_search(search, dialect, args.repeat, args.page_size)
+    print(f"{search:<16}{ilike_ms:>12.2f}{indexed_ms:>12.2f}{ilike_ms / indexed_ms:>9.1f}x")
+  await engine.dispose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--seed", type=int, default=0, help="synthetic cars to insert first")
+  parser.add_argument("--repeat", type=int, default=10)
+  parser.add_argument("--page-size", type=int, default=10)
+  asyncio.run(main(parser.parse_args()))
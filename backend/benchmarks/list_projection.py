@@ -0,0 +1,77 @@
+"""Compare full-entity list pages against `fields=` sparse fieldsets.
+
+Times read_cars + serialize_page for one page both ways: ORM entities validated
+through CarInDB, and a Core select of just the requested columns dumped as
+plain mappings. Peak Python memory is measured with tracemalloc. Runs against
+DATABASE_URL. Run from backend/:
+
+    python -m benchmarks.list_projection --seed 5000 --page-size 1000 --fields vin,make,model,price,status
+
+--seed inserts synthetic cars first; only use it on a scratch database.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from sqlalchemy import func, select
+from benchmarks.car_search import seed
+from crud.cars import read_cars
+from crud.pagination import parse_fields
+from database import async_session, engine
+from migrations import run_migrations
+from models.cars import Car
+from schemas.cars import CarInDB
+from services.json_response import serialize_page
+
+
+async def build_page(page_size: int, columns) -> bytes:
+  async with async_session() as db:
+    cars = await read_cars(db=db, current_user=None, limit=page_size, columns=columns)
+  return serialize_page({"data": cars, "total": len(cars)}, CarInDB, sparse=columns is not None)
+
+
+async def measure(page_size: int, columns, repeat: int) -> tuple[float, float, int]:
+  """(median ms, peak MiB, payload bytes) for building one page."""
+  payload = await build_page(page_size, columns)  # warm-up: pool, statement cache
+  timings = []
+  for _ in range(repeat):
+    started = time.perf_counter()
+    await build_page(page_size, columns)
+    timings.append((time.perf_counter() - started) * 1000)
+
+  tracemalloc.start()
+  await build_page(page_size, columns)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return statistics.median(timings), peak / (1024 * 1024), len(payload)
+
+
+async def main(args):
+  engine.echo = False
+  async with engine.connect() as conn:
+    await conn.run_sync(run_migrations)
+    await conn.commit()
+  if args.seed:
+    await seed(args.seed)
+  async with async_session() as db:
+    total = (await db.execute(select(func.count()).select_from(Car))).scalar_one()
+
+  columns = parse_fields(args.fields, Car, CarInDB)
+  print(f"{total} cars on {engine.dialect.name}, page size {args.page_size}, median of {args.repeat} runs")
+  print(f"{'page':<24}{'ms':>10}{'peak MiB':>10}{'bytes':>10}")
+  full_ms, full_peak, full_bytes = await measure(args.page_size, None, args.repeat)
+  print(f"{'entities + CarInDB':<24}{full_ms:>10.2f}{full_peak:>10.2f}{full_bytes:>10}")
+  sparse_ms, sparse_peak, sparse_bytes = await measure(args.page_size, columns, args.repeat)
+  print(f"{'fields=' + str(len(columns)) + ' columns':<24}{sparse_ms:>10.2f}{sparse_peak:>10.2f}{sparse_bytes:>10}")
+  print(f"speed-up {full_ms / sparse_ms:.1f}x, peak memory {full_peak / sparse_peak:.1f}x lower")
+  await engine.dispose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--seed", type=int, default=0, help="synthetic cars to insert first")
+  parser.add_argument("--repeat", type=int, default=20)
+  parser.add_argument("--page-size", type=int, default=1000)
+  parser.add_argument("--fields", default="vin,make,model,price,status")
+  asyncio.run(main(parser.parse_args()))
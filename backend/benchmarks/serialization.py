@@ -0,0 +1,100 @@
+"""Time list-page serialization per 1000 cars: response_model, pydantic and orjson.
+
+No database needed: pages are built from in-memory Car entities, as read_cars
+returns them. Compared paths:
+
+  response_model  what FastAPI did for a returned page: validate into
+                  PaginatedResponse[CarInDB], jsonable_encoder, stdlib json
+  pydantic        serialize_page with JSON_SERIALIZER=pydantic (the default)
+  orjson          serialize_page with JSON_SERIALIZER=orjson
+
+Run from backend/:
+
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+"""
+import argparse
+import datetime
+import json
+import random
+import statistics
+import time
+from fastapi.encoders import jsonable_encoder
+from models.cars import Car, CarStatus, FuelType, TransmissionType
+from schemas.cars import CarInDB
+from schemas.paginated_response import PaginatedResponse
+from services import json_response
+
+MAKES = ["TOYOTA", "HONDA", "FORD", "NISSAN", "MITSUBISHI"]
+MODELS = ["VIOS", "CIVIC", "RANGER", "NAVARA", "MONTERO"]
+COLORS = ["WHITE", "BLACK", "SILVER", "RED"]
+
+
+def make_cars(rows: int) -> list[Car]:
+  now = datetime.datetime.now().replace(microsecond=0)
+  return [
+    Car(
+      id=i + 1,
+      vin=f"VIN{i:08d}",
+      year=random.randint(2000, 2025),
+      make=random.choice(MAKES),
+      model=random.choice(MODELS),
+      color=random.choice(COLORS),
+      mileage=random.randint(0, 200000),
+      price=random.randint(300000, 5000000),
+      transmission_type=random.choice(list(TransmissionType)),
+      fuel_type=random.choice(list(FuelType)),
+      status=random.choice(list(CarStatus)),
+      created_at=now,
+      updated_at=now,
+      created_by="benchmark",
+      updated_by="benchmark",
+    )
+    for i in range(rows)
+  ]
+
+
+def response_model_path(page_data: dict) -> bytes:
+  page = PaginatedResponse[CarInDB].model_validate(page_data, from_attributes=True)
+  return json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def serializer_path(serializer: str):
+  def serialize(page_data: dict) -> bytes:
+    json_response.JSON_SERIALIZER = serializer
+    return json_response.serialize_page(page_data, CarInDB)
+  return serialize
+
+
+def time_path(serialize, page_data: dict, repeat: int) -> float:
+  serialize(page_data)  # warm-up: schema and serializer construction
+  timings = []
+  for _ in range(repeat):
+    started = time.perf_counter()
+    serialize(page_data)
+    timings.append((time.perf_counter() - started) * 1000)
+  return statistics.median(timings)
+
+
+def main(args):
+  page_data = {"data": make_cars(args.rows), "total": args.rows, "total_is_estimate": False}
+  paths = [
+    ("response_model", response_model_path),
+    ("pydantic", serializer_path("pydantic")),
+    ("orjson", serializer_path("orjson")),
+  ]
+  outputs = {name: json.loads(serialize(page_data)) for name, serialize in paths}
+  same = all(output == outputs["response_model"] for output in outputs.values())
+  print(f"{args.rows} cars per page, median of {args.repeat} runs; outputs identical: {same}")
+  print(f"{'path':<16}{'ms/page':>10}{'ms/1000 cars':>14}{'speed-up':>10}")
+  baseline = None
+  for name, serialize in paths:
+    ms = time_path(serialize, page_data, args.repeat)
+    baseline = baseline or ms
+    print(f"{name:<16}{ms:>10.2f}{ms * 1000 / args.rows:>14.2f}{baseline / ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--rows", type=int, default=1000)
+  parser.add_argument("--repeat", type=int, default=50)
+  main(parser.parse_args())
@@ -0,0 +1,116 @@
+"""Round trips and latency of the car write paths: read-modify-write vs single statement.
+
+Runs against DATABASE_URL on scratch rows it creates and removes. Run from backend/:
+
+    python -m benchmarks.write_paths --iterations 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy import delete, event, insert, select, update
+from database import async_session, engine
+from models.cars import Car, CarStatus, FuelType, TransmissionType
+
+_statements = 0
+
+
+def _count_statement(*args):
+  global _statements
+  _statements += 1
+
+
+def _scratch_car(i: int) -> dict:
+  return {
+    "vin": f"BENCH{i:010d}",
+    "year": 2020,
+    "make": "BENCH",
+    "model": "WRITE",
+    "color": "WHITE",
+    "mileage": 0,
+    "price": 1000000,
+    "transmission_type": TransmissionType.AUTOMATIC,
+    "fuel_type": FuelType.PETROL,
+    "status": CarStatus.AVAILABLE,
+    "created_by": "benchmark",
+    "updated_by": "benchmark",
+  }
+
+
+async def legacy_update(db, car_id: int, price: int):
+  car = (await db.execute(select(Car).where(Car.id == car_id))).scalars().first()
+  car.price = price
+  await db.commit()
+
+
+async def single_statement_update(db, car_id: int, price: int):
+  query = update(Car).where(Car.id == car_id).values(price=price)
+  if db.bind.dialect.update_returning:
+    (await db.execute(query.returning(Car.id, Car.vin))).first()
+  else:
+    await db.execute(query)
+  await db.commit()
+
+
+async def legacy_delete(db, car_id: int):
+  car = (await db.execute(select(Car).where(Car.id == car_id))).scalars().first()
+  if car:
+    await db.execute(delete(Car).where(Car.id == car_id))
+  await db.commit()
+
+
+async def single_statement_delete(db, car_id: int):
+  if db.bind.dialect.delete_returning:
+    (await db.execute(delete(Car).where(Car.id == car_id).returning(Car.vin))).first()
+  else:
+    await db.execute(delete(Car).where(Car.id == car_id))
+  await db.commit()
+
+
+async def measure(name: str, operation, car_ids: list[int], **kwargs):
+  global _statements
+  timings = []
+  _statements = 0
+  async with async_session() as db:
+    for i, car_id in enumerate(car_ids):
+      started = time.perf_counter()
+      await operation(db, car_id, **{k: v(i) for k, v in kwargs.items()})
+      timings.append((time.perf_counter() - started) * 1000)
+  timings.sort()
+  p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+  print(
+    f"{name:<28}{_statements / len(car_ids):>10.1f}"
+    f"{statistics.median(timings):>10.3f}{p99:>10.3f}"
+  )
+
+
+async def create_scratch_cars(count: int, offset: int) -> list[int]:
+  async with engine.begin() as conn:
+    await conn.execute(insert(Car), [_scratch_car(offset + i) for i in range(count)])
+    result = await conn.execute(select(Car.id).where(Car.make == "BENCH").order_by(Car.id))
+    return list(result.scalars().all())[-count:]
+
+
+async def main(args):
+  engine.echo = False
+  event.listen(engine.sync_engine, "before_cursor_execute", _count_statement)
+  print(f"{engine.dialect.name}, {args.iterations} operations each")
+  print(f"{'path':<28}{'stmts/op':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+  car_ids = await create_scratch_cars(args.iterations, 0)
+  await measure("update: select + flush", legacy_update, car_ids, price=lambda i: 1000000 + i)
+  await measure("update: single statement", single_statement_update, car_ids, price=lambda i: 2000000 + i)
+  await measure("delete: select + delete", legacy_delete, car_ids)
+
+  car_ids = await create_scratch_cars(args.iterations, args.iterations)
+  await measure("delete: single statement", single_statement_delete, car_ids)
+
+  async with engine.begin() as conn:
+    await conn.execute(delete(Car).where(Car.make == "BENCH"))
+  await engine.dispose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--iterations", type=int, default=200)
+  asyncio.run(main(parser.parse_args()))
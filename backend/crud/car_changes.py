@@ -0,0 +1,76 @@
+import datetime
+import os
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.car_changes import Car_Change
+from models.cars import Car
+from schemas.cars import CarInDB
+
+load_dotenv()
+
+CAR_CHANGES_MAX_LIMIT = int(os.getenv("CAR_CHANGES_MAX_LIMIT", "1000"))
+# Longest a car write transaction may stay open between recording its change and committing
+CAR_CHANGES_SETTLE_SECONDS = float(os.getenv("CAR_CHANGES_SETTLE_SECONDS", "30"))
+
+
+async def record_car_changes(db: AsyncSession, op: str, cars) -> None:
+  """One car_changes row per car (anything with .id and .vin), in the caller's transaction."""
+  rows = [{"car_id": car.id, "vin": car.vin, "op": op} for car in cars]
+  if rows:
+    await db.execute(insert(Car_Change), rows)
+
+
+async def record_car_upserts_by_vin(db: AsyncSession, vins: list[str]) -> None:
+  """Change rows for freshly inserted cars whose ids the caller does not have."""
+  if vins:
+    await db.execute(
+      insert(Car_Change).from_select(
+        ["car_id", "vin", "op"],
+        select(Car.id, Car.vin, literal("upsert")).where(Car.vin.in_(vins)),
+      )
+    )
+
+
+async def read_car_changes(db: AsyncSession, since: int, limit: int) -> dict:
+  """Cars changed after change token `since`: current rows for upserts, tombstones for deletes.
+
+  Change ids are allocated when a write runs but become visible when it
+  commits, so a lower id can appear after a higher one was already read. The
+  returned token therefore only moves past a gap in the ids once the rows after
+  it are CAR_CHANGES_SETTLE_SECONDS old; rows beyond the token are still
+  returned and simply come back on the next call. Applying a response is
+  idempotent, so repeats are harmless.
+  """
+  result = await db.execute(
+    select(Car_Change.id, Car_Change.car_id, Car_Change.vin, Car_Change.changed_at, func.now().label("now"))
+    .where(Car_Change.id > since)
+    .order_by(Car_Change.id)
+    .limit(limit + 1)
+  )
+  rows = result.all()
+  more = len(rows) > limit
+  rows = rows[:limit]
+
+  token = since
+  if rows:
+    settled_before = rows[0].now - datetime.timedelta(seconds=CAR_CHANGES_SETTLE_SECONDS)
+    for row in rows:
+      if row.id != token + 1 and row.changed_at > settled_before:
+        break
+      token = row.id
+
+  # Several changes to one car collapse into its current state
+  latest = {row.car_id: row.vin for row in rows}
+  cars = {}
+  if latest:
+    result = await db.execute(select(Car).where(Car.id.in_(list(latest))))
+    cars = {car.id: car for car in result.scalars().all()}
+
+  return {
+    "changed": [CarInDB.model_validate(cars[id]) for id in latest if id in cars],
+    "deleted": [{"id": id, "vin": vin} for id, vin in latest.items() if id not in cars],
+    "next_token": token,
+    # Stalled on an unsettled gap: caught up for now, poll again later
+    "has_more": more and bool(rows) and token == rows[-1].id,
+  }
@@ -0,0 +1,222 @@
+import codecs
+import csv
+import json
+import os
+import time
+from typing import AsyncIterator, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud.car_changes import record_car_upserts_by_vin
+from crud.car_search import index_cars_by_vin
+from crud.cars import car_entity_cache, invalidate_car_read_caches
+from models.cars import Car
+from models.users import User
+from schemas.cars import CarCreate
+from services.audit_log import record_audit_log
+from services.event_bus import event_bus
+
+load_dotenv()
+
+CAR_IMPORT_BATCH_SIZE = int(os.getenv("CAR_IMPORT_BATCH_SIZE", "1000"))
+# Per-row errors beyond this are counted but not echoed back
+CAR_IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("CAR_IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+# (line number, parsed row or None, parse error or None)
+ParsedRow = tuple[int, Optional[dict], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+  """Decode a byte stream into lines without buffering the whole body."""
+  decoder = codecs.getincrementaldecoder("utf-8-sig")()
+  pending = ""
+  async for chunk in chunks:
+    pending += decoder.decode(chunk)
+    lines = pending.split("\n")
+    pending = lines.pop()
+    for line in lines:
+      yield line.rstrip("\r")
+  pending += decoder.decode(b"", final=True)
+  if pending:
+    yield pending.rstrip("\r")
+
+
+async def parse_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+  """CSV with a header row. Fields may be quoted but must not contain newlines."""
+  header = None
+  line_number = 0
+  async for line in lines:
+    line_number += 1
+    if not line.strip():
+      continue
+    values = next(csv.reader([line]))
+    if header is None:
+      header = [name.strip() for name in values]
+      continue
+    if len(values) != len(header):
+      yield line_number, None, f"Expected {len(header)} columns, got {len(values)}"
+      continue
+    yield line_number, dict(zip(header, values)), None
+
+
+async def parse_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+  line_number = 0
+  async for line in lines:
+    line_number += 1
+    if not line.strip():
+      continue
+    try:
+      row = json.loads(line)
+    except ValueError as e:
+      yield line_number, None, f"Invalid JSON. {str(e)}"
+      continue
+    if not isinstance(row, dict):
+      yield line_number, None, "Each line must be a JSON object"
+      continue
+    yield line_number, row, None
+
+
+def _validation_messages(error: ValidationError) -> str:
+  return "; ".join(
+    f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+  )
+
+
+async def import_cars(
+  db: AsyncSession,
+  rows: AsyncIterator[ParsedRow],
+  current_user: User,
+  batch_size: int = CAR_IMPORT_BATCH_SIZE,
+) -> dict:
+  """Validate rows as they stream in and insert them in multi-row batches.
+
+  Duplicate VINs are caught with one IN query per batch plus a set of the VINs
+  already seen in this import. The unique index on cars.vin catches a VIN that
+  another writer inserts between that query and the INSERT; the batch is then
+  retried row by row and only the conflicting rows are rejected. Each batch
+  commits on its own; one system log summarizes the whole import.
+  """
+  started = time.perf_counter()
+  seen_vins: set[str] = set()
+  batch: list[tuple[int, dict]] = []
+  errors: list[dict] = []
+  summary = {"received": 0, "inserted": 0, "rejected": 0}
+
+  def reject(line: int, vin: Optional[str], message: str):
+    summary["rejected"] += 1
+    if len(errors) < CAR_IMPORT_MAX_REPORTED_ERRORS:
+      errors.append({"line": line, "vin": vin, "error": message})
+
+  async def flush():
+    vins = [values["vin"] for _, values in batch]
+    result = await db.execute(select(Car.vin).where(Car.vin.in_(vins)))
+    existing = set(result.scalars().all())
+
+    fresh = []
+    for line, values in batch:
+      if values["vin"] in existing:
+        reject(line, values["vin"], "VIN already exists")
+      else:
+        fresh.append((line, values))
+
+    if fresh:
+      try:
+        # A single executemany / multi-row INSERT for the whole batch
+        async with db.begin_nested():
+          await db.execute(insert(Car), [values for _, values in fresh])
+      except IntegrityError:
+        # Lost a race for some VIN since the check above; find which, one savepoint per row
+        inserted = []
+        for line, values in fresh:
+          try:
+            async with db.begin_nested():
+              await db.execute(insert(Car), [values])
+            inserted.append((line, values))
+          except IntegrityError:
+            reject(line, values["vin"], "VIN already exists")
+        fresh = inserted
+    fresh = [values for _, values in fresh]
+
+    if fresh:
+      await index_cars_by_vin(db, [values["vin"] for values in fresh])
+      await record_car_upserts_by_vin(db, [values["vin"] for values in fresh])
+    await db.commit()
+    summary["inserted"] += len(fresh)
+    batch.clear()
+
+  failure = None
+  try:
+    async for line, row, parse_error in rows:
+      summary["received"] += 1
+      if parse_error is not None:
+        reject(line, None, parse_error)
+        continue
+
+      try:
+        car_create = CarCreate.model_validate(row)
+      except ValidationError as e:
+        reject(line, row.get("vin"), _validation_messages(e))
+        continue
+
+      if car_create.vin in seen_vins:
+        reject(line, car_create.vin, "Duplicate VIN in this import")
+        continue
+      seen_vins.add(car_create.vin)
+
+      batch.append((line, {
+        "vin": car_create.vin,
+        "make": car_create.make.upper(),
+        "model": car_create.model.upper(),
+        "year": car_create.year,
+        "color": car_create.color.upper(),
+        "mileage": car_create.mileage,
+        "price": car_create.price,
+        "transmission_type": car_create.transmission_type.value,
+        "fuel_type": car_create.fuel_type.value,
+        "status": car_create.status.value,
+        "created_by": current_user.email,
+        "updated_by": current_user.email,
+      }))
+      if len(batch) >= batch_size:
+        await flush()
+
+    if batch:
+      await flush()
+  except Exception as e:
+    await db.rollback()
+    failure = e
+
+  elapsed = time.perf_counter() - started
+  if summary["inserted"]:
+    invalidate_car_read_caches()
+    # New ids are not known here, and any of them may be cached as a 404
+    await car_entity_cache.clear()
+    # New ids are not tracked either; listeners reload the list
+    event_bus.publish("cars", "imported", {"count": summary["inserted"]})
+
+  outcome = "failed after importing" if failure else "imported"
+  record_audit_log(
+    db,
+    f"User {current_user.id} {outcome} {summary['inserted']} cars "
+    f"({summary['rejected']} rejected of {summary['received']} rows)",
+    current_user.id,
+    verb="import",
+    entity_type="car",
+  )
+  await db.commit()
+
+  if failure is not None:
+    raise HTTPException(
+      status_code=500,
+      detail=f"Import stopped after {summary['inserted']} cars were inserted. {str(failure)}"
+    )
+
+  return {
+    **summary,
+    "errors": errors,
+    "elapsed_seconds": round(elapsed, 3),
+    "rows_per_second": round(summary["received"] / elapsed, 1) if elapsed else 0.0,
+  }
@@ -0,0 +1,163 @@
+import os
+import re
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import and_, bindparam, case, func, literal, literal_column, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.cars import Car
+
+load_dotenv()
+
+# "fulltext" uses the backend's text index; "ilike" keeps the old leading-wildcard scan
+CAR_SEARCH_BACKEND = os.getenv("CAR_SEARCH_BACKEND", "fulltext").lower()
+# innodb_ft_min_token_size: shorter words are not in a MySQL FULLTEXT index
+MYSQL_FT_MIN_TOKEN_SIZE = int(os.getenv("MYSQL_FT_MIN_TOKEN_SIZE", "3"))
+
+# Built by migration 0009_car_search_index: FULLTEXT ix_cars_fulltext on MySQL,
+# GIN ix_cars_search_trgm on PostgreSQL, this shadow table on SQLite
+FTS_TABLE = "cars_fts"
+
+# Concatenation written exactly like the PostgreSQL index expression so the planner can match it
+_search_document = literal_column("(cars.make || ' ' || cars.model || ' ' || cars.color)")
+
+
+def tokenize(search: str) -> list[str]:
+  """Split a search box value into upper-cased word tokens (car columns are stored upper-case)."""
+  return [token for token in re.split(r"[^0-9A-Za-z]+", search.upper()) if token]
+
+
+def _escape_like(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _vin_prefix_condition(search: str):
+  # Served by the B-tree on vin; LIKE 'x%' is a range scan, unlike '%x%'
+  return Car.vin.like(f"{_escape_like(search.strip())}%", escape="\\")
+
+
+def _ilike_condition(search: str):
+  return or_(
+    Car.make.ilike(f"%{search}%"),
+    Car.model.ilike(f"%{search}%"),
+    Car.color.ilike(f"%{search}%"),
+  )
+
+
+def _token_condition(dialect: str, tokens: list[str]):
+  """Every token must prefix-match a word in make, model or color."""
+  if dialect in ("mysql", "mariadb"):
+    indexed = [token for token in tokens if len(token) >= MYSQL_FT_MIN_TOKEN_SIZE]
+    short = [token for token in tokens if len(token) < MYSQL_FT_MIN_TOKEN_SIZE]
+    conditions = []
+    if indexed:
+      against = " ".join(f"+{token}*" for token in indexed)
+      conditions.append(match(Car.make, Car.model, Car.color, against=against).in_boolean_mode())
+    for token in short:
+      pattern = f"{_escape_like(token)}%"
+      conditions.append(or_(
+        Car.make.like(pattern, escape="\\"),
+        Car.model.like(pattern, escape="\\"),
+        Car.color.like(pattern, escape="\\"),
+      ))
+    return and_(*conditions)
+
+  if dialect == "postgresql":
+    # \m anchors each token at the start of a word, like the other backends; pg_trgm's
+    # GIN index serves regular expressions as well as LIKE. Tokens are alphanumeric only.
+    return and_(*[_search_document.op("~*")(rf"\m{token}") for token in tokens])
+
+  if dialect == "sqlite":
+    fts_query = " ".join(f'"{token}"*' for token in tokens)
+    matches = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query").bindparams(
+      bindparam("fts_query", fts_query)
+    ).columns(rowid=Car.id.type)
+    return Car.id.in_(matches)
+
+  return and_(*[_ilike_condition(token) for token in tokens])
+
+
+def car_search_condition(search: Optional[str], dialect: Optional[str] = None):
+  """WHERE clause for the car search box, or None when the search is empty."""
+  if not search or not search.strip():
+    return None
+  if CAR_SEARCH_BACKEND == "ilike" or dialect is None:
+    return _ilike_condition(search)
+
+  tokens = tokenize(search)
+  if not tokens:
+    return _vin_prefix_condition(search)
+  return or_(_token_condition(dialect, tokens), _vin_prefix_condition(search))
+
+
+def car_search_rank(search: Optional[str], dialect: Optional[str] = None) -> list:
+  """ORDER BY terms that put the best matches first: VIN prefix hits, then relevance."""
+  if not search or not search.strip() or CAR_SEARCH_BACKEND == "ilike" or dialect is None:
+    return []
+
+  ranking = [case((_vin_prefix_condition(search), 1), else_=0).desc()]
+  tokens = tokenize(search)
+  if not tokens:
+    return ranking
+
+  if dialect in ("mysql", "mariadb"):
+    against = " ".join(f"{token}*" for token in tokens)
+    ranking.append(match(Car.make, Car.model, Car.color, against=against).in_boolean_mode().desc())
+  elif dialect == "postgresql":
+    ranking.append(func.similarity(_search_document, literal(" ".join(tokens))).desc())
+  elif dialect == "sqlite":
+    fts_query = " ".join(f'"{token}"*' for token in tokens)
+    # bm25() is lower-is-better
+    score = text(
+      f"(SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+      f"WHERE {FTS_TABLE} MATCH :fts_rank_query AND {FTS_TABLE}.rowid = cars.id)"
+    ).bindparams(bindparam("fts_rank_query", fts_query))
+    ranking.append(score)
+  return ranking
+
+
+async def index_car(db: AsyncSession, car: Car):
+  """Keep the SQLite shadow table in step with a created or updated car.
+
+  `car` may also be a result row carrying id, make, model and color.
+
+  MySQL and PostgreSQL maintain their indexes themselves, so this is a no-op there.
+  Must run inside the caller's transaction.
+  """
+  if db.bind.dialect.name != "sqlite":
+    return
+  if car.id is None:
+    await db.flush()
+  await db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": car.id})
+  await db.execute(
+    text(f"INSERT INTO {FTS_TABLE} (rowid, make, model, color) VALUES (:id, :make, :model, :color)"),
+    {"id": car.id, "make": car.make, "model": car.model, "color": car.color},
+  )
+
+
+async def unindex_car(db: AsyncSession, car_id: int):
+  if db.bind.dialect.name != "sqlite":
+    return
+  await db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": car_id})
+
+
+async def unindex_cars(db: AsyncSession, car_ids: list[int]):
+  if db.bind.dialect.name != "sqlite" or not car_ids:
+    return
+  await db.execute(
+    text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+    {"ids": car_ids},
+  )
+
+
+async def index_cars_by_vin(db: AsyncSession, vins: list[str]):
+  """Bulk counterpart of index_car for freshly inserted cars (VINs new to the table)."""
+  if db.bind.dialect.name != "sqlite" or not vins:
+    return
+  await db.execute(
+    text(
+      f"INSERT INTO {FTS_TABLE} (rowid, make, model, color) "
+      f"SELECT id, make, model, color FROM cars WHERE vin IN :vins"
+    ).bindparams(bindparam("vins", expanding=True)),
+    {"vins": vins},
+  )
@@ -1,13 +1,58 @@
-from typing import Optional
+import datetime
+import os
+import time
+from collections import Counter
+from typing import Literal, Optional
+from dotenv import load_dotenv
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import  delete, or_, select
+from sqlalchemy import  Integer, and_, cast, delete, func, or_, select, update
+from crud.car_changes import record_car_changes
+from crud.car_search import car_search_condition, car_search_rank, index_car, unindex_car, unindex_cars
+from crud.entity_cache import EntityCache
+from crud.pagination import count_total, decode_cursor, encode_cursor, invalidate_counts
 from models.cars import Car, CarStatus, FuelType, TransmissionType
-from models.system_logs import System_Log
 from models.users import User
-from schemas.cars import CarCreate, CarUpdate
+from schemas.cars import CarBulkSelection, CarBulkUpdate, CarCreate, CarInDB, CarUpdate
 from sqlalchemy.ext.asyncio import AsyncSession
+from services.audit_log import record_audit_log
+from services.etags import bump_generation, table_generation
+from services.event_bus import event_bus
+from services.single_flight import SingleFlight
+from services.ttl_cache import MISSING, TTLCache
 
+load_dotenv()
+
+FACET_CACHE_TTL_SECONDS = float(os.getenv("FACET_CACHE_TTL_SECONDS", "30"))
+FACET_CACHE_MAX_SIZE = int(os.getenv("FACET_CACHE_MAX_SIZE", "512"))
+# Rows touched per UPDATE/DELETE statement (and per commit) in the bulk endpoints
+CAR_BULK_CHUNK_SIZE = int(os.getenv("CAR_BULK_CHUNK_SIZE", "500"))
+CAR_CACHE_TTL_SECONDS = float(os.getenv("CAR_CACHE_TTL_SECONDS", "30"))
+
+# Normalized filter set -> facet counts; cleared by every car write below
+car_facet_cache = TTLCache(max_size=FACET_CACHE_MAX_SIZE, ttl=FACET_CACHE_TTL_SECONDS)
+# Car id -> serialized car; every write below invalidates exactly the ids it touched
+car_entity_cache = EntityCache(Car.__tablename__, ttl=CAR_CACHE_TTL_SECONDS)
+car_facet_flight = SingleFlight("car_facets")
+
+
+def invalidate_car_read_caches():
+  invalidate_counts(Car.__tablename__)
+  car_facet_cache.clear()
+  bump_generation(Car.__tablename__)
+
+
+async def read_car_list_state(db: AsyncSession) -> tuple:
+  """Change marker for every car list, shared by all workers.
+
+  Built only from committed rows, so it moves when a write commits: every
+  update bumps a version, so the version sum moves with updates, the count
+  with deletes and the highest id with inserts. (The newest change token does
+  not: a write holding a lower id can commit after a higher one was read.)
+  One aggregate over cars per uncached list request.
+  """
+  result = await db.execute(select(func.count(), func.max(Car.id), func.sum(Car.version)))
+  return tuple(result.one())
 
 
 async def create_car(
@@ -31,17 +76,21 @@ async def create_car(
     updated_by = current_user.email
   )
   
-  system_log = System_Log(
-    action=f"User {current_user.id} created car {car_create.vin}",
-    user_id=current_user.id,
-  )
-  
   try:
-    db.add_all([
-      new_car, 
-      system_log
-    ])
+    db.add(new_car)
+    # Flushed now rather than at commit so the audit row can carry the new id
+    await db.flush()
+    record_audit_log(
+      db, f"User {current_user.id} created car {car_create.vin}", current_user.id,
+      verb="create", entity_type="car", entity_id=new_car.id, entity_key=new_car.vin,
+    )
+    await record_car_changes(db, "upsert", [new_car])
+    await index_car(db, new_car)
     await db.commit()
+    invalidate_car_read_caches()
+    # The id may have been looked up (and cached as a 404) before it existed
+    await car_entity_cache.invalidate(new_car.id)
+    event_bus.publish("cars", "created", {"ids": [new_car.id]})
     return {"detail": f"Car {new_car.vin} {new_car.year} {new_car.make} {new_car.model} created successfully"}
   except IntegrityError as e:
     await db.rollback()  
@@ -51,6 +100,34 @@ async def create_car(
     raise HTTPException(status_code=500, detail=f"An unexpected error occurred. {str(e)}")
 
 
+def build_car_filters(
+  year: Optional[int] = None,
+  transmission_type: Optional[TransmissionType] = None,
+  status: Optional[CarStatus] = None,
+  fuel_type: Optional[FuelType] = None,
+  search: Optional[str] = None,
+  dialect: Optional[str] = None,
+) -> list:
+  """WHERE clauses shared by every query over the car list.
+
+  `dialect` selects the indexed search backend; without it search falls back to ILIKE.
+  """
+  filters = []
+  if(transmission_type):
+    filters.append(Car.transmission_type == transmission_type)
+  if(status):
+    filters.append(Car.status == status)
+  if(fuel_type):
+    filters.append(Car.fuel_type == fuel_type)
+  if(year):
+    filters.append(Car.year == year)
+    
+  search_condition = car_search_condition(search, dialect)
+  if search_condition is not None:
+    filters.append(search_condition)
+  return filters
+
+
 async def read_cars(
   db: AsyncSession,
   current_user: User,
@@ -60,31 +137,190 @@ async def read_cars(
   transmission_type: Optional[TransmissionType] = None,
   status: Optional[CarStatus] = None,
   fuel_type: Optional[FuelType] = None,
-  search: Optional[str] = None
+  search: Optional[str] = None,
+  columns: Optional[list] = None,
 ):
-  
-  query = select(Car)
-  if(transmission_type):
-    query = query.where(Car.transmission_type == transmission_type)
-  if(status):
-    query = query.where(Car.status == status)
-  if(fuel_type):
-    query = query.where(Car.fuel_type == fuel_type)
-  if(year):
-    query = query.where(Car.year == year)
-    
-  if search:
-    query = query.where(
-      or_(
-        Car.make.ilike(f"%{search}%"),
-        Car.model.ilike(f"%{search}%"),
-        Car.color.ilike(f"%{search}%"),
-      )
-    )
-    
-  query = query.offset(offset).limit(limit)
+  """A page of cars; with `columns` (a sparse fieldset) plain rows of just those columns."""
+  query = select(*columns) if columns else select(Car)
+  query = query.where(*build_car_filters(
+    year=year,
+    transmission_type=transmission_type,
+    status=status,
+    fuel_type=fuel_type,
+    search=search,
+    dialect=db.bind.dialect.name,
+  ))
+  # Best matches first when searching; id keeps the order total so pages never overlap
+  query = query.order_by(*car_search_rank(search, db.bind.dialect.name), Car.id).offset(offset).limit(limit)
+  result = await db.execute(query)
+  # Rows skip ORM entity construction and the identity map
+  return result.all() if columns else result.scalars().all()
+
+
+async def count_cars(
+  db: AsyncSession,
+  year: Optional[int] = None,
+  transmission_type: Optional[TransmissionType] = None,
+  status: Optional[CarStatus] = None,
+  fuel_type: Optional[FuelType] = None,
+  search: Optional[str] = None
+) -> tuple[int, bool]:
+  filters = build_car_filters(
+    year=year,
+    transmission_type=transmission_type,
+    status=status,
+    fuel_type=fuel_type,
+    search=search,
+    dialect=db.bind.dialect.name,
+  )
+  cache_key = (
+    year,
+    transmission_type.value if transmission_type else None,
+    status.value if status else None,
+    fuel_type.value if fuel_type else None,
+    search or None,
+  )
+  return await count_total(db, Car, filters, cache_key, allow_estimate=True)
+
+
+async def read_car_facets(
+  db: AsyncSession,
+  year: Optional[int] = None,
+  transmission_type: Optional[TransmissionType] = None,
+  status: Optional[CarStatus] = None,
+  fuel_type: Optional[FuelType] = None,
+  search: Optional[str] = None
+) -> dict:
+  """Per-value counts for every car filter, in one grouped query.
+
+  Each facet is counted under all the *other* applied filters, so a count is what
+  the list would return if that value were picked instead of the current one.
+  """
+  selected = {
+    "year": year,
+    "transmission_type": transmission_type.value if transmission_type else None,
+    "status": status.value if status else None,
+    "fuel_type": fuel_type.value if fuel_type else None,
+  }
+  cache_key = (*selected.values(), search or None)
+  cached = car_facet_cache.get(cache_key)
+  if cached is not MISSING:
+    return cached
+  return await car_facet_flight.do(
+    (cache_key, table_generation(Car.__tablename__)),
+    lambda: _read_car_facets(db, selected, cache_key, search),
+  )
+
+
+async def _read_car_facets(db: AsyncSession, selected: dict, cache_key: tuple, search: Optional[str]) -> dict:
+  # Only the search narrows the scan; the facet filters are applied per facet below
+  query = (
+    select(Car.year, Car.transmission_type, Car.status, Car.fuel_type, func.count().label("count"))
+    .where(*build_car_filters(search=search, dialect=db.bind.dialect.name))
+    .group_by(Car.year, Car.transmission_type, Car.status, Car.fuel_type)
+  )
   result = await db.execute(query)
-  return result.scalars().all()
+  groups = [
+    ({
+      "year": row.year,
+      "transmission_type": row.transmission_type.value,
+      "status": row.status.value,
+      "fuel_type": row.fuel_type.value,
+    }, row.count)
+    for row in result.all()
+  ]
+
+  facets = {}
+  total = 0
+  for facet in selected:
+    counts = Counter()
+    for values, count in groups:
+      if all(selected[other] is None or values[other] == selected[other] for other in selected if other != facet):
+        counts[str(values[facet])] += count
+    facets[facet] = dict(sorted(counts.items()))
+  for values, count in groups:
+    if all(selected[name] is None or values[name] == selected[name] for name in selected):
+      total += count
+
+  response = {"total": total, **facets}
+  car_facet_cache.set(cache_key, response)
+  return response
+
+
+CarSort = Literal["id", "updated_at"]
+
+
+def _car_keyset_condition(sort: CarSort, values: dict):
+  try:
+    last_id = int(values["id"])
+    if sort == "updated_at":
+      last_updated_at = datetime.datetime.fromisoformat(values["updated_at"])
+  except (KeyError, TypeError, ValueError):
+    raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+  if sort == "updated_at":
+    # Most recently updated first, id breaks ties between rows updated in the same second
+    return or_(
+      Car.updated_at < last_updated_at,
+      and_(Car.updated_at == last_updated_at, Car.id < last_id),
+    )
+  return Car.id > last_id
+
+
+async def read_cars_by_cursor(
+  db: AsyncSession,
+  current_user: User,
+  cursor: Optional[str] = None,
+  limit: int = 10,
+  sort: CarSort = "id",
+  year: Optional[int] = None,
+  transmission_type: Optional[TransmissionType] = None,
+  status: Optional[CarStatus] = None,
+  fuel_type: Optional[FuelType] = None,
+  search: Optional[str] = None,
+  columns: Optional[list] = None,
+):
+  """Keyset page of cars: seeks past the cursor instead of scanning `offset` rows.
+
+  Returns the page and the cursor for the next one, or None on the last page.
+  With `columns` the page holds plain rows; the sort column is added to them
+  when missing, since the next cursor is built from it.
+  """
+  if columns and sort == "updated_at" and "updated_at" not in {column.key for column in columns}:
+    columns = [*columns, Car.updated_at]
+  query = select(*columns) if columns else select(Car)
+  query = query.where(*build_car_filters(
+    year=year,
+    transmission_type=transmission_type,
+    status=status,
+    fuel_type=fuel_type,
+    search=search,
+    dialect=db.bind.dialect.name,
+  ))
+
+  if cursor:
+    values = decode_cursor(cursor)
+    if values.get("sort") != sort:
+      raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order.")
+    query = query.where(_car_keyset_condition(sort, values))
+
+  if sort == "updated_at":
+    query = query.order_by(Car.updated_at.desc(), Car.id.desc())
+  else:
+    query = query.order_by(Car.id)
+
+  # One extra row tells us whether there is a next page without a COUNT
+  result = await db.execute(query.limit(limit + 1))
+  cars = result.all() if columns else result.scalars().all()
+  if len(cars) <= limit:
+    return cars, None
+
+  cars = cars[:limit]
+  last = cars[-1]
+  next_values = {"sort": sort, "id": last.id}
+  if sort == "updated_at":
+    next_values["updated_at"] = last.updated_at.isoformat()
+  return cars, encode_cursor(next_values)
 
 
 async def read_car_by_id(
@@ -96,6 +332,46 @@ async def read_car_by_id(
   return result.scalars().first()
 
 
+async def read_cars_by_ids(
+  ids: list[int],
+  db: AsyncSession,
+) -> tuple[list, list[int]]:
+  """Cars for `ids` in one IN query, in the order requested, plus the ids that have no car."""
+  result = await db.execute(select(Car).where(Car.id.in_(ids)))
+  found = {car.id: car for car in result.scalars().all()}
+  return [found[id] for id in ids if id in found], [id for id in ids if id not in found]
+
+
+async def read_car_cached(
+  id: int,
+  db: AsyncSession,
+) -> Optional[dict]:
+  """read_car_by_id through car_entity_cache, as a CarInDB dict plus the row version."""
+  async def load():
+    car = await read_car_by_id(id, db)
+    if car is None:
+      return None
+    return {**CarInDB.model_validate(car).model_dump(mode="json"), "version": car.version}
+
+  return await car_entity_cache.get_or_load(id, load)
+
+
+async def read_car_version(
+  id: int,
+  db: AsyncSession,
+) -> Optional[int]:
+  """Just the row version, for answering If-None-Match without loading the car."""
+  result = await db.execute(select(Car.version).where(Car.id == id))
+  return result.scalar_one_or_none()
+
+
+async def _car_missing_or_modified(id: int, db: AsyncSession) -> HTTPException:
+  """Why a version-guarded write matched no row: the car is gone (404) or was changed (412)."""
+  if await read_car_version(id, db) is None:
+    return HTTPException(status_code=404, detail="Car not found")
+  return HTTPException(status_code=412, detail="Car was modified by another request")
+
+
 async def read_car_by_vin(
   vin: str,
   db: AsyncSession,
@@ -105,39 +381,73 @@ async def read_car_by_vin(
   return result.scalars().first()
 
 
+# Columns reported back by single-car writes (audit text, response detail, search index)
+_CAR_SUMMARY_COLUMNS = (Car.id, Car.vin, Car.year, Car.make, Car.model, Car.color)
+
+
+def car_update_values(car_edit: CarUpdate) -> dict:
+  """Only the fields the client actually sent, normalized like create_car."""
+  # Every car column is NOT NULL, so an explicit null also means "leave unchanged"
+  values = car_edit.model_dump(exclude_unset=True, exclude_none=True)
+  for field in ("make", "model", "color"):
+    if field in values:
+      values[field] = values[field].upper()
+  for field in ("transmission_type", "fuel_type", "status"):
+    if field in values:
+      values[field] = values[field].value
+  return values
+
+
 async def update_car_by_id(
   id: int,
   db: AsyncSession,
   car_edit: CarUpdate,
-  current_user: User
+  current_user: User,
+  expected_versions: Optional[list[int]] = None,
 ):
-            
+  """Partial update in one UPDATE ... RETURNING where the backend supports it.
+
+  MySQL has no UPDATE ... RETURNING, so there the summary columns are read back by primary key.
+  With `expected_versions` (from If-Match) the UPDATE only matches an unchanged row,
+  so a concurrent edit fails with 412 instead of being overwritten.
+  """
+  values = car_update_values(car_edit)
+  values["updated_by"] = current_user.email
+  values["version"] = Car.version + 1
+  conditions = [Car.id == id]
+  if expected_versions is not None:
+    conditions.append(Car.version.in_(expected_versions))
+  query = update(Car).where(*conditions).values(**values).execution_options(synchronize_session=False)
+
   try:
-    car = await read_car_by_id(id=id, db=db)
-
-    car.vin = car_edit.vin
-    car.make = car_edit.make.upper()
-    car.model = car_edit.model.upper()
-    car.year = car_edit.year
-    car.color = car_edit.color.upper()
-    car.mileage = car_edit.mileage
-    car.price = car_edit.price
-    car.transmission_type = car_edit.transmission_type
-    car.fuel_type = car_edit.fuel_type
-    car.status = car_edit.status
-    
-    
-    car.updated_by = current_user.email
-    
+    if db.bind.dialect.update_returning:
+      result = await db.execute(query.returning(*_CAR_SUMMARY_COLUMNS))
+      car = result.first()
+    else:
+      result = await db.execute(query)
+      car = None
+      if result.rowcount:
+        summary = await db.execute(select(*_CAR_SUMMARY_COLUMNS).where(Car.id == id))
+        car = summary.first()
+    if car is None:
+      if expected_versions is not None:
+        raise await _car_missing_or_modified(id, db)
+      raise HTTPException(status_code=404, detail="Car not found")
     
-    system_log = System_Log(
-      action=f"User {current_user.id} updated car {car.vin}",
-      user_id=current_user.id,
+    record_audit_log(
+      db, f"User {current_user.id} updated car {car.vin}", current_user.id,
+      verb="update", entity_type="car", entity_id=car.id, entity_key=car.vin,
     )
-    
-    db.add(system_log)
+    await record_car_changes(db, "upsert", [car])
+    await index_car(db, car)
     await db.commit()
+    invalidate_car_read_caches()
+    await car_entity_cache.invalidate(id)
+    event_bus.publish("cars", "updated", {"ids": [id]})
     return {"detail": f"Car {car.vin} {car.year} {car.make} {car.model} updated successfully"}
+  except HTTPException:
+    await db.rollback()
+    raise
   except IntegrityError as e:
     await db.rollback()  
     raise HTTPException(status_code=400, detail=f"Database integrity error. {str(e)}")
@@ -149,28 +459,193 @@ async def update_car_by_id(
 async def delete_car(
   id: int,
   db: AsyncSession,
-  current_user: User
+  current_user: User,
+  expected_versions: Optional[list[int]] = None,
 ): 
+  conditions = [Car.id == id]
+  if expected_versions is not None:
+    conditions.append(Car.version.in_(expected_versions))
   try:
-    # Fetch the car first to log the info and check existence
-    car = await read_car_by_id(id=id, db=db)
+    if db.bind.dialect.delete_returning:
+      # Existence check, delete and the audit details in a single statement
+      result = await db.execute(delete(Car).where(*conditions).returning(*_CAR_SUMMARY_COLUMNS))
+      car = result.first()
+    else:
+      # Fetch the car first to log the info and check existence
+      result = await db.execute(select(*_CAR_SUMMARY_COLUMNS).where(*conditions))
+      car = result.first()
+      if car:
+        # Still guarded: the version may change between the read and the delete
+        deleted = await db.execute(delete(Car).where(*conditions))
+        if not deleted.rowcount:
+          car = None
     if not car:
+      if expected_versions is not None:
+        raise await _car_missing_or_modified(id, db)
       raise HTTPException(status_code=404, detail="Car not found")
 
-    # Create a log before deleting
-    system_log = System_Log(
-      action=f"User {current_user.id} deleted car {car.vin}",
-      user_id=current_user.id,
+    await unindex_car(db, id)
+    record_audit_log(
+      db, f"User {current_user.id} deleted car {car.vin}", current_user.id,
+      verb="delete", entity_type="car", entity_id=car.id, entity_key=car.vin,
     )
-
-    # Delete the car
-    query = delete(Car).where(Car.id == id)
-    await db.execute(query)
-    db.add(system_log)
+    await record_car_changes(db, "delete", [car])
     await db.commit()
+    invalidate_car_read_caches()
+    await car_entity_cache.invalidate(id)
+    event_bus.publish("cars", "deleted", {"ids": [id]})
     
     return {"detail": f"Car {car.vin} {car.year} {car.make} {car.model} deleted successfully"}
 
+  except HTTPException:
+    await db.rollback()
+    raise
   except Exception as e:
     await db.rollback()
     raise HTTPException(status_code=500, detail=f"An unexpected error occurred. {str(e)}")
+
+
+async def _iter_bulk_chunks(
+  db: AsyncSession,
+  selection: CarBulkSelection,
+  chunk_size: int,
+):
+  """Yield the targeted cars as ([(id, vin), ...], conditions) chunks, walking the id index in order.
+
+  Each chunk's rows are read FOR UPDATE, so they stay locked until the caller
+  commits the chunk. `conditions` is the WHERE for the chunk's UPDATE / DELETE:
+  its ids plus the selection's filter again, so a car that stopped matching is
+  never hit even where the database cannot lock rows.
+  """
+  if selection.ids is not None:
+    ids = sorted(set(selection.ids))
+    for start in range(0, len(ids), chunk_size):
+      result = await db.execute(
+        select(Car.id, Car.vin).where(Car.id.in_(ids[start:start + chunk_size])).with_for_update()
+      )
+      rows = result.all()
+      if rows:
+        yield rows, [Car.id.in_([row.id for row in rows])]
+    return
+
+  bulk_filter = selection.filter
+  filters = build_car_filters(
+    year=bulk_filter.year,
+    transmission_type=bulk_filter.transmission_type,
+    status=bulk_filter.status,
+    fuel_type=bulk_filter.fuel_type,
+    search=bulk_filter.search,
+    dialect=db.bind.dialect.name,
+  )
+  if bulk_filter.make:
+    filters.append(Car.make == bulk_filter.make.upper())
+
+  last_id = 0
+  while True:
+    query = (
+      select(Car.id, Car.vin)
+      .where(*filters, Car.id > last_id)
+      .order_by(Car.id)
+      .limit(chunk_size)
+      .with_for_update()
+    )
+    result = await db.execute(query)
+    rows = result.all()
+    if not rows:
+      return
+    yield rows, [Car.id.in_([row.id for row in rows]), *filters]
+    last_id = rows[-1].id
+
+
+async def bulk_update_cars(
+  db: AsyncSession,
+  car_bulk_update: CarBulkUpdate,
+  current_user: User,
+  chunk_size: int = CAR_BULK_CHUNK_SIZE,
+):
+  """Apply one status/price change to many cars with one UPDATE per chunk.
+
+  Each chunk commits together with its audit rows, so row locks are held for one chunk at a time.
+  """
+  started = time.perf_counter()
+  values = {"updated_by": current_user.email, "version": Car.version + 1}
+  changes = []
+  if car_bulk_update.status is not None:
+    values["status"] = car_bulk_update.status.value
+    changes.append(f"status={car_bulk_update.status.value}")
+  if car_bulk_update.price is not None:
+    values["price"] = car_bulk_update.price
+    changes.append(f"price={car_bulk_update.price}")
+  if car_bulk_update.price_change_percent is not None:
+    factor = 1 + car_bulk_update.price_change_percent / 100
+    values["price"] = cast(func.round(Car.price * factor), Integer)
+    changes.append(f"price {car_bulk_update.price_change_percent:+g}%")
+
+  affected = 0
+  chunks = 0
+  try:
+    async for rows, conditions in _iter_bulk_chunks(db, car_bulk_update, chunk_size):
+      ids = [row.id for row in rows]
+      query = (
+        update(Car)
+        .where(*conditions)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+      )
+      result = await db.execute(query)
+      # One row per chunk; the per-car lookups match its entity_ids / entity_keys
+      record_audit_log(
+        db, f"User {current_user.id} bulk updated {result.rowcount} cars ({', '.join(changes)})", current_user.id,
+        verb="bulk_update", entity_type="car", entity_ids=ids, entity_keys=[row.vin for row in rows],
+      )
+      await record_car_changes(db, "upsert", rows)
+      await db.commit()
+      await car_entity_cache.invalidate(*ids)
+      # One event per committed chunk, not per car
+      event_bus.publish("cars", "updated", {"ids": ids})
+      affected += result.rowcount
+      chunks += 1
+  except Exception as e:
+    await db.rollback()
+    raise HTTPException(status_code=500, detail=f"Bulk update stopped after {affected} cars. {str(e)}")
+  finally:
+    if chunks:
+      invalidate_car_read_caches()
+
+  return {"affected": affected, "chunks": chunks, "elapsed_seconds": round(time.perf_counter() - started, 3)}
+
+
+async def bulk_delete_cars(
+  db: AsyncSession,
+  selection: CarBulkSelection,
+  current_user: User,
+  chunk_size: int = CAR_BULK_CHUNK_SIZE,
+):
+  started = time.perf_counter()
+  affected = 0
+  chunks = 0
+  try:
+    async for rows, conditions in _iter_bulk_chunks(db, selection, chunk_size):
+      ids = [row.id for row in rows]
+      result = await db.execute(
+        delete(Car).where(*conditions).execution_options(synchronize_session=False)
+      )
+      await unindex_cars(db, ids)
+      record_audit_log(
+        db, f"User {current_user.id} bulk deleted {result.rowcount} cars", current_user.id,
+        verb="bulk_delete", entity_type="car", entity_ids=ids, entity_keys=[row.vin for row in rows],
+      )
+      await record_car_changes(db, "delete", rows)
+      await db.commit()
+      await car_entity_cache.invalidate(*ids)
+      event_bus.publish("cars", "deleted", {"ids": ids})
+      affected += result.rowcount
+      chunks += 1
+  except Exception as e:
+    await db.rollback()
+    raise HTTPException(status_code=500, detail=f"Bulk delete stopped after {affected} cars. {str(e)}")
+  finally:
+    if chunks:
+      invalidate_car_read_caches()
+
+  return {"affected": affected, "chunks": chunks, "elapsed_seconds": round(time.perf_counter() - started, 3)}
@@ -0,0 +1,234 @@
+import json
+import os
+from typing import Any, Awaitable, Callable, Optional
+from dotenv import load_dotenv
+from services.single_flight import SingleFlight
+from services.ttl_cache import MISSING, TTLCache
+
+load_dotenv()
+
+# "memory" keeps entries per process; "shared" goes through a SharedCacheClient (see below); "off" disables
+ENTITY_CACHE_BACKEND = os.getenv("ENTITY_CACHE_BACKEND", "memory").lower()
+ENTITY_CACHE_MAX_SIZE = int(os.getenv("ENTITY_CACHE_MAX_SIZE", "4096"))
+# How long a 404 is remembered; short, since a new row may take the id
+ENTITY_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+
+# Stored for ids that do not exist. JSON null, so shared backends can hold it too.
+_NOT_FOUND = None
+
+
+class EntityCacheBackend:
+  """Storage behind an EntityCache. Async so a networked store can implement it."""
+
+  async def get(self, key: str) -> Any:
+    """The stored value, or MISSING."""
+    raise NotImplementedError
+
+  async def set(self, key: str, value: Any, ttl: float):
+    raise NotImplementedError
+
+  async def delete(self, *keys: str):
+    raise NotImplementedError
+
+  async def clear(self, prefix: str):
+    """Drop every key starting with `prefix`."""
+    raise NotImplementedError
+
+  def stats(self) -> dict:
+    return {}
+
+
+class MemoryBackend(EntityCacheBackend):
+  """Per-process LRU + TTL; values are kept as the objects given."""
+
+  def __init__(self, max_size: int = ENTITY_CACHE_MAX_SIZE):
+    self._cache = TTLCache(max_size=max_size)
+
+  async def get(self, key: str) -> Any:
+    return self._cache.get(key)
+
+  async def set(self, key: str, value: Any, ttl: float):
+    self._cache.set(key, value, ttl=ttl)
+
+  async def delete(self, *keys: str):
+    for key in keys:
+      self._cache.pop(key)
+
+  async def clear(self, prefix: str):
+    for key in self._cache.keys():
+      if key.startswith(prefix):
+        self._cache.pop(key)
+
+  def stats(self) -> dict:
+    stats = self._cache.stats()
+    # Hits and misses are counted per entity by EntityCache
+    return {"size": stats["size"], "max_size": stats["max_size"], "evictions": stats["evictions"]}
+
+
+class SharedCacheClient:
+  """The handful of byte-level operations a cross-worker store must offer.
+
+  A Redis or Memcached adapter implements these four calls; delete_prefix can be
+  a SCAN + DEL, or a namespace version key on stores without key iteration.
+  """
+
+  async def get(self, key: str) -> Optional[bytes]:
+    raise NotImplementedError
+
+  async def set(self, key: str, value: bytes, ttl: float):
+    raise NotImplementedError
+
+  async def delete(self, *keys: str):
+    raise NotImplementedError
+
+  async def delete_prefix(self, prefix: str):
+    raise NotImplementedError
+
+
+class LocalSharedClient(SharedCacheClient):
+  """In-process stand-in for a shared store, for development and single-worker runs.
+
+  Values only ever cross it as bytes, so anything that works here works against
+  a real networked store.
+  """
+
+  def __init__(self, max_size: int = ENTITY_CACHE_MAX_SIZE):
+    self._cache = TTLCache(max_size=max_size)
+
+  async def get(self, key: str) -> Optional[bytes]:
+    value = self._cache.get(key)
+    return None if value is MISSING else value
+
+  async def set(self, key: str, value: bytes, ttl: float):
+    self._cache.set(key, value, ttl=ttl)
+
+  async def delete(self, *keys: str):
+    for key in keys:
+      self._cache.pop(key)
+
+  async def delete_prefix(self, prefix: str):
+    for key in self._cache.keys():
+      if key.startswith(prefix):
+        self._cache.pop(key)
+
+
+class SharedBackend(EntityCacheBackend):
+  """JSON-encodes entries into a SharedCacheClient, so every worker sees the same cache."""
+
+  def __init__(self, client: SharedCacheClient):
+    self.client = client
+
+  async def get(self, key: str) -> Any:
+    raw = await self.client.get(key)
+    return MISSING if raw is None else json.loads(raw)
+
+  async def set(self, key: str, value: Any, ttl: float):
+    await self.client.set(key, json.dumps(value).encode(), ttl)
+
+  async def delete(self, *keys: str):
+    if keys:
+      await self.client.delete(*keys)
+
+  async def clear(self, prefix: str):
+    await self.client.delete_prefix(prefix)
+
+  def stats(self) -> dict:
+    return {"client": type(self.client).__name__}
+
+
+def _default_backend() -> Optional[EntityCacheBackend]:
+  if ENTITY_CACHE_BACKEND == "off":
+    return None
+  if ENTITY_CACHE_BACKEND == "shared":
+    return SharedBackend(LocalSharedClient())
+  return MemoryBackend()
+
+
+# Created once so the car and user caches share one size budget
+default_backend = _default_backend()
+
+
+class EntityCache:
+  """Read-through cache of one entity type, keyed by primary key.
+
+  Values must be JSON-compatible (e.g. a schema's model_dump(mode="json")) so
+  any backend can store them. Missing ids are cached for `negative_ttl`.
+  Writers call invalidate() with the ids they touched after committing.
+  """
+
+  def __init__(
+    self,
+    name: str,
+    ttl: float,
+    negative_ttl: float = ENTITY_CACHE_NEGATIVE_TTL_SECONDS,
+    backend: Optional[EntityCacheBackend] = None,
+  ):
+    self.name = name
+    self.ttl = ttl
+    self.negative_ttl = negative_ttl
+    self.backend = backend if backend is not None else default_backend
+    self.hits = 0
+    self.negative_hits = 0
+    self.misses = 0
+    self.invalidations = 0
+    # Bumped by every invalidation; a load that overlapped one is not stored
+    self._write_generation = 0
+    self._flight = SingleFlight(f"{name}_entity")
+
+  def _key(self, id: int) -> str:
+    return f"{self.name}:{id}"
+
+  async def get_or_load(self, id: int, load: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+    if self.backend is None or self.ttl <= 0:
+      return await load()
+
+    key = self._key(id)
+    cached = await self.backend.get(key)
+    if cached is not MISSING:
+      if cached is _NOT_FOUND:
+        self.negative_hits += 1
+      else:
+        self.hits += 1
+      return cached
+
+    self.misses += 1
+    generation = self._write_generation
+
+    async def load_and_store():
+      value = await load()
+      # A write committed while we were reading; what we read may already be stale
+      if generation == self._write_generation:
+        if value is None:
+          await self.backend.set(key, _NOT_FOUND, self.negative_ttl)
+        else:
+          await self.backend.set(key, value, self.ttl)
+      return value
+
+    # Concurrent misses on one id share a single SELECT
+    return await self._flight.do((id, generation), load_and_store)
+
+  async def invalidate(self, *ids: int):
+    self._write_generation += 1
+    self.invalidations += len(ids)
+    if self.backend is not None and ids:
+      await self.backend.delete(*[self._key(id) for id in ids])
+
+  async def clear(self):
+    """For writes that cannot name their ids (e.g. bulk inserts, which may fill cached 404s)."""
+    self._write_generation += 1
+    if self.backend is not None:
+      await self.backend.clear(f"{self.name}:")
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.negative_hits + self.misses
+    return {
+      "backend": ENTITY_CACHE_BACKEND,
+      "ttl_seconds": self.ttl,
+      "negative_ttl_seconds": self.negative_ttl,
+      "hits": self.hits,
+      "negative_hits": self.negative_hits,
+      "misses": self.misses,
+      "invalidations": self.invalidations,
+      "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+      **(self.backend.stats() if self.backend is not None else {}),
+    }
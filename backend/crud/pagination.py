@@ -0,0 +1,145 @@
+import base64
+import binascii
+import json
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.etags import table_generation
+from services.single_flight import SingleFlight
+from services.ttl_cache import MISSING, TTLCache
+
+load_dotenv()
+
+
+# Most ids one batch read may ask for
+BATCH_READ_MAX_IDS = int(os.getenv("BATCH_READ_MAX_IDS", "100"))
+
+
+def parse_batch_ids(ids: str, max_ids: int = BATCH_READ_MAX_IDS) -> list[int]:
+  """Distinct ids from a comma-separated list, in the order they were first given."""
+  try:
+    parsed = list(dict.fromkeys(int(id) for id in ids.split(",") if id.strip()))
+  except ValueError:
+    raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers.")
+  if not parsed:
+    raise HTTPException(status_code=400, detail="No ids given.")
+  if len(parsed) > max_ids:
+    raise HTTPException(status_code=400, detail=f"At most {max_ids} ids per batch.")
+  return parsed
+
+
+def parse_fields(fields: Optional[str], model, schema) -> Optional[list]:
+  """Columns for a `fields=` sparse fieldset, or None when no fieldset was asked for.
+
+  Only fields of the list's response `schema` may be picked. The columns come
+  back in schema order with id always first, so equal fieldsets select alike.
+  """
+  if fields is None:
+    return None
+  requested = {name.strip() for name in fields.split(",") if name.strip()}
+  unknown = requested - set(schema.model_fields)
+  if unknown:
+    raise HTTPException(status_code=400, detail=f"Unknown fields {sorted(unknown)}.")
+  return [model.id] + [getattr(model, name) for name in schema.model_fields if name in requested and name != "id"]
+
+
+def encode_cursor(values: dict) -> str:
+  """Opaque cursor for keyset pagination; clients must pass it back untouched."""
+  raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+  return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+  except (binascii.Error, ValueError) as e:
+    raise HTTPException(status_code=400, detail=f"Invalid cursor. {str(e)}")
+  if not isinstance(values, dict):
+    raise HTTPException(status_code=400, detail="Invalid cursor.")
+  return values
+
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "5"))
+COUNT_CACHE_MAX_SIZE = int(os.getenv("COUNT_CACHE_MAX_SIZE", "2048"))
+# Unfiltered tables at least this big report the planner's row estimate instead of COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = int(os.getenv("ESTIMATED_COUNT_THRESHOLD", "100000"))
+
+# (table name, normalized filters) -> (total, is_estimate)
+count_cache = TTLCache(max_size=COUNT_CACHE_MAX_SIZE, ttl=COUNT_CACHE_TTL_SECONDS)
+
+
+count_flight = SingleFlight("count")
+
+
+def invalidate_counts(table: str):
+  for key in count_cache.keys():
+    if key[0] == table:
+      count_cache.pop(key)
+
+
+async def estimate_row_count(db: AsyncSession, table: str) -> Optional[int]:
+  """Row count from planner statistics, or None where the backend has none."""
+  dialect = db.bind.dialect.name
+  if dialect == "postgresql":
+    query = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table")
+  elif dialect in ("mysql", "mariadb"):
+    query = text(
+      "SELECT TABLE_ROWS FROM information_schema.TABLES "
+      "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+    )
+  else:
+    return None
+  result = await db.execute(query, {"table": table})
+  estimate = result.scalar_one_or_none()
+  # PostgreSQL reports -1 before the table has ever been analyzed
+  return int(estimate) if estimate is not None and estimate >= 0 else None
+
+
+async def count_total(
+  db: AsyncSession,
+  model,
+  filters: list,
+  cache_key: tuple,
+  allow_estimate: bool = False,
+  cap: Optional[int] = None,
+) -> tuple[int, bool]:
+  """Total rows matching `filters` as (total, is_estimate), served from a short-lived cache.
+
+  `cache_key` must identify the filter combination; `filters` must be built from the same values.
+  With `cap`, counting stops after cap + 1 rows; a larger total comes back as (cap, True).
+  """
+  table = model.__tablename__
+  key = (table, cache_key, allow_estimate, cap)
+  cached = count_cache.get(key)
+  if cached is not MISSING:
+    return cached
+
+  async def count():
+    total = None
+    is_estimate = False
+    if allow_estimate and not filters:
+      estimate = await estimate_row_count(db, table)
+      if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+        total, is_estimate = estimate, True
+
+    if total is None and cap is not None:
+      capped = select(literal_column("1")).select_from(model).where(*filters).limit(cap + 1).subquery()
+      result = await db.execute(select(func.count()).select_from(capped))
+      total = result.scalar_one()
+      if total > cap:
+        total, is_estimate = cap, True
+
+    if total is None:
+      query = select(func.count()).select_from(model).where(*filters)
+      result = await db.execute(query)
+      total = result.scalar_one()
+
+    count_cache.set(key, (total, is_estimate))
+    return total, is_estimate
+
+  # Concurrent misses on the same key (e.g. right after an invalidation) share one COUNT
+  return await count_flight.do((key, table_generation(table)), count)
@@ -0,0 +1,123 @@
+import hashlib
+import hmac
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.refresh_tokens import Refresh_Token
+from models.users import AccountStatus, User
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+
+def _utcnow() -> datetime:
+  return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def hash_refresh_token(token: str) -> str:
+  # Tokens are 256 random bits, so a keyed hash is enough; bcrypt would only add latency
+  return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_refresh_token(
+  db: AsyncSession,
+  user_id: int,
+  family_id: str | None = None,
+) -> str:
+  """Stage a new refresh token on the session and return the raw value for the cookie."""
+  token = secrets.token_urlsafe(32)
+  db.add(Refresh_Token(
+    user_id=user_id,
+    token_hash=hash_refresh_token(token),
+    family_id=family_id or uuid.uuid4().hex,
+    expires_at=_utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+  ))
+  return token
+
+
+async def rotate_refresh_token(
+  db: AsyncSession,
+  token: str,
+) -> tuple[User, str]:
+  """Swap a valid refresh token for a new one in the same family.
+
+  Presenting a token that was already rotated means it leaked, so the whole family is revoked.
+  """
+  invalid_token_exception = HTTPException(status_code=401, detail="Invalid refresh token")
+
+  query = (
+    select(Refresh_Token, User)
+    .join(User, User.id == Refresh_Token.user_id)
+    .where(Refresh_Token.token_hash == hash_refresh_token(token))
+  )
+  result = await db.execute(query)
+  row = result.first()
+  if row is None:
+    await db.rollback()
+    raise invalid_token_exception
+
+  refresh_token, user = row
+  now = _utcnow()
+  if refresh_token.expires_at <= now or user.status != AccountStatus.ACTIVE:
+    await db.rollback()
+    raise invalid_token_exception
+
+  # Conditional update so two concurrent refreshes cannot both rotate the same token
+  revoke_query = (
+    update(Refresh_Token)
+    .where(Refresh_Token.id == refresh_token.id, Refresh_Token.revoked_at.is_(None))
+    .values(revoked_at=now)
+  )
+  revoked = await db.execute(revoke_query)
+  if revoked.rowcount != 1:
+    await revoke_refresh_token_family(db, refresh_token.family_id)
+    await db.commit()
+    raise HTTPException(status_code=401, detail="Refresh token reuse detected")
+
+  new_token = issue_refresh_token(db, user.id, family_id=refresh_token.family_id)
+  await db.commit()
+  return user, new_token
+
+
+async def revoke_refresh_token_family(
+  db: AsyncSession,
+  family_id: str,
+):
+  query = (
+    update(Refresh_Token)
+    .where(Refresh_Token.family_id == family_id, Refresh_Token.revoked_at.is_(None))
+    .values(revoked_at=_utcnow())
+  )
+  await db.execute(query)
+
+
+async def revoke_refresh_token(
+  db: AsyncSession,
+  token: str,
+):
+  """Revoke the family the presented token belongs to (logout)."""
+  query = select(Refresh_Token.family_id).where(Refresh_Token.token_hash == hash_refresh_token(token))
+  result = await db.execute(query)
+  family_id = result.scalar_one_or_none()
+  if family_id is not None:
+    await revoke_refresh_token_family(db, family_id)
+  await db.commit()
+
+
+async def revoke_user_refresh_tokens(
+  db: AsyncSession,
+  user_id: int,
+):
+  query = (
+    update(Refresh_Token)
+    .where(Refresh_Token.user_id == user_id, Refresh_Token.revoked_at.is_(None))
+    .values(revoked_at=_utcnow())
+  )
+  await db.execute(query)
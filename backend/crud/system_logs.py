@@ -1,24 +1,181 @@
+import datetime
+import os
 from typing import Optional
-from sqlalchemy import  or_, select
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import  and_, func, or_, select
+from crud.pagination import count_total, decode_cursor, encode_cursor
 from models.system_logs import System_Log
 from models.users import User
+from schemas.system_logs import SystemLogFilter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+load_dotenv()
+
+SYSTEM_LOG_MAX_PAGE_SIZE = int(os.getenv("SYSTEM_LOG_MAX_PAGE_SIZE", "200"))
+# Offset pages stop here; deeper history is read with cursors
+SYSTEM_LOG_MAX_OFFSET = int(os.getenv("SYSTEM_LOG_MAX_OFFSET", "10000"))
+# Most index rows one keyset page may walk while applying the (unindexed) search
+SYSTEM_LOG_SCAN_LIMIT = int(os.getenv("SYSTEM_LOG_SCAN_LIMIT", "5000"))
+
+# Verbs whose rows cover a chunk of entities through entity_ids / entity_keys
+BULK_VERBS = ("bulk_update", "bulk_delete")
+
+
+def build_system_log_filters(log_filter: SystemLogFilter, include_search: bool = True) -> list:
+  """WHERE clauses shared by every query over the system logs.
+
+  The structured filters and the time range are served by indexes; `search` is
+  still a substring scan over the action text.
+  """
+  filters = []
+  if log_filter.user_id is not None:
+    filters.append(System_Log.user_id == log_filter.user_id)
+  if log_filter.verb:
+    filters.append(System_Log.verb == log_filter.verb)
+  if log_filter.entity_type:
+    filters.append(System_Log.entity_type == log_filter.entity_type)
+  # An entity's history includes the bulk chunk rows that list it; those are few,
+  # so their LIKE only scans the bulk_update / bulk_delete rows of ix_system_logs_verb_id
+  if log_filter.entity_id is not None:
+    filters.append(or_(
+      System_Log.entity_id == log_filter.entity_id,
+      and_(
+        System_Log.verb.in_(BULK_VERBS),
+        System_Log.entity_ids.contains(f",{log_filter.entity_id},", autoescape=True),
+      ),
+    ))
+  if log_filter.entity_key:
+    filters.append(or_(
+      System_Log.entity_key == log_filter.entity_key,
+      and_(
+        System_Log.verb.in_(BULK_VERBS),
+        System_Log.entity_keys.contains(f",{log_filter.entity_key},", autoescape=True),
+      ),
+    ))
+  # Also what lets partitioned tables skip the months outside the range
+  if log_filter.date_from is not None:
+    filters.append(System_Log.timestamp >= log_filter.date_from)
+  if log_filter.date_to is not None:
+    filters.append(System_Log.timestamp < log_filter.date_to)
+  if include_search and log_filter.search:
+    filters.append(
+      or_(
+        System_Log.action.ilike(f"%{log_filter.search}%"),
+      )
+    )
+  return filters
+
 
 async def read_system_logs(
   db: AsyncSession,
   current_user: User,
+  log_filter: SystemLogFilter,
   offset: int = 0,
   limit: int = 10,
-  search: Optional[str] = None,
-
 ):
-  query = select(System_Log).order_by(System_Log.id.desc()).offset(offset).limit(limit)
-  if search:
-    query = query.where(
-      or_(
-        System_Log.action.ilike(f"%{search}%"),
-      )
+  if offset + limit > SYSTEM_LOG_MAX_OFFSET:
+    raise HTTPException(
+      status_code=400,
+      detail=f"Offset pages end at {SYSTEM_LOG_MAX_OFFSET} rows; pass `cursor` to page further back.",
     )
+  query = (
+    select(System_Log)
+    .where(*build_system_log_filters(log_filter))
+    .order_by(System_Log.id.desc())
+    .offset(offset)
+    .limit(limit)
+  )
   result = await db.execute(query)
-  return result.scalars().all()
\ No newline at end of file
+  return result.scalars().all()
+
+
+def _system_log_keyset_condition(values: dict):
+  try:
+    last_id = int(values["id"])
+    last_timestamp = datetime.datetime.fromisoformat(values["timestamp"])
+  except (KeyError, TypeError, ValueError):
+    raise HTTPException(status_code=400, detail="Invalid cursor.")
+  # Newest first; id breaks ties between rows logged in the same second
+  return or_(
+    System_Log.timestamp < last_timestamp,
+    and_(System_Log.timestamp == last_timestamp, System_Log.id < last_id),
+  )
+
+
+def _system_log_cursor(timestamp: datetime.datetime, id: int) -> str:
+  return encode_cursor({"timestamp": timestamp.isoformat(), "id": id})
+
+
+async def read_system_logs_by_cursor(
+  db: AsyncSession,
+  current_user: User,
+  log_filter: SystemLogFilter,
+  cursor: Optional[str] = None,
+  limit: int = 10,
+):
+  """Keyset page of logs, newest first, walking the (timestamp, id) index from the cursor.
+
+  Without `search` the page is read straight off the index. With it, at most
+  SYSTEM_LOG_SCAN_LIMIT rows past the cursor are examined, so a page may come
+  back short (even empty) with a next_cursor to continue from where the scan
+  stopped. Either way no request reads more than a bounded number of rows.
+
+  Returns the page and the next cursor, or None when the history is exhausted.
+  """
+  filters = build_system_log_filters(log_filter, include_search=False)
+  if cursor:
+    filters.append(_system_log_keyset_condition(decode_cursor(cursor)))
+  newest_first = (System_Log.timestamp.desc(), System_Log.id.desc())
+
+  if not log_filter.search:
+    result = await db.execute(select(System_Log).where(*filters).order_by(*newest_first).limit(limit + 1))
+    logs = result.scalars().all()
+    if len(logs) <= limit:
+      return logs, None
+    logs = logs[:limit]
+    return logs, _system_log_cursor(logs[-1].timestamp, logs[-1].id)
+
+  # The scan window: the next SYSTEM_LOG_SCAN_LIMIT rows in index order
+  window = (
+    select(System_Log.id, System_Log.timestamp)
+    .where(*filters)
+    .order_by(*newest_first)
+    .limit(SYSTEM_LOG_SCAN_LIMIT)
+    .subquery()
+  )
+  result = await db.execute(
+    select(System_Log)
+    .join(window, and_(System_Log.id == window.c.id, System_Log.timestamp == window.c.timestamp))
+    .where(System_Log.action.ilike(f"%{log_filter.search}%"))
+    .order_by(*newest_first)
+    .limit(limit + 1)
+  )
+  logs = result.scalars().all()
+  if len(logs) > limit:
+    logs = logs[:limit]
+    return logs, _system_log_cursor(logs[-1].timestamp, logs[-1].id)
+
+  # Short page: continue after the last row scanned, if the window was full
+  result = await db.execute(
+    select(window.c.timestamp, window.c.id, func.count().over().label("scanned"))
+    .order_by(window.c.timestamp.asc(), window.c.id.asc())
+    .limit(1)
+  )
+  oldest = result.first()
+  if oldest is None or oldest.scanned < SYSTEM_LOG_SCAN_LIMIT:
+    return logs, None
+  return logs, _system_log_cursor(oldest.timestamp, oldest.id)
+
+
+async def count_system_logs(
+  db: AsyncSession,
+  log_filter: SystemLogFilter,
+) -> tuple[int, bool]:
+  # Logs are append-only, so a total that is a few seconds stale is acceptable and
+  # writes do not invalidate it; the cache TTL bounds the drift. Offset pages end at
+  # SYSTEM_LOG_MAX_OFFSET, so counting further (an ILIKE scan with `search`) buys
+  # nothing: past it the total is reported as an estimate.
+  filters = build_system_log_filters(log_filter)
+  cache_key = tuple(sorted(log_filter.model_dump(exclude_none=True).items()))
+  return await count_total(db, System_Log, filters, cache_key, allow_estimate=True, cap=SYSTEM_LOG_MAX_OFFSET)
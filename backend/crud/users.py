@@ -1,13 +1,85 @@
+import os
+from dotenv import load_dotenv
 from fastapi import HTTPException
-from dependencies import AsyncSessionDep, get_password_hash
+from dependencies import AsyncSessionDep
 from models.users import User, AccountStatus, AccountType
-from models.system_logs import System_Log
-from schemas.users import UserCreate, UserUpdate
-from sqlalchemy import select, or_
+from schemas.users import UserCreate, UserInDB, UserUpdate
+from sqlalchemy import case, func, insert, select, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from typing import Optional
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
+from crud.entity_cache import EntityCache
+from crud.pagination import count_total, invalidate_counts
+from crud.refresh_tokens import revoke_user_refresh_tokens
+from services.audit_log import record_audit_log
+from services.etags import bump_generation
+from services.event_bus import event_bus
+from services.hashing import hash_password_async
+from services.principal_cache import invalidate_principal, invalidate_principal_id
+from services.token_revocation import token_versions
+
+load_dotenv()
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
+# User id -> serialized user; create and update invalidate the id they wrote
+user_entity_cache = EntityCache(User.__tablename__, ttl=USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user_read_caches():
+  invalidate_counts(User.__tablename__)
+  bump_generation(User.__tablename__)
+
+
+async def read_user_list_state(db: AsyncSession) -> tuple:
+  """Change marker for every user list, shared by all workers.
+
+  Every update bumps a version, so the version sum moves with updates, the count
+  with deletes and the highest id with inserts. The users table is small
+  enough to aggregate per request.
+  """
+  result = await db.execute(select(func.count(), func.max(User.id), func.sum(User.version)))
+  return tuple(result.one())
+
+
+def _is_duplicate_key(error: IntegrityError) -> bool:
+  args = getattr(error.orig, "args", None) or (None,)
+  message = str(error.orig).lower()
+  # 1062 is MySQL's ER_DUP_ENTRY
+  return args[0] == 1062 or "duplicate" in message or "unique" in message
+
+
+async def insert_user(
+  db: AsyncSession,
+  values: dict,
+) -> Optional[int]:
+  """INSERT a user and return the new id, or None if the email is already taken.
+
+  A single statement: ON CONFLICT DO NOTHING RETURNING where supported; on MySQL
+  the unique index on email rejects the row instead. Either way there is no
+  check-then-insert race.
+  """
+  dialect = db.bind.dialect.name
+  if dialect in ("postgresql", "sqlite"):
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    query = (
+      dialect_insert(User)
+      .values(**values)
+      .on_conflict_do_nothing(index_elements=[User.email])
+      .returning(User.id)
+    )
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+  try:
+    result = await db.execute(insert(User).values(**values))
+  except IntegrityError as e:
+    if _is_duplicate_key(e):
+      return None
+    raise
+  return result.inserted_primary_key[0]
 
 
 async def create_user(
@@ -15,10 +87,9 @@ async def create_user(
   current_user: User,
   user_create: UserCreate,
 ):
-  
-  check_existing_user_query = select(User).filter(User.email == user_create.email)
+  hashed_password = await hash_password_async(user_create.password)
     
-  new_user = User(
+  values = dict(
     # Information
     firstname=user_create.firstname.upper(),
     middlename=user_create.middlename.upper() if user_create.middlename else None,
@@ -26,31 +97,31 @@ async def create_user(
     contact_num=user_create.contact_num if user_create.contact_num else None,
     # Credentials
     email=user_create.email,
-    password=get_password_hash(user_create.password),
+    password=hashed_password,
     # Account details
-    type=user_create.type,
-    status=user_create.status,
-  )
-  
-  system_log = System_Log(
-    action=f"New User {user_create.email} created successfully.",
-    user_id=current_user.id
+    type=user_create.type.value,
+    status=user_create.status.value,
   )
   
   try:
-    result = await db.execute(check_existing_user_query)
-    existing_user = result.scalar_one_or_none()
-    if existing_user:
+    new_user_id = await insert_user(db, values)
+    if new_user_id is None:
       raise HTTPException(
         status_code=400,
         detail="User already exist"
       )
-    db.add_all([
-      new_user, 
-      system_log
-    ])
+    record_audit_log(
+      db, f"New User {user_create.email} created successfully.", current_user.id,
+      verb="create", entity_type="user", entity_id=new_user_id, entity_key=user_create.email,
+    )
     await db.commit()
+    invalidate_user_read_caches()
+    await user_entity_cache.invalidate(new_user_id)
+    event_bus.publish("users", "created", {"ids": [new_user_id]})
     return {"detail": f"User successfully created."}
+  except HTTPException:
+    await db.rollback()
+    raise
   except IntegrityError as e:
     await db.rollback()  
     raise HTTPException(status_code=400, detail=f"Database integrity error. {str(e)}")
@@ -59,6 +130,31 @@ async def create_user(
     raise HTTPException(status_code=500, detail=f"An unexpected error occurred. {str(e)}")
 
 
+def build_user_filters(
+  current_user: User,
+  type: Optional[AccountType] = None,
+  status: Optional[AccountStatus] = None,
+  search: Optional[str] = None
+) -> list:
+  """WHERE clauses shared by every query over the user list."""
+  filters = [User.id != current_user.id]
+    
+  if type:
+      filters.append(User.type == type)
+  if status:
+      filters.append(User.status == status)
+  if search:
+    filters.append(
+      or_(
+        User.firstname.ilike(f"%{search}%"),
+        User.middlename.ilike(f"%{search}%"),
+        User.lastname.ilike(f"%{search}%"),
+        User.email.ilike(f"%{search}%"),
+      )
+    )
+  return filters
+
+
 async def read_users(
   db: AsyncSession,
   current_user: User,
@@ -66,27 +162,21 @@ async def read_users(
   limit: int = 10,
   type: Optional[AccountType] = None,
   status: Optional[AccountStatus] = None,
-  search: Optional[str] = None
+  search: Optional[str] = None,
+  columns: Optional[list] = None,
 ):
+  """A page of users; with `columns` (a sparse fieldset) plain rows of just those columns."""
   try:
-    query = select(User).where(User.id != current_user.id)
-      
-    if type:
-        query = query.where(User.type == type)
-    if status:
-        query = query.where(User.status == status)
-    if search:
-      query = query.where(
-        or_(
-          User.firstname.ilike(f"%{search}%"),
-          User.middlename.ilike(f"%{search}%"),
-          User.lastname.ilike(f"%{search}%"),
-          User.email.ilike(f"%{search}%"),
-        )
-      )
-    query = query.offset(offset).limit(limit)
+    query = select(*columns) if columns else select(User)
+    query = query.where(*build_user_filters(
+      current_user=current_user,
+      type=type,
+      status=status,
+      search=search,
+    ))
+    query = query.order_by(User.id).offset(offset).limit(limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return result.all() if columns else result.scalars().all()
   
   except Exception as e:
       raise HTTPException(
@@ -95,6 +185,28 @@ async def read_users(
       )
 
 
+async def count_users(
+  db: AsyncSession,
+  current_user: User,
+  type: Optional[AccountType] = None,
+  status: Optional[AccountStatus] = None,
+  search: Optional[str] = None
+) -> tuple[int, bool]:
+  filters = build_user_filters(
+    current_user=current_user,
+    type=type,
+    status=status,
+    search=search,
+  )
+  cache_key = (
+    current_user.id,
+    type.value if type else None,
+    status.value if status else None,
+    search or None,
+  )
+  return await count_total(db, User, filters, cache_key)
+
+
 async def read_user_by_id(
   id: int,
   db: AsyncSession,
@@ -104,40 +216,129 @@ async def read_user_by_id(
   return result.scalars().first()
 
 
+async def read_users_by_ids(
+  ids: list[int],
+  db: AsyncSession,
+) -> tuple[list, list[int]]:
+  """Users for `ids` in one IN query, in the order requested, plus the ids that have no user."""
+  result = await db.execute(select(User).where(User.id.in_(ids)))
+  found = {user.id: user for user in result.scalars().all()}
+  return [found[id] for id in ids if id in found], [id for id in ids if id not in found]
+
+
+async def read_user_cached(
+  id: int,
+  db: AsyncSession,
+) -> Optional[dict]:
+  """read_user_by_id through user_entity_cache, as a UserInDB dict plus the row version."""
+  async def load():
+    user = await read_user_by_id(id, db)
+    if user is None:
+      return None
+    return {**UserInDB.model_validate(user).model_dump(mode="json"), "version": user.version}
+
+  return await user_entity_cache.get_or_load(id, load)
+
+
+async def read_user_version(
+  id: int,
+  db: AsyncSession,
+) -> Optional[int]:
+  """Just the row version, for answering If-None-Match without loading the user."""
+  result = await db.execute(select(User.version).where(User.id == id))
+  return result.scalar_one_or_none()
+
+
 async def update_user_by_id(
   id: int,
   db: AsyncSession,
   current_user: User,
   user_edit: UserUpdate,
+  expected_versions: Optional[list[int]] = None,
 ):          
+  """Update a user in one UPDATE ... RETURNING (UPDATE plus a primary-key read on MySQL).
+
+  With `expected_versions` (from If-Match) only an unchanged row is updated;
+  otherwise the request fails with 412 rather than overwriting a concurrent edit.
+  """
+  # Hash before touching the database so the session's connection is not held during bcrypt
+  hashed_password = await hash_password_async(user_edit.password) if user_edit.password else None
+
+  values = user_edit.model_dump(exclude_unset=True, exclude={"password"})
+  for field in ("firstname", "middlename", "lastname"):
+    if values.get(field) is not None:
+      values[field] = values[field].upper()
+  for field in ("type", "status"):
+    if values.get(field) is not None:
+      values[field] = values[field].value
+  if hashed_password:
+    values["password"] = hashed_password
+
+  # Any change to what an access token asserts, or to the password, revokes issued tokens.
+  # Compared in SQL against the stored row, so no read is needed first.
+  claim_changes = [
+    getattr(User, field) != values[field] for field in ("email", "type", "status") if field in values
+  ]
+  if hashed_password:
+    token_version = User.token_version + 1
+  elif claim_changes:
+    token_version = case((or_(*claim_changes), User.token_version + 1), else_=User.token_version)
+  else:
+    token_version = User.token_version
+
+  # token_version goes first: MySQL evaluates SET left to right against already-updated columns
+  conditions = [User.id == id]
+  if expected_versions is not None:
+    conditions.append(User.version.in_(expected_versions))
+  query = (
+    update(User)
+    .where(*conditions)
+    .ordered_values(
+      (User.token_version, token_version),
+      (User.version, User.version + 1),
+      *[(getattr(User, k), v) for k, v in values.items()],
+    )
+    .execution_options(synchronize_session=False)
+  )
+  returned_columns = (User.id, User.email, User.status, User.token_version)
+
   try:
-    user = await read_user_by_id(id=id, db=db)
-    
-    # Information
-    user.firstname=user_edit.firstname.upper()
-    user.middlename=user_edit.middlename.upper()
-    user.lastname=user_edit.lastname.upper()
-    user.contact_num=user_edit.contact_num
-    # Credentials
-    user.email=user_edit.email
-    if user_edit.password:
-      user.password = get_password_hash(user_edit.password)
-    # Account details
-    user.type=user_edit.type
-    user.status=user_edit.status
+    if db.bind.dialect.update_returning:
+      result = await db.execute(query.returning(*returned_columns))
+      user = result.first()
+    else:
+      result = await db.execute(query)
+      user = None
+      if result.rowcount:
+        returned = await db.execute(select(*returned_columns).where(User.id == id))
+        user = returned.first()
+    if user is None:
+      if expected_versions is not None and await read_user_version(id, db) is not None:
+        raise HTTPException(status_code=412, detail="User was modified by another request")
+      raise HTTPException(status_code=404, detail="User not found")
+
+    if hashed_password or user.status == AccountStatus.INACTIVE:
+      await revoke_user_refresh_tokens(db, user.id)
     
-    system_log = System_Log(
-      action=f"User {user.email} updated successfully.",
-      user_id=current_user.id
+    record_audit_log(
+      db, f"User {user.email} updated successfully.", current_user.id,
+      verb="update", entity_type="user", entity_id=user.id, entity_key=user.email,
     )
-    
-    db.add(system_log)
     await db.commit()
+    # Profile, credential, type and status changes must all be visible on the next request
+    invalidate_principal_id(user.id)
+    invalidate_principal(user.email)
+    invalidate_user_read_caches()
+    await user_entity_cache.invalidate(user.id)
+    event_bus.publish("users", "updated", {"ids": [user.id]})
+    token_versions.record(user.id, user.token_version, user.status)
     return {"detail": f"User successfully updated."}
+  except HTTPException:
+    await db.rollback()
+    raise
   except IntegrityError as e:
     await db.rollback()  
     raise HTTPException(status_code=400, detail=f"Database integrity error. {str(e)}")
   except Exception as e:
     await db.rollback() 
     raise HTTPException(status_code=500, detail=f"An unexpected error occurred. {str(e)}")
-  
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 load_dotenv()
@@ -7,6 +8,20 @@ load_dotenv()
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_async_engine(DATABASE_URL, echo=True)
+
+
+# One clock for every timestamp: the database's now() (column defaults, onupdate) and the
+# app's naive-UTC values (audit rows, refresh tokens) both read UTC, so (timestamp, id)
+# order and the monthly system_logs partitions agree whichever side set the time.
+# SQLite's CURRENT_TIMESTAMP is UTC already.
+@event.listens_for(engine.sync_engine, "connect")
+def _use_utc(dbapi_connection, connection_record):
+  dialect = engine.dialect.name
+  if dialect not in ("mysql", "mariadb", "postgresql"):
+    return
+  cursor = dbapi_connection.cursor()
+  cursor.execute("SET time_zone = '+00:00'" if dialect != "postgresql" else "SET TIME ZONE 'UTC'")
+  cursor.close()
 # Create session factory ONCE
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -1,11 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status
 from models.users import AccountStatus, AccountType
 from schemas.tokens import TokenData
 from database import get_session
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
 from fastapi.security import APIKeyCookie
 from models.users import User
 import jwt
@@ -13,6 +12,10 @@ import os
 from dotenv import load_dotenv
 from jwt.exceptions import InvalidTokenError
 from sqlalchemy import select
+from services.hashing import pwd_context, verify_password_async
+from services.principal_cache import principal_cache
+from services.token_revocation import STATELESS_AUTH, token_versions
+from services.ttl_cache import MISSING
 
 load_dotenv()
 
@@ -23,8 +26,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 # ASYNC DB SESSION
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_session)]
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-cookie_scheme = APIKeyCookie(name="access_token", auto_error=True)
+# No auto_error: a missing cookie must be a 401 (as for an expired token), not APIKeyCookie's 403,
+# so the client knows to try /auth/refresh
+cookie_scheme = APIKeyCookie(name="access_token", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -36,9 +40,11 @@ def get_password_hash(password):
 
 async def authenticate_user(db: AsyncSessionDep, email: str, password: str):
     user = await read_user_by_email(db, email)
+    # End the read transaction so no pooled connection is held while bcrypt runs
+    await db.commit()
     if not user:
         return False
-    if not verify_password(password, user.password):
+    if not await verify_password_async(password, user.password):
         return False
     return user
 
@@ -47,6 +53,35 @@ async def read_user_by_email(db: AsyncSessionDep, email: str):
   result = await db.execute(query)
   return result.scalars().first()
 
+def build_token_claims(user: User) -> dict:
+    """Claims for an access token; uid/status/ver let stateless mode authorize without a lookup."""
+    return {
+        "sub": user.email,
+        "user_type": user.type.value,  # Convert enum to string value
+        "uid": user.id,
+        "status": user.status.value,
+        "ver": user.token_version,
+    }
+
+
+def principal_from_claims(token_data: TokenData) -> User | None:
+    """Build a detached principal from the token alone, or None if the token predates these claims."""
+    if None in (token_data.user_id, token_data.user_type, token_data.status, token_data.token_version):
+        return None
+    status = AccountStatus(token_data.status)
+    entry = token_versions.current(token_data.user_id)
+    if entry is not None:
+        # The table is fresher than the token, so its status wins
+        status = entry[1]
+    return User(
+        id=token_data.user_id,
+        email=token_data.email,
+        type=AccountType(token_data.user_type),
+        status=status,
+        token_version=token_data.token_version,
+    )
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -59,7 +94,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 
 
 async def get_current_user(
-    token: Annotated[str, Depends(cookie_scheme)],
+    token: Annotated[Optional[str], Depends(cookie_scheme)],
     db: AsyncSessionDep,
 ):
     """Validate the JWT token and fetch the current user."""
@@ -68,18 +103,43 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        token_data = TokenData(
+            email=email,
+            user_id=payload.get("uid"),
+            user_type=payload.get("user_type"),
+            status=payload.get("status"),
+            token_version=payload.get("ver"),
+        )
     except InvalidTokenError:
         raise credentials_exception
 
-    user = await read_user_by_email(db=db, email=token_data.email)
-    if user is None:
-        raise credentials_exception
+    if STATELESS_AUTH:
+        if token_data.user_id is not None and token_data.token_version is not None \
+                and token_versions.is_revoked(token_data.user_id, token_data.token_version):
+            raise credentials_exception
+        principal = principal_from_claims(token_data)
+        if principal is not None:
+            return principal
+
+    user = principal_cache.get(token_data.email)
+    # Catches a change made through another worker, whose invalidation never reached this cache
+    if user is not MISSING and token_versions.is_stale(user.id, user.token_version, user.status):
+        principal_cache.pop(token_data.email)
+        user = MISSING
+    if user is MISSING:
+        user = await read_user_by_email(db=db, email=token_data.email)
+        if user is None:
+            raise credentials_exception
+        # Detach so the cached instance is never mutated or refreshed by another request's session
+        db.expunge(user)
+        principal_cache.set(token_data.email, user)
     return user
 
 
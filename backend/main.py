@@ -1,27 +1,60 @@
+import os
 from fastapi import FastAPI, Cookie
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import select
 from database import engine
-from models.base import Base  # ADDED IMPORT
-from routers import cars, auth, system_logs, users
+from routers import cars, auth, events, metrics, system_logs, users
+from migrations import run_migrations
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from dependencies import get_password_hash
 from models.users import User, AccountType, AccountStatus
+from services.audit_log import audit_log_writer
+from services.event_bus import event_bus
+from services.hashing import hashing_pool
+from services.json_response import JSON_SERIALIZER, FastJSONResponse
+from services.log_partitions import SYSTEM_LOG_MAINTENANCE, log_partition_maintenance
+from services.token_revocation import STATELESS_AUTH, token_versions
+
+# Multi-worker deployments should set this to false and run `alembic upgrade head` once per deploy
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() in ("1", "true", "yes")
 
 # The first part of the function, before the yield, will be executed before the application starts.
 # And the part after the yield will be executed after the application has finished.
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-  async with engine.begin() as conn:
-    await conn.run_sync(Base.metadata.create_all)
-    
+  if RUN_MIGRATIONS_ON_STARTUP:
+    async with engine.connect() as conn:
+      await conn.run_sync(run_migrations)
+      await conn.commit()
+
   await initialize_admin_user()
+  if STATELESS_AUTH:
+    await token_versions.refresh()
+    token_versions.start()
+  event_bus.start()
+  audit_log_writer.start()
+  if SYSTEM_LOG_MAINTENANCE:
+    # Runs once right away, so next months' partitions exist before the first write lands in them
+    log_partition_maintenance.start()
   yield
+  # Ends open event streams, which would otherwise hold up a graceful shutdown
+  await event_bus.stop()
+  await log_partition_maintenance.stop()
+  # Before dispose: the final flush needs the engine
+  await audit_log_writer.stop()
+  await token_versions.stop()
+  hashing_pool.shutdown()
   await engine.dispose()
 
-app = FastAPI(lifespan=lifespan)
+# List pages serialize themselves (services.json_response.serialize_page); with orjson
+# every other endpoint's already-encoded response is rendered by orjson too
+app = FastAPI(
+  lifespan=lifespan,
+  default_response_class=FastJSONResponse if JSON_SERIALIZER == "orjson" else JSONResponse,
+)
 
 origins = [
     "http://localhost:5173",
@@ -34,21 +67,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["set-cookie"]
+    expose_headers=["set-cookie", "etag"]
 )
 
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(cars.router)
 app.include_router(system_logs.router)
+app.include_router(metrics.router)
+app.include_router(events.router)
 
 # app.mount("/", StaticFiles(directory="D:/Projects/ojt-project/frontend/dist", html=True), name="static")
 
 
 async def initialize_admin_user():
-  async with engine.begin() as conn:
-    await conn.run_sync(Base.metadata.create_all)
-
+  # The schema is the migrations' job (see RUN_MIGRATIONS_ON_STARTUP)
   async with AsyncSession(engine) as db:
     admin_email = "techguru@gmail.com"
     result = await db.execute(select(User).where(User.email == admin_email))
@@ -0,0 +1,21 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import Connection
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def alembic_config() -> Config:
+  config = Config(ALEMBIC_INI)
+  config.set_main_option("script_location", os.path.dirname(os.path.abspath(__file__)))
+  return config
+
+
+def run_migrations(connection: Connection, revision: str = "head"):
+  """Upgrade the schema on an existing connection; used from `conn.run_sync` at startup."""
+  config = alembic_config()
+  config.attributes["connection"] = connection
+  # Leave the application's logging configuration alone
+  config.attributes["configure_logger"] = False
+  command.upgrade(config, revision)
@@ -0,0 +1,128 @@
+"""Fill the structured audit columns of system_logs rows written before they existed.
+
+Parses each row's action text, walking the table by id in chunks so it can run
+against a live database and be re-run safely (only rows with a null verb are
+touched). Entity ids are then resolved from the VIN / email where the car or
+user still exists. Run from backend/ after `alembic upgrade head`:
+
+    python -m migrations.backfill_audit_events --chunk-size 5000
+"""
+import argparse
+import asyncio
+import re
+import time
+from typing import Optional
+from sqlalchemy import bindparam, select, update
+from database import async_session, engine
+from models.cars import Car
+from models.system_logs import System_Log
+from models.users import User
+
+# (pattern, verb, entity_type); first match wins. A `key` group holds the entity's VIN / email,
+# a `keys` group the comma-separated VINs of a bulk chunk.
+ACTION_PATTERNS = [
+  (re.compile(r"^User \d+ created car (?P<key>\S+)$"), "create", "car"),
+  (re.compile(r"^User \d+ updated car (?P<key>\S+)$"), "update", "car"),
+  (re.compile(r"^User \d+ deleted car (?P<key>\S+)$"), "delete", "car"),
+  (re.compile(r"^User \d+ bulk updated \d+ cars \(.*\)(?:: (?P<keys>.+))?$"), "bulk_update", "car"),
+  (re.compile(r"^User \d+ bulk deleted \d+ cars(?:: (?P<keys>.+))?$"), "bulk_delete", "car"),
+  (re.compile(r"^User \d+ (?:imported|failed after importing) \d+ cars"), "import", "car"),
+  (re.compile(r"^New User (?P<key>\S+) created successfully\.$"), "create", "user"),
+  (re.compile(r"^User (?P<key>\S+) updated successfully\.$"), "update", "user"),
+  (re.compile(r"^User (?P<key>\S+) Logged in\.$"), "login", "user"),
+  (re.compile(r"^User (?P<key>\S+) registered successfully\.$"), "register", "user"),
+]
+
+
+def parse_action(action: Optional[str]) -> Optional[dict]:
+  """Structured columns for one legacy action string, or None if it is not recognised."""
+  if not action:
+    return None
+  for pattern, verb, entity_type in ACTION_PATTERNS:
+    match = pattern.match(action)
+    if match:
+      groups = match.groupdict()
+      keys = groups.get("keys")
+      return {
+        "verb": verb,
+        "entity_type": entity_type,
+        "entity_key": groups.get("key"),
+        # Same comma-wrapped form as services.audit_log writes for new bulk rows
+        "entity_keys": "," + ",".join(key.strip() for key in keys.split(",")) + "," if keys else None,
+      }
+  return None
+
+
+async def backfill(chunk_size: int) -> dict:
+  summary = {"scanned": 0, "parsed": 0, "unparsed": 0}
+  last_id = 0
+  while True:
+    async with async_session() as db:
+      result = await db.execute(
+        select(System_Log.id, System_Log.action)
+        .where(System_Log.id > last_id, System_Log.verb.is_(None))
+        .order_by(System_Log.id)
+        .limit(chunk_size)
+      )
+      rows = result.all()
+      if not rows:
+        break
+      last_id = rows[-1].id
+
+      updates = []
+      for row in rows:
+        parsed = parse_action(row.action)
+        if parsed is None:
+          summary["unparsed"] += 1
+        else:
+          updates.append({"log_id": row.id, **parsed})
+      if updates:
+        # One executemany UPDATE per chunk, keyed by primary key
+        await db.execute(
+          update(System_Log.__table__)
+          .where(System_Log.__table__.c.id == bindparam("log_id"))
+          .values(
+            verb=bindparam("verb"),
+            entity_type=bindparam("entity_type"),
+            entity_key=bindparam("entity_key"),
+            entity_keys=bindparam("entity_keys"),
+          ),
+          updates,
+        )
+      await db.commit()
+      summary["scanned"] += len(rows)
+      summary["parsed"] += len(updates)
+      print(f"  up to id {last_id}: {summary['parsed']} parsed, {summary['unparsed']} not recognised")
+
+  # Resolve ids for entities that still exist; deleted ones keep only their key
+  async with async_session() as db:
+    for entity_type, model, key_column in (("car", Car, Car.vin), ("user", User, User.email)):
+      await db.execute(
+        update(System_Log)
+        .where(
+          System_Log.entity_type == entity_type,
+          System_Log.entity_id.is_(None),
+          System_Log.entity_key.is_not(None),
+        )
+        .values(entity_id=select(model.id).where(key_column == System_Log.entity_key).scalar_subquery())
+        .execution_options(synchronize_session=False)
+      )
+    await db.commit()
+  return summary
+
+
+async def main(args):
+  engine.echo = False
+  started = time.perf_counter()
+  summary = await backfill(args.chunk_size)
+  print(
+    f"{summary['scanned']} rows scanned, {summary['parsed']} backfilled, "
+    f"{summary['unparsed']} left null in {time.perf_counter() - started:.1f}s"
+  )
+  await engine.dispose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--chunk-size", type=int, default=5000)
+  asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""EXPLAIN-based checks that the hot queries are served by the indexes migrations created.
+
+Every revision module may define `checks`, a list of IndexCheck. Run from backend/:
+
+    python -m migrations.checks
+"""
+import asyncio
+import sys
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+from migrations import alembic_config
+
+
+@dataclass
+class IndexCheck:
+  name: str
+  build_query: Callable[[], Select]
+  index: str
+  # Backends the index exists on; None for all
+  dialects: Optional[Sequence[str]] = None
+
+
+def _compile(connection: Connection, query: Select) -> str:
+  return str(query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(connection: Connection, query: Select) -> Optional[str]:
+  """Plan text for `query`, or None where the backend has no EXPLAIN we understand."""
+  sql = _compile(connection, query)
+  dialect = connection.dialect.name
+  if dialect == "postgresql":
+    # Small tables are seq-scanned regardless; ask whether the index *can* serve the query
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = connection.execute(text(f"EXPLAIN {sql}")).all()
+    return "\n".join(row[0] for row in rows)
+  if dialect in ("mysql", "mariadb"):
+    rows = connection.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    # possible_keys lists every index the optimizer considered usable
+    return "\n".join(f"key={row['key']} possible_keys={row['possible_keys']}" for row in rows)
+  if dialect == "sqlite":
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(str(row[-1]) for row in rows)
+  return None
+
+
+def run_checks(connection: Connection, checks: list[IndexCheck]) -> list[str]:
+  failures = []
+  for check in checks:
+    if check.dialects is not None and connection.dialect.name not in check.dialects:
+      continue
+    plan = explain(connection, check.build_query())
+    if plan is None:
+      print(f"SKIP {check.name}: EXPLAIN not supported on {connection.dialect.name}")
+      continue
+    if check.index in plan:
+      print(f"OK   {check.name} -> {check.index}")
+    else:
+      print(f"FAIL {check.name}: expected {check.index}\n{plan}")
+      failures.append(check.name)
+  return failures
+
+
+def collect_checks() -> list[IndexCheck]:
+  script = ScriptDirectory.from_config(alembic_config())
+  checks = []
+  for revision in reversed(list(script.walk_revisions())):
+    checks.extend(getattr(revision.module, "checks", []))
+  return checks
+
+
+async def main() -> int:
+  from database import engine
+  engine.echo = False
+  checks = collect_checks()
+  async with engine.connect() as connection:
+    failures = await connection.run_sync(run_checks, checks)
+    await connection.rollback()
+  await engine.dispose()
+  return 1 if failures else 0
+
+
+if __name__ == "__main__":
+  sys.exit(asyncio.run(main()))
@@ -0,0 +1,52 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.engine import Connection
+from database import DATABASE_URL, engine
+from models.base import Base
+# Imported for their side effect of registering tables on Base.metadata
+import models.car_changes, models.cars, models.refresh_tokens, models.system_logs, models.users  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+  fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+  context.configure(
+    url=DATABASE_URL,
+    target_metadata=target_metadata,
+    literal_binds=True,
+    dialect_opts={"paramstyle": "named"},
+  )
+  with context.begin_transaction():
+    context.run_migrations()
+
+
+def do_run_migrations(connection: Connection):
+  context.configure(connection=connection, target_metadata=target_metadata)
+  with context.begin_transaction():
+    context.run_migrations()
+
+
+async def run_async_migrations():
+  async with engine.connect() as connection:
+    await connection.run_sync(do_run_migrations)
+    await connection.commit()
+
+
+def run_migrations_online():
+  # The app passes its own connection in at startup; the alembic CLI opens one here
+  connection = config.attributes.get("connection")
+  if connection is None:
+    asyncio.run(run_async_migrations())
+  else:
+    do_run_migrations(connection)
+
+
+if context.is_offline_mode():
+  run_migrations_offline()
+else:
+  run_migrations_online()
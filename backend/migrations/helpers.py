@@ -0,0 +1,87 @@
+from typing import Sequence
+import sqlalchemy as sa
+from alembic import op
+
+
+def table_exists(table: str) -> bool:
+  return table in sa.inspect(op.get_bind()).get_table_names()
+
+
+def column_exists(table: str, column: str) -> bool:
+  return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def index_exists(table: str, name: str) -> bool:
+  return name in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _pg_partitions(table: str) -> list[str] | None:
+  """Partition names when `table` is a partitioned PostgreSQL table, else None."""
+  bind = op.get_bind()
+  partitioned = bind.execute(
+    sa.text("SELECT 1 FROM pg_class WHERE relname = :table AND relkind = 'p' AND pg_table_is_visible(oid)"),
+    {"table": table},
+  ).first()
+  if partitioned is None:
+    return None
+  rows = bind.execute(sa.text(
+    "SELECT child.relname FROM pg_inherits "
+    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+    "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+  ), {"table": table})
+  return [row[0] for row in rows]
+
+
+def create_index_online(name: str, table: str, columns: Sequence[str], unique: bool = False):
+  """Build an index without blocking writes to a live table.
+
+  PostgreSQL uses CREATE INDEX CONCURRENTLY (outside the migration transaction);
+  a partitioned table cannot be, so there each partition is indexed concurrently
+  and attached to an index created ON ONLY the parent.
+  MySQL uses in-place online DDL with LOCK=NONE, other backends a plain CREATE INDEX.
+  Skips indexes that already exist so re-running after a partial failure is safe.
+  """
+  if index_exists(table, name):
+    return
+
+  dialect = op.get_bind().dialect.name
+  if dialect == "postgresql":
+    partitions = _pg_partitions(table)
+    if partitions is not None:
+      kind = "UNIQUE INDEX" if unique else "INDEX"
+      column_list = ", ".join(f'"{column}"' for column in columns)
+      op.execute(f"CREATE {kind} IF NOT EXISTS {name} ON ONLY {table} ({column_list})")
+      with op.get_context().autocommit_block():
+        for partition in partitions:
+          op.execute(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {partition}_{name} ON {partition} ({column_list})")
+      for partition in partitions:
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition}_{name}")
+      return
+    with op.get_context().autocommit_block():
+      op.create_index(name, table, list(columns), unique=unique, postgresql_concurrently=True)
+  elif dialect in ("mysql", "mariadb"):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    op.execute(
+      f"ALTER TABLE {table} ADD {kind} {name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE"
+    )
+  else:
+    op.create_index(name, table, list(columns), unique=unique)
+
+
+def drop_index_online(name: str, table: str):
+  if not index_exists(table, name):
+    return
+
+  dialect = op.get_bind().dialect.name
+  if dialect == "postgresql":
+    if _pg_partitions(table) is not None:
+      # Drops the partitions' attached indexes with it; not possible concurrently
+      op.drop_index(name, table_name=table)
+      return
+    with op.get_context().autocommit_block():
+      op.drop_index(name, table_name=table, postgresql_concurrently=True)
+  elif dialect in ("mysql", "mariadb"):
+    op.execute(f"ALTER TABLE {table} DROP INDEX {name}, ALGORITHM=INPLACE, LOCK=NONE")
+  else:
+    op.drop_index(name, table_name=table)
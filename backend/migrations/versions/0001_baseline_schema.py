@@ -0,0 +1,98 @@
+"""Baseline schema
+
+Creates the tables main.lifespan used to create with Base.metadata.create_all,
+skipping any that already exist so databases created that way can be upgraded
+in place. Also adds users.token_version, which create_all never added to
+existing tables.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists, table_exists
+
+
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+checks = []
+
+
+def upgrade() -> None:
+    if not table_exists("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(155), nullable=False, unique=True),
+            sa.Column("password", sa.String(255), nullable=False),
+            sa.Column("firstname", sa.String(155), nullable=False),
+            sa.Column("middlename", sa.String(155), nullable=True),
+            sa.Column("lastname", sa.String(155), nullable=False),
+            sa.Column("contact_num", sa.String(155), nullable=True),
+            sa.Column("type", sa.Enum("ADMIN", "MANAGER", name="accounttype"), nullable=False),
+            sa.Column("status", sa.Enum("ACTIVE", "INACTIVE", name="accountstatus"), nullable=False),
+            sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+    elif not column_exists("users", "token_version"):
+        op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+    if not table_exists("cars"):
+        op.create_table(
+            "cars",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("vin", sa.String(155), nullable=False),
+            sa.Column("year", sa.Integer(), nullable=False),
+            sa.Column("make", sa.String(155), nullable=False),
+            sa.Column("model", sa.String(155), nullable=False),
+            sa.Column("color", sa.String(155), nullable=False),
+            sa.Column("mileage", sa.Integer(), nullable=False),
+            sa.Column("price", sa.Integer(), nullable=False),
+            sa.Column("transmission_type", sa.Enum("MANUAL", "AUTOMATIC", name="transmissiontype"), nullable=False),
+            sa.Column("fuel_type", sa.Enum("PETROL", "DIESEL", "ELECTRIC", "HYBRID", name="fueltype"), nullable=False),
+            sa.Column("status", sa.Enum("AVAILABLE", "SOLD", "RESERVED", name="carstatus"), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column("created_by", sa.String(155), nullable=False),
+            sa.Column("updated_by", sa.String(155), nullable=False),
+        )
+
+    if not table_exists("system_logs"):
+        op.create_table(
+            "system_logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("action", sa.Text(), nullable=True),
+            sa.Column("timestamp", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_system_logs_user_id", "system_logs", ["user_id"])
+
+    if not table_exists("refresh_tokens"):
+        op.create_table(
+            "refresh_tokens",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("token_hash", sa.String(64), nullable=False, unique=True),
+            sa.Column("family_id", sa.String(32), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("revoked_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+        op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("refresh_tokens")
+    op.drop_table("system_logs")
+    op.drop_table("cars")
+    op.drop_table("users")
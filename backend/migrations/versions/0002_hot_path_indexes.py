@@ -0,0 +1,100 @@
+"""Indexes for the hot lookup and filter paths
+
+Each index matches a query shape in crud/: equality filters lead, the id or
+timestamp sort key follows so filtered pages come back in index order without
+a sort. All of them are built online (see migrations.helpers.create_index_online).
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+import datetime
+from typing import Sequence, Union
+
+from sqlalchemy import select
+from migrations.checks import IndexCheck
+from migrations.helpers import create_index_online, drop_index_online
+from models.cars import Car, CarStatus, FuelType, TransmissionType
+from models.system_logs import System_Log
+from models.users import AccountStatus, AccountType, User
+
+
+revision: str = "0002_hot_path_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # read_car_by_vin and VIN-prefix search
+    ("ix_cars_vin", "cars", ["vin"]),
+    # read_cars / read_cars_by_cursor with a single equality filter, ordered by id
+    ("ix_cars_status_id", "cars", ["status", "id"]),
+    ("ix_cars_fuel_type_id", "cars", ["fuel_type", "id"]),
+    ("ix_cars_transmission_type_id", "cars", ["transmission_type", "id"]),
+    ("ix_cars_year_id", "cars", ["year", "id"]),
+    # Combined filters and the facet GROUP BY, served from the index alone
+    ("ix_cars_status_fuel_type_transmission_type_year", "cars", ["status", "fuel_type", "transmission_type", "year"]),
+    ("ix_cars_price", "cars", ["price"]),
+    # Keyset pagination with sort=updated_at
+    ("ix_cars_updated_at_id", "cars", ["updated_at", "id"]),
+    # read_users type/status filters
+    ("ix_users_type_status", "users", ["type", "status"]),
+    # Time-ordered and time-ranged system log reads
+    ("ix_system_logs_timestamp_id", "system_logs", ["timestamp", "id"]),
+]
+
+checks = [
+    IndexCheck(
+        "read_cars status filter",
+        lambda: select(Car).where(Car.status == CarStatus.AVAILABLE).order_by(Car.id).limit(10),
+        "ix_cars_status_id",
+    ),
+    IndexCheck(
+        "read_cars fuel_type filter",
+        lambda: select(Car).where(Car.fuel_type == FuelType.DIESEL).order_by(Car.id).limit(10),
+        "ix_cars_fuel_type_id",
+    ),
+    IndexCheck(
+        "read_cars transmission_type filter",
+        lambda: select(Car).where(Car.transmission_type == TransmissionType.MANUAL).order_by(Car.id).limit(10),
+        "ix_cars_transmission_type_id",
+    ),
+    IndexCheck(
+        "read_cars year filter",
+        lambda: select(Car).where(Car.year == 2020).order_by(Car.id).limit(10),
+        "ix_cars_year_id",
+    ),
+    IndexCheck(
+        "read_cars price range",
+        lambda: select(Car).where(Car.price.between(500000, 900000)),
+        "ix_cars_price",
+    ),
+    IndexCheck(
+        "read_cars_by_cursor sort=updated_at",
+        lambda: select(Car).order_by(Car.updated_at.desc(), Car.id.desc()).limit(10),
+        "ix_cars_updated_at_id",
+    ),
+    IndexCheck(
+        "read_users type/status filter",
+        lambda: select(User).where(User.type == AccountType.MANAGER, User.status == AccountStatus.ACTIVE),
+        "ix_users_type_status",
+    ),
+    IndexCheck(
+        "read_system_logs time range",
+        lambda: select(System_Log)
+            .where(System_Log.timestamp >= datetime.datetime(2026, 1, 1))
+            .order_by(System_Log.timestamp.desc(), System_Log.id.desc())
+            .limit(10),
+        "ix_system_logs_timestamp_id",
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
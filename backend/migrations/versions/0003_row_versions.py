@@ -0,0 +1,31 @@
+"""Row version counters for ETags and If-Match
+
+Revision ID: 0003_row_versions
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists
+
+
+revision: str = "0003_row_versions"
+down_revision: Union[str, None] = "0002_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+checks = []
+
+
+def upgrade() -> None:
+    # A constant server default keeps this a metadata-only change on MySQL 8 and PostgreSQL 11+
+    for table in ("cars", "users"):
+        if not column_exists(table, "version"):
+            op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "version")
+    op.drop_column("cars", "version")
@@ -0,0 +1,81 @@
+"""Structured audit columns on system_logs
+
+Adds verb, entity_type, entity_id and entity_key (user_id already records the
+actor) plus the indexes the audit filters use. Existing rows keep null columns
+until `python -m migrations.backfill_audit_events` parses their action text.
+
+Revision ID: 0004_structured_audit_events
+Revises: 0003_row_versions
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import select
+from migrations.checks import IndexCheck
+from migrations.helpers import column_exists, create_index_online, drop_index_online
+from models.system_logs import System_Log
+
+
+revision: str = "0004_structured_audit_events"
+down_revision: Union[str, None] = "0003_row_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ("verb", sa.String(32)),
+    ("entity_type", sa.String(32)),
+    ("entity_id", sa.Integer()),
+    ("entity_key", sa.String(255)),
+]
+
+INDEXES = [
+    ("ix_system_logs_entity_type_entity_id_id", "system_logs", ["entity_type", "entity_id", "id"]),
+    ("ix_system_logs_entity_type_entity_key_id", "system_logs", ["entity_type", "entity_key", "id"]),
+    ("ix_system_logs_user_id_verb_id", "system_logs", ["user_id", "verb", "id"]),
+    ("ix_system_logs_verb_id", "system_logs", ["verb", "id"]),
+]
+
+checks = [
+    IndexCheck(
+        "read_system_logs entity filter",
+        lambda: select(System_Log)
+            .where(System_Log.entity_type == "car", System_Log.entity_id == 42)
+            .order_by(System_Log.id.desc())
+            .limit(10),
+        "ix_system_logs_entity_type_entity_id_id",
+    ),
+    IndexCheck(
+        "read_system_logs entity key filter",
+        lambda: select(System_Log)
+            .where(System_Log.entity_type == "car", System_Log.entity_key == "1HGCM82633A004352")
+            .order_by(System_Log.id.desc())
+            .limit(10),
+        "ix_system_logs_entity_type_entity_key_id",
+    ),
+    IndexCheck(
+        "read_system_logs actor + verb filter",
+        lambda: select(System_Log)
+            .where(System_Log.user_id == 1, System_Log.verb == "delete")
+            .order_by(System_Log.id.desc())
+            .limit(10),
+        "ix_system_logs_user_id_verb_id",
+    ),
+]
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: metadata-only on MySQL 8 and PostgreSQL
+    for name, type_ in COLUMNS:
+        if not column_exists("system_logs", name):
+            op.add_column("system_logs", sa.Column(name, type_, nullable=True))
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
+    for name, _ in reversed(COLUMNS):
+        op.drop_column("system_logs", name)
@@ -0,0 +1,133 @@
+"""Partition system_logs by month on timestamp
+
+PostgreSQL: the table becomes a natively range-partitioned parent. The existing
+rows are attached, unchanged, as one partition (system_logs_legacy) covering
+everything before the current month.
+
+MySQL: the table is repartitioned in place with RANGE COLUMNS(timestamp), with
+the existing rows in p_legacy and an empty p_future (MAXVALUE) that later
+months are split from. InnoDB cannot partition a table that has foreign keys,
+and every unique key must include the partition column, so the user_id foreign
+key is dropped and the primary key becomes (id, timestamp). This rebuilds the
+table (ALGORITHM=COPY); run it in a quiet window on large tables.
+
+Monthly partitions from the current month up to SYSTEM_LOG_PARTITIONS_AHEAD
+months out are created here; services.log_partitions keeps creating them (and
+expiring old ones) from the app lifespan. Other backends are left unpartitioned.
+
+Partition bounds are UTC months: the app stores every timestamp in UTC (the
+database session time zone is set to UTC in database.py). On a server that
+ran in another time zone, rows written before that change keep local times,
+so they can sit up to that offset on the wrong side of a bound or out of
+(timestamp, id) order with newer rows.
+
+Revision ID: 0005_partition_system_logs
+Revises: 0004_structured_audit_events
+Create Date: 2026-10-18
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from services.log_partitions import (
+    MYSQL_FUTURE_PARTITION,
+    SYSTEM_LOG_PARTITIONS_AHEAD,
+    month_start,
+    mysql_partition_clause,
+    pg_partition_ddl,
+    upcoming_months,
+)
+
+
+revision: str = "0005_partition_system_logs"
+down_revision: Union[str, None] = "0004_structured_audit_events"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# system_logs' indexes as of this revision (0001, 0002 and 0004), rebuilt on the new
+# parent; written out rather than read from the model, which also has later revisions' indexes
+INDEXES = [
+    ("ix_system_logs_user_id", ["user_id"]),
+    ("ix_system_logs_timestamp_id", ["timestamp", "id"]),
+    ("ix_system_logs_entity_type_entity_id_id", ["entity_type", "entity_id", "id"]),
+    ("ix_system_logs_entity_type_entity_key_id", ["entity_type", "entity_key", "id"]),
+    ("ix_system_logs_user_id_verb_id", ["user_id", "verb", "id"]),
+    ("ix_system_logs_verb_id", ["verb", "id"]),
+]
+
+checks = []
+
+
+def _upgrade_postgresql(bind, boundary: datetime.date, months: list[datetime.date]):
+    inspector = sa.inspect(bind)
+    if bind.execute(sa.text(
+        "SELECT 1 FROM pg_class WHERE relname = 'system_logs' AND relkind = 'p' AND pg_table_is_visible(oid)"
+    )).first():
+        return
+
+    op.execute("ALTER TABLE system_logs RENAME TO system_logs_legacy")
+    # Index and primary-key names are schema-wide; free them for the new parent table
+    for index in inspector.get_indexes("system_logs_legacy"):
+        op.execute(f'ALTER INDEX {index["name"]} RENAME TO {index["name"]}_legacy')
+    pk_name = inspector.get_pk_constraint("system_logs_legacy")["name"]
+    op.execute(f"ALTER TABLE system_logs_legacy RENAME CONSTRAINT {pk_name} TO system_logs_legacy_pkey")
+
+    op.execute('CREATE TABLE system_logs (LIKE system_logs_legacy INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+    op.execute('ALTER TABLE system_logs ADD PRIMARY KEY (id, "timestamp")')
+    op.execute("ALTER TABLE system_logs ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    # Keep the id sequence alive when the legacy partition is eventually dropped
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('system_logs_legacy', 'id')")).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY system_logs.id")
+    # The parent is still empty, so plain CREATE INDEX is instant
+    for name, columns in INDEXES:
+        op.create_index(name, "system_logs", columns)
+
+    # Matching indexes are built on the legacy rows as part of the attach
+    op.execute(
+        f"ALTER TABLE system_logs ATTACH PARTITION system_logs_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    )
+    for start in months:
+        op.execute(pg_partition_ddl(start))
+
+
+def _upgrade_mysql(bind, boundary: datetime.date, months: list[datetime.date]):
+    if bind.execute(sa.text(
+        "SELECT 1 FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'system_logs' AND PARTITION_NAME IS NOT NULL"
+    )).first():
+        return
+
+    for foreign_key in sa.inspect(bind).get_foreign_keys("system_logs"):
+        op.drop_constraint(foreign_key["name"], "system_logs", type_="foreignkey")
+    op.execute("ALTER TABLE system_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, `timestamp`)")
+    clauses = ", ".join(mysql_partition_clause(start) for start in months)
+    op.execute(
+        f"ALTER TABLE system_logs PARTITION BY RANGE COLUMNS(`timestamp`) ("
+        f"PARTITION p_legacy VALUES LESS THAN ('{boundary.isoformat()}'), {clauses}, "
+        f"PARTITION {MYSQL_FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    boundary = month_start(today)
+    months = upcoming_months(today, SYSTEM_LOG_PARTITIONS_AHEAD)
+    if bind.dialect.name == "postgresql":
+        _upgrade_postgresql(bind, boundary, months)
+    elif bind.dialect.name in ("mysql", "mariadb"):
+        _upgrade_mysql(bind, boundary, months)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name in ("mysql", "mariadb"):
+        op.execute("ALTER TABLE system_logs REMOVE PARTITIONING")
+        op.execute("ALTER TABLE system_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+        op.create_foreign_key(None, "system_logs", "users", ["user_id"], ["id"])
+    elif bind.dialect.name == "postgresql":
+        # Folding partitions back into one table is a full copy; do it by hand if ever needed
+        raise NotImplementedError("system_logs partitioning cannot be downgraded automatically on PostgreSQL")
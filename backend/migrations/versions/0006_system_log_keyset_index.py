@@ -0,0 +1,64 @@
+"""Index for per-user system log history in time order
+
+Keyset pages over (timestamp, id) are served by ix_system_logs_timestamp_id;
+this adds the same order per actor, for the user_id filter.
+
+Revision ID: 0006_system_log_keyset_index
+Revises: 0005_partition_system_logs
+Create Date: 2026-10-18
+"""
+import datetime
+from typing import Sequence, Union
+
+from sqlalchemy import and_, or_, select
+from migrations.checks import IndexCheck
+from migrations.helpers import create_index_online, drop_index_online
+from models.system_logs import System_Log
+
+
+revision: str = "0006_system_log_keyset_index"
+down_revision: Union[str, None] = "0005_partition_system_logs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_system_logs_user_id_timestamp_id", "system_logs", ["user_id", "timestamp", "id"]),
+]
+
+_last_seen = datetime.datetime(2026, 6, 1)
+
+checks = [
+    IndexCheck(
+        "read_system_logs_by_cursor",
+        lambda: select(System_Log)
+            .where(or_(
+                System_Log.timestamp < _last_seen,
+                and_(System_Log.timestamp == _last_seen, System_Log.id < 1000),
+            ))
+            .order_by(System_Log.timestamp.desc(), System_Log.id.desc())
+            .limit(11),
+        "ix_system_logs_timestamp_id",
+    ),
+    IndexCheck(
+        "read_system_logs_by_cursor user_id + range",
+        lambda: select(System_Log)
+            .where(
+                System_Log.user_id == 1,
+                System_Log.timestamp >= datetime.datetime(2026, 1, 1),
+                System_Log.timestamp < _last_seen,
+            )
+            .order_by(System_Log.timestamp.desc(), System_Log.id.desc())
+            .limit(11),
+        "ix_system_logs_user_id_timestamp_id",
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
@@ -0,0 +1,46 @@
+"""Car change feed for delta sync
+
+Creates car_changes and seeds it with one upsert row per existing car, so
+syncing from token 0 returns the whole inventory.
+
+Revision ID: 0007_car_changes
+Revises: 0006_system_log_keyset_index
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import table_exists
+
+
+revision: str = "0007_car_changes"
+down_revision: Union[str, None] = "0006_system_log_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+checks = []
+
+
+def upgrade() -> None:
+    if table_exists("car_changes"):
+        return
+    car_changes = op.create_table(
+        "car_changes",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("car_id", sa.Integer(), nullable=False),
+        sa.Column("vin", sa.String(155), nullable=False),
+        sa.Column("op", sa.String(16), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    cars = sa.table("cars", sa.column("id"), sa.column("vin"))
+    op.execute(
+        car_changes.insert().from_select(
+            ["car_id", "vin", "op"],
+            sa.select(cars.c.id, cars.c.vin, sa.literal("upsert")).order_by(cars.c.id),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("car_changes")
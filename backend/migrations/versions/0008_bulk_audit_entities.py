@@ -0,0 +1,43 @@
+"""Entity lists on bulk audit rows
+
+Adds entity_ids and entity_keys to system_logs: a bulk_update / bulk_delete
+row covers a whole chunk of cars and lists their ids and VINs there, so the
+per-car audit lookups still find it. Rows written before this keep their VINs
+in the action text; `python -m migrations.backfill_audit_events` copies them
+into entity_keys.
+
+Revision ID: 0008_bulk_audit_entities
+Revises: 0007_car_changes
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from migrations.helpers import column_exists
+
+
+revision: str = "0008_bulk_audit_entities"
+down_revision: Union[str, None] = "0007_car_changes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ["entity_ids", "entity_keys"]
+
+checks = []
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: metadata-only on MySQL 8 and PostgreSQL
+    for name in COLUMNS:
+        if not column_exists("system_logs", name):
+            op.add_column(
+                "system_logs",
+                sa.Column(name, sa.Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=True),
+            )
+
+
+def downgrade() -> None:
+    for name in reversed(COLUMNS):
+        op.drop_column("system_logs", name)
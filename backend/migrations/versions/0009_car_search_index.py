@@ -0,0 +1,78 @@
+"""Text index for car search
+
+Builds what crud.car_search queries, which main.lifespan used to create at
+startup: a FULLTEXT index on MySQL, a pg_trgm GIN index on PostgreSQL and the
+cars_fts shadow table on SQLite. Databases that already have them are left
+alone.
+
+Revision ID: 0009_car_search_index
+Revises: 0008_bulk_audit_entities
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import select
+from crud.cars import build_car_filters
+from migrations.checks import IndexCheck
+from migrations.helpers import index_exists, table_exists
+from models.cars import Car
+
+
+revision: str = "0009_car_search_index"
+down_revision: Union[str, None] = "0008_bulk_audit_entities"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MYSQL_FULLTEXT_INDEX = "ix_cars_fulltext"
+POSTGRES_TRIGRAM_INDEX = "ix_cars_search_trgm"
+FTS_TABLE = "cars_fts"
+
+
+def _search_query(dialect: str):
+    # The search box query as read_cars builds it (also ORed with the VIN prefix match)
+    return lambda: select(Car).where(*build_car_filters(search="toyota vios", dialect=dialect)).limit(10)
+
+
+checks = [
+    IndexCheck("read_cars search (MySQL)", _search_query("mysql"), MYSQL_FULLTEXT_INDEX, dialects=("mysql", "mariadb")),
+    IndexCheck("read_cars search (PostgreSQL)", _search_query("postgresql"), POSTGRES_TRIGRAM_INDEX, dialects=("postgresql",)),
+    IndexCheck("read_cars search (SQLite)", _search_query("sqlite"), FTS_TABLE, dialects=("sqlite",)),
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        if not index_exists("cars", MYSQL_FULLTEXT_INDEX):
+            # InnoDB builds FULLTEXT in place but cannot take LOCK=NONE for it; reads carry on,
+            # writes to cars wait for the build
+            op.execute(
+                f"ALTER TABLE cars ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (make, model, color), "
+                f"ALGORITHM=INPLACE, LOCK=SHARED"
+            )
+    elif dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {POSTGRES_TRIGRAM_INDEX} ON cars "
+                f"USING gin ((make || ' ' || model || ' ' || color) gin_trgm_ops)"
+            )
+    elif dialect == "sqlite":
+        if not table_exists(FTS_TABLE):
+            op.execute(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(make, model, color)")
+            op.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, make, model, color) SELECT id, make, model, color FROM cars"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        if index_exists("cars", MYSQL_FULLTEXT_INDEX):
+            op.execute(f"ALTER TABLE cars DROP INDEX {MYSQL_FULLTEXT_INDEX}, ALGORITHM=INPLACE, LOCK=NONE")
+    elif dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {POSTGRES_TRIGRAM_INDEX}")
+    elif dialect == "sqlite":
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -0,0 +1,52 @@
+"""Unique VINs
+
+Replaces ix_cars_vin with the unique ux_cars_vin, so two writers (concurrent
+imports, or an import racing create_car) can no longer both insert one VIN
+after each checked it was free. The unique index is built online before the
+old one is dropped, so VIN lookups stay indexed throughout.
+
+Fails before building anything if the table already holds duplicate VINs;
+resolve those first.
+
+Revision ID: 0010_unique_car_vin
+Revises: 0009_car_search_index
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import select
+from migrations.checks import IndexCheck
+from migrations.helpers import create_index_online, drop_index_online
+from models.cars import Car
+
+
+revision: str = "0010_unique_car_vin"
+down_revision: Union[str, None] = "0009_car_search_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+checks = [
+    IndexCheck(
+        "read_car_by_vin",
+        lambda: select(Car).where(Car.vin == "1HGCM82633A004352"),
+        "ux_cars_vin",
+    ),
+]
+
+
+def upgrade() -> None:
+    cars = sa.table("cars", sa.column("vin"))
+    duplicates = op.get_bind().execute(
+        sa.select(cars.c.vin).group_by(cars.c.vin).having(sa.func.count() > 1).limit(10)
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"cars has duplicate VINs, e.g. {', '.join(duplicates)}; remove them and re-run")
+    create_index_online("ux_cars_vin", "cars", ["vin"], unique=True)
+    drop_index_online("ix_cars_vin", "cars")
+
+
+def downgrade() -> None:
+    create_index_online("ix_cars_vin", "cars", ["vin"])
+    drop_index_online("ux_cars_vin", "cars")
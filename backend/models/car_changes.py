@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+import datetime
+from models.base import Base
+
+
+class Car_Change(Base):
+    """Append-only change feed for cars: one row per insert, update or delete.
+
+    `id` is the change token clients sync from. There is deliberately no foreign
+    key to cars, so rows for deleted cars survive as tombstones.
+    """
+    __tablename__ = "car_changes"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    car_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    vin: Mapped[str] = mapped_column(String(155), nullable=False)
+    op: Mapped[str] = mapped_column(String(16), nullable=False)  # upsert, delete
+    changed_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Enum, func, Integer
+from sqlalchemy import Index, String, Enum, func, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from models.base import Base  # ADDED IMPORT
 import datetime
@@ -21,6 +21,17 @@ class CarStatus(enum.Enum):
 
 class Car(Base):
     __tablename__ = 'cars'
+    # Created online by migrations 0002_hot_path_indexes and 0010_unique_car_vin; declared here so create_all matches
+    __table_args__ = (
+        Index("ux_cars_vin", "vin", unique=True),
+        Index("ix_cars_status_id", "status", "id"),
+        Index("ix_cars_fuel_type_id", "fuel_type", "id"),
+        Index("ix_cars_transmission_type_id", "transmission_type", "id"),
+        Index("ix_cars_year_id", "year", "id"),
+        Index("ix_cars_status_fuel_type_transmission_type_year", "status", "fuel_type", "transmission_type", "year"),
+        Index("ix_cars_price", "price"),
+        Index("ix_cars_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
@@ -38,6 +49,9 @@ class Car(Base):
     fuel_type: Mapped[FuelType] = mapped_column(Enum(FuelType), nullable=False)
     status: Mapped[CarStatus] = mapped_column(Enum(CarStatus), default=CarStatus.AVAILABLE, nullable=False)
 
+    # Incremented by every UPDATE; backs the ETag / If-Match checks
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # Logging fields
     created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
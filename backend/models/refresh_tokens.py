@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, ForeignKey, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from typing import Optional
+import datetime
+from models.base import Base
+
+
+class Refresh_Token(Base):
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), index=True)
+    # HMAC-SHA256 of the token; the raw token is only ever held by the client
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    # Every token rotated from the same login shares a family, so reuse can revoke the whole chain
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    revoked_at: Mapped[Optional[datetime.datetime]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
@@ -1,5 +1,6 @@
 
-from sqlalchemy import Integer, ForeignKey, Text, func
+from sqlalchemy import Index, Integer, ForeignKey, String, Text, func
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
 import datetime
@@ -9,11 +10,32 @@ if TYPE_CHECKING:
     from .users import User
     
 class System_Log(Base):
+    # Range-partitioned by month on `timestamp` on PostgreSQL and MySQL (migration 0005,
+    # maintained by services.log_partitions); the database primary key there is (id, timestamp).
     __tablename__ = "system_logs"
+    __table_args__ = (
+        Index("ix_system_logs_timestamp_id", "timestamp", "id"),
+        # "What happened to car X / user Y", by id or by VIN / email
+        Index("ix_system_logs_entity_type_entity_id_id", "entity_type", "entity_id", "id"),
+        Index("ix_system_logs_entity_type_entity_key_id", "entity_type", "entity_key", "id"),
+        # One actor's history in time order (keyset pages with the user_id filter)
+        Index("ix_system_logs_user_id_timestamp_id", "user_id", "timestamp", "id"),
+        # "Everything user Y deleted"
+        Index("ix_system_logs_user_id_verb_id", "user_id", "verb", "id"),
+        Index("ix_system_logs_verb_id", "verb", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), index=True)
     action: Mapped[Optional[str]] = mapped_column(Text)
+    # Structured form of `action`; user_id is the actor. Null on rows the backfill could not parse.
+    verb: Mapped[Optional[str]] = mapped_column(String(32))  # create, update, delete, bulk_update, ...
+    entity_type: Mapped[Optional[str]] = mapped_column(String(32))  # car, user
+    entity_id: Mapped[Optional[int]] = mapped_column(Integer)
+    entity_key: Mapped[Optional[str]] = mapped_column(String(255))  # VIN or email
+    # Bulk rows cover a whole chunk: its ids and keys, comma-wrapped (",1,2,3,") so one can be matched with LIKE
+    entity_ids: Mapped[Optional[str]] = mapped_column(Text().with_variant(MEDIUMTEXT(), "mysql"))
+    entity_keys: Mapped[Optional[str]] = mapped_column(Text().with_variant(MEDIUMTEXT(), "mysql"))
     timestamp: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Enum, func
+from sqlalchemy import Index, Integer, String, Enum, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, List
 import enum
@@ -19,6 +19,9 @@ class AccountStatus(enum.Enum):
 
 class User(Base):
   __tablename__ = "users"
+  __table_args__ = (
+    Index("ix_users_type_status", "type", "status"),
+  )
 
   id: Mapped[int] = mapped_column(primary_key=True, index=True)
 
@@ -32,6 +35,10 @@ class User(Base):
 
   type: Mapped[AccountType] = mapped_column(Enum(AccountType), default=AccountType.MANAGER, nullable=False)
   status: Mapped[AccountStatus] = mapped_column(Enum(AccountStatus), default=AccountStatus.ACTIVE, nullable=False)
+  # Bumped whenever issued access tokens must stop working (password, status, type or email change)
+  token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+  # Incremented by every UPDATE; backs the ETag / If-Match checks
+  version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
   created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
   updated_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
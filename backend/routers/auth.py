@@ -1,12 +1,15 @@
 
 from datetime import timedelta
 from typing import Annotated
-from fastapi import  APIRouter, Depends, HTTPException, Response
-from sqlalchemy import select
+from fastapi import  APIRouter, Cookie, Depends, HTTPException, Response
 from schemas.users import UserInDB
 from models.users import User
-from models.system_logs import System_Log
-from dependencies import ACCESS_TOKEN_EXPIRE_MINUTES, AsyncSessionDep, authenticate_user, create_access_token, get_current_active_user, get_password_hash
+from dependencies import ACCESS_TOKEN_EXPIRE_MINUTES, AsyncSessionDep, authenticate_user, build_token_claims, create_access_token, get_current_active_user
+from services.token_revocation import STATELESS_AUTH
+from crud.users import insert_user, invalidate_user_read_caches, read_user_by_id, user_entity_cache
+from crud.refresh_tokens import REFRESH_TOKEN_EXPIRE_DAYS, issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from services.audit_log import record_audit_log
+from services.hashing import hash_password_async
 from schemas.auth import LoginRequest, Register
 from sqlalchemy.exc import IntegrityError
 
@@ -19,11 +22,40 @@ router = APIRouter(
   tags=["auth"],
 )
 
+def set_auth_cookies(response: Response, access_token: str, refresh_token: str):
+  response.set_cookie(
+    key="access_token",
+    value=access_token,
+    httponly=True,  # Prevents JavaScript access 
+    # DEV
+    secure=True,  
+    samesite="lax",
+      
+    max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60  # Convert minutes to seconds
+  )
+  response.set_cookie(
+    key="refresh_token",
+    value=refresh_token,
+    httponly=True,
+    secure=True,
+    samesite="strict",
+    path="/auth",  # Only sent to /auth/refresh and /auth/logout
+    max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+  )
+
+
 @router.get('/me', response_model=UserInDB)
 async def get_me(
   current_user: Annotated[User, Depends(get_current_active_user)],
-  
+  db: AsyncSessionDep,
 ):
+  if STATELESS_AUTH:
+    # Claims-only principals carry no profile fields. Looked up by id, which a
+    # still-valid token keeps across an email change; a removed user gets 401.
+    user = await read_user_by_id(current_user.id, db)
+    if user is None:
+      raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return user
   return current_user
   
 
@@ -35,46 +67,34 @@ async def login_for_access_token(
 ) -> dict:
   
   try:
-    async with db.begin():
-          # Use the async session and authenticate with email
-      user = await authenticate_user(db, login.email, login.password)
-      if not user:
-        raise HTTPException(
-          status_code=400,
-          detail="Incorrect email or password",
-          headers={"WWW-Authenticate": "Bearer"},
-        )
-      
-      access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-      access_token = create_access_token(
-        data={
-          "sub": user.email,
-          "user_type": user.type.value   # Convert enum to string value
-          },  # Use email as the subject
-        expires_delta=access_token_expires
+    # Authenticate outside the write transaction so the bcrypt check never holds a connection
+    user = await authenticate_user(db, login.email, login.password)
+    if not user:
+      raise HTTPException(
+        status_code=400,
+        detail="Incorrect email or password",
+        headers={"WWW-Authenticate": "Bearer"},
       )
-      
-      system_log = System_Log(
-        action=f"User {user.email} Logged in.",
-        user_id=user.id
-      )
-      
-      db.add(system_log)
-      await db.commit()
-      
-      response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,  # Prevents JavaScript access 
-        # DEV
-        secure=True,  
-        samesite="lax",
-          
-        max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60  # Convert minutes to seconds
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+      data=build_token_claims(user),  # Use email as the subject
+      expires_delta=access_token_expires
+    )
+    
+    async with db.begin():
+      record_audit_log(
+        db, f"User {user.email} Logged in.", user.id,
+        verb="login", entity_type="user", entity_id=user.id, entity_key=user.email,
       )
-      
-      return {"detail": "Successfully logged in"}
+      refresh_token = issue_refresh_token(db, user.id)
+    
+    set_auth_cookies(response, access_token, refresh_token)
+    
+    return {"detail": "Successfully logged in"}
 
+  except HTTPException:
+    raise
   except IntegrityError as e:
     await db.rollback()  
     raise HTTPException(status_code=400, detail=f"Database integrity error. {str(e)}")
@@ -89,7 +109,9 @@ async def register_user(
   register: Register,
   db: AsyncSessionDep
 ):
-  new_user = User(
+  # Hash before the transaction starts so the pool connection is not held during bcrypt
+  hashed_password = await hash_password_async(register.password)
+  values = dict(
     # Information
     firstname=register.firstname.upper(),
     middlename=register.middlename.upper() if register.middlename else None,
@@ -97,36 +119,30 @@ async def register_user(
     contact_num=register.contact_num if register.contact_num else None,
     # Credentials
     email=register.email,
-    password=get_password_hash(register.password),
+    password=hashed_password,
     # Account details
-    type=register.type,
+    type=register.type.value,
   )
   
-  system_log = System_Log(
-    action=f"User {register.email} registered successfully.",
-    user_id=0
-  )
-  check_existing_user_query = select(User).filter(User.email == register.email)
   try:
     async with db.begin():
-      
-      result = await db.execute(check_existing_user_query)
-      existing_user = result.scalar_one_or_none()
-      if existing_user:
+      # The unique email index decides, so two concurrent registrations cannot both succeed
+      new_user_id = await insert_user(db, values)
+      if new_user_id is None:
         raise HTTPException(
           status_code=400,
           detail="Email already registered"
         )
-      db.add(new_user)
-      await db.flush()
       
-      system_log = System_Log(
-        action=f"User {new_user.email} registered successfully.",
-        user_id=new_user.id
+      record_audit_log(
+        db, f"User {register.email} registered successfully.", new_user_id,
+        verb="register", entity_type="user", entity_id=new_user_id, entity_key=register.email,
       )
-      db.add(system_log)
-      await db.commit()
-      return {"detail": f"User successfully created."}
+    invalidate_user_read_caches()
+    await user_entity_cache.invalidate(new_user_id)
+    return {"detail": f"User successfully created."}
+  except HTTPException:
+    raise
   except IntegrityError as e:
     await db.rollback()  
     raise HTTPException(status_code=400, detail=f"Database integrity error. {str(e)}")
@@ -135,7 +151,33 @@ async def register_user(
     raise HTTPException(status_code=500, detail=f"An unexpected error occurred. {str(e)}")
   
   
+@router.post("/refresh")
+async def refresh_access_token(
+  response: Response,
+  db: AsyncSessionDep,
+  refresh_token: Annotated[str | None, Cookie()] = None,
+) -> dict:
+  """Issue a new access token from a refresh token, without bcrypt or an audit insert."""
+  if not refresh_token:
+    raise HTTPException(status_code=401, detail="Missing refresh token")
+
+  user, new_refresh_token = await rotate_refresh_token(db, refresh_token)
+  access_token = create_access_token(
+    data=build_token_claims(user),
+    expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+  )
+  set_auth_cookies(response, access_token, new_refresh_token)
+  return {"detail": "Successfully refreshed"}
+
+
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+  response: Response,
+  db: AsyncSessionDep,
+  refresh_token: Annotated[str | None, Cookie()] = None,
+):
+    if refresh_token:
+      await revoke_refresh_token(db, refresh_token)
     response.delete_cookie(key="access_token")
+    response.delete_cookie(key="refresh_token", path="/auth")
     return {"detail": "Successfully logged out"}
\ No newline at end of file
@@ -1,10 +1,18 @@
-from typing import Annotated, List, Optional
-from fastapi import  APIRouter, Depends
-from crud.cars import create_car, delete_car, read_car_by_id, read_cars, update_car_by_id
+from typing import Annotated, Literal, Optional
+from fastapi import  APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from crud.car_changes import CAR_CHANGES_MAX_LIMIT, read_car_changes
+from crud.car_import import CAR_IMPORT_BATCH_SIZE, import_cars, iter_lines, parse_csv_rows, parse_ndjson_rows
+from crud.cars import CAR_BULK_CHUNK_SIZE, CarSort, bulk_delete_cars, bulk_update_cars, car_entity_cache, count_cars, read_car_facets, create_car, delete_car, read_car_cached, read_car_version, read_car_list_state, read_cars, read_cars_by_cursor, read_cars_by_ids, update_car_by_id
+from crud.pagination import parse_batch_ids, parse_fields
 from dependencies import AsyncSessionDep, get_current_active_user
-from models.cars import CarStatus, FuelType, TransmissionType
+from models.cars import Car, CarStatus, FuelType, TransmissionType
 from models.users import User
-from schemas.cars import CarCreate, CarUpdate, CarInDB
+from schemas.cars import CarBulkResult, CarBulkSelection, CarBulkUpdate, CarChanges, CarCreate, CarFacets, CarImportResult, CarUpdate, CarInDB
+from schemas.batch_response import BatchResponse
+from schemas.paginated_response import PaginatedResponse
+from services.etags import entity_etag, etag_matches, if_match_versions, list_etag, not_modified, set_etag
+from services.json_response import serialize_page
+from services.result_cache import json_page_response, list_page_flight, result_cache
 
 
 router = APIRouter(
@@ -15,7 +23,7 @@ router = APIRouter(
   ]
 )
 
-@router.get("", response_model = List[CarInDB])
+@router.get("", response_model = PaginatedResponse[CarInDB])
 async def get_cars(
   db: AsyncSessionDep,
   current_user: Annotated[User, Depends(get_current_active_user)],
@@ -25,13 +33,112 @@ async def get_cars(
   transmission_type: Optional[TransmissionType] = None,
   status: Optional[CarStatus] = None,
   fuel_type: Optional[FuelType] = None,
+  search: Optional[str] = None,
+  cursor: Optional[str] = None,
+  sort: CarSort = "id",
+  fields: Optional[str] = Query(None, description="Comma-separated sparse fieldset, e.g. vin,make,model,price; id is always included"),
+  if_none_match: Annotated[Optional[str], Header()] = None,
+):
+  columns = parse_fields(fields, Car, CarInDB)
+  # Equivalent requests share one key: offset mode ignores cursor/sort, cursor mode ignores page
+  key = (
+    ("page_size", page_size),
+    ("page", page if cursor is None else None),
+    ("cursor", cursor),
+    ("sort", sort if cursor is not None else None),
+    ("year", year),
+    ("transmission_type", transmission_type.value if transmission_type else None),
+    ("status", status.value if status else None),
+    ("fuel_type", fuel_type.value if fuel_type else None),
+    ("search", search if search and search.strip() else None),
+    ("fields", tuple(column.key for column in columns) if columns else None),
+  )
+  # Read from the database before the page, so a write committed through any worker changes
+  # it; a write committing while this request runs leaves the tag one request behind at most
+  state = await read_car_list_state(db)
+  etag = list_etag(Car.__tablename__, key, state)
+  if etag_matches(if_none_match, etag):
+    return not_modified(etag)
+  # Same commit-ordered marker as the ETag, so a cached page goes stale with it
+  cached = result_cache.get(Car.__tablename__, key, state)
+  if cached is not None:
+    return json_page_response(cached, etag)
+
+  async def build_page() -> bytes:
+    total, total_is_estimate = await count_cars(
+      db=db,
+      year=year,
+      transmission_type=transmission_type,
+      status=status,
+      fuel_type=fuel_type,
+      search=search
+    )
+
+    # Passing `cursor` (empty for the first page) switches to keyset pagination
+    if cursor is not None:
+      cars, next_cursor = await read_cars_by_cursor(
+        db=db,
+        current_user=current_user,
+        cursor=cursor,
+        limit=page_size,
+        sort=sort,
+        year=year,
+        transmission_type=transmission_type,
+        status=status,
+        fuel_type=fuel_type,
+        search=search,
+        columns=columns,
+      )
+      page_data = {"data": cars, "total": total, "total_is_estimate": total_is_estimate, "next_cursor": next_cursor}
+    else:
+      cars = await read_cars(
+        db=db,
+        current_user=current_user,
+        offset=page * page_size,
+        limit=page_size,
+        year=year,
+        transmission_type=transmission_type,
+        status=status,
+        fuel_type=fuel_type,
+        search=search,
+        columns=columns,
+      )
+      page_data = {"data": cars, "total": total, "total_is_estimate": total_is_estimate}
+
+    payload = serialize_page(page_data, CarInDB, sparse=columns is not None)
+    result_cache.set(Car.__tablename__, key, state, payload)
+    return payload
+
+  # Identical concurrent misses share one count, one read and one serialization
+  payload = await list_page_flight.do((Car.__tablename__, key, state), build_page)
+  return json_page_response(payload, etag)
+
+
+# GET /api/cars:batch?ids=3,1,2
+@router.get(":batch", response_model=BatchResponse[CarInDB])
+async def get_cars_batch(
+  db: AsyncSessionDep,
+  ids: str,
+):
+  cars, missing = await read_cars_by_ids(
+    ids=parse_batch_ids(ids),
+    db=db,
+  )
+  return {"data": cars, "missing": missing}
+
+
+# Declared before /{id} so "facets" is not parsed as a car id
+@router.get("/facets", response_model=CarFacets)
+async def get_car_facets(
+  db: AsyncSessionDep,
+  year: Optional[int] = None,
+  transmission_type: Optional[TransmissionType] = None,
+  status: Optional[CarStatus] = None,
+  fuel_type: Optional[FuelType] = None,
   search: Optional[str] = None
 ):
-  return await read_cars(
+  return await read_car_facets(
     db=db,
-    current_user=current_user,
-    offset=page,
-    limit=page_size,
     year=year,
     transmission_type=transmission_type,
     status=status,
@@ -40,15 +147,54 @@ async def get_cars(
   )
 
 
+# Also before /{id}
+@router.get("/changes", response_model=CarChanges)
+async def get_car_changes(
+  db: AsyncSessionDep,
+  since: int = Query(0, ge=0),
+  limit: int = Query(500, ge=1, le=CAR_CHANGES_MAX_LIMIT),
+):
+  """Cars inserted, updated or deleted after change token `since`; 0 returns every car.
+
+  Keep calling with `next_token` while `has_more` is true to catch up.
+  """
+  return await read_car_changes(db=db, since=since, limit=limit)
+
+
 @router.get("/{id}", response_model=CarInDB)
 async def get_car_by_id(
   id: int,
+  response: Response,
   db: AsyncSessionDep,
+  if_none_match: Annotated[Optional[str], Header()] = None,
 ):
-  return await read_car_by_id(
+  version = None
+  if if_none_match:
+    # A revalidation reads just the version from the database: car_entity_cache is per worker
+    # and can lag a write made through another one until its TTL runs out
+    version = await read_car_version(id, db)
+    if version is None:
+      raise HTTPException(status_code=404, detail="Car not found")
+    etag = entity_etag(id, version)
+    if etag_matches(if_none_match, etag):
+      return not_modified(etag)
+
+  # The body is served from car_entity_cache when possible
+  car = await read_car_cached(
     id=id,
     db=db,
   )
+  if car is not None and version is not None and car["version"] != version:
+    await car_entity_cache.invalidate(id)
+    car = await read_car_cached(
+      id=id,
+      db=db,
+    )
+  if car is None:
+    raise HTTPException(status_code=404, detail="Car not found")
+  etag = entity_etag(id, car["version"])
+  set_etag(response, etag)
+  return car
 
 
 @router.post("", response_model = dict)
@@ -64,30 +210,91 @@ async def post_car(
   )
 
 
+@router.post("/import", response_model = CarImportResult)
+async def import_cars_route(
+  request: Request,
+  db: AsyncSessionDep,
+  current_user: Annotated[User, Depends(get_current_active_user)],
+  batch_size: Annotated[int, Query(ge=1, le=10000)] = CAR_IMPORT_BATCH_SIZE,
+  format: Optional[Literal["csv", "ndjson"]] = None,
+):
+  """Bulk-create cars from a CSV (with header) or NDJSON request body, streamed.
+
+  The format comes from `format`, else from the Content-Type (ndjson/json, otherwise CSV).
+  """
+  if format is None:
+    content_type = request.headers.get("content-type", "")
+    format = "ndjson" if "json" in content_type else "csv"
+
+  lines = iter_lines(request.stream())
+  rows = parse_ndjson_rows(lines) if format == "ndjson" else parse_csv_rows(lines)
+  return await import_cars(
+    db=db,
+    rows=rows,
+    current_user=current_user,
+    batch_size=batch_size
+  )
+
+
+# Declared before the /{id} routes so "bulk" is not parsed as a car id
+@router.patch("/bulk", response_model = CarBulkResult)
+async def patch_cars_bulk(
+  db: AsyncSessionDep,
+  car_bulk_update: CarBulkUpdate,
+  current_user: Annotated[User, Depends(get_current_active_user)],
+  chunk_size: Annotated[int, Query(ge=1, le=5000)] = CAR_BULK_CHUNK_SIZE,
+):
+  return await bulk_update_cars(
+    db=db,
+    car_bulk_update=car_bulk_update,
+    current_user=current_user,
+    chunk_size=chunk_size
+  )
+
+
+@router.delete("/bulk", response_model = CarBulkResult)
+async def delete_cars_bulk(
+  db: AsyncSessionDep,
+  selection: CarBulkSelection,
+  current_user: Annotated[User, Depends(get_current_active_user)],
+  chunk_size: Annotated[int, Query(ge=1, le=5000)] = CAR_BULK_CHUNK_SIZE,
+):
+  return await bulk_delete_cars(
+    db=db,
+    selection=selection,
+    current_user=current_user,
+    chunk_size=chunk_size
+  )
+
+
 @router.put('/{id}', response_model = dict)
 async def put_car(
   id: int,
   db: AsyncSessionDep,
   car_edit: CarUpdate,
-  current_user: Annotated[User, Depends(get_current_active_user)]
+  current_user: Annotated[User, Depends(get_current_active_user)],
+  if_match: Annotated[Optional[str], Header()] = None,
 ):
   
   return await update_car_by_id(
     id=id,
     db=db,
     car_edit=car_edit,
-    current_user=current_user
+    current_user=current_user,
+    expected_versions=if_match_versions(if_match, id)
   )
   
 @router.delete('/{id}', response_model = dict)
 async def delete_car_route(
   id: int,
   db: AsyncSessionDep,
-  current_user: Annotated[User, Depends(get_current_active_user)]
+  current_user: Annotated[User, Depends(get_current_active_user)],
+  if_match: Annotated[Optional[str], Header()] = None,
 ):
   
   return await delete_car(
     id=id,
     db=db,
-    current_user=current_user
+    current_user=current_user,
+    expected_versions=if_match_versions(if_match, id)
   )
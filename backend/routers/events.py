@@ -0,0 +1,77 @@
+import asyncio
+import os
+from typing import Annotated
+from dotenv import load_dotenv
+from fastapi import  APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from dependencies import get_current_active_user
+from models.users import AccountType, User
+from services.event_bus import TOPICS, SubscriberLimitReached, event_bus
+
+load_dotenv()
+
+# A comment line is sent after this long without events, so proxies keep the stream open
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+# Client reconnect delay, sent to EventSource as the SSE retry field
+EVENT_RETRY_MILLISECONDS = int(os.getenv("EVENT_RETRY_MILLISECONDS", "3000"))
+
+# Topics only admins may join
+ADMIN_TOPICS = {"logs"}
+
+
+router = APIRouter(
+  prefix="/api/events",
+  tags=["events"],
+  dependencies=[
+    Depends(get_current_active_user)
+  ]
+)
+
+@router.get("")
+async def stream_events(
+  current_user:  Annotated[User, Depends(get_current_active_user)],
+  topics: str = "cars",
+):
+  """Server-sent events for the comma-separated `topics` (cars, users, logs).
+
+  Each event names what changed (`{"topic", "type", "data": {"ids": [...]}, "at"}`);
+  clients refetch what they show instead of polling. A stream that falls behind
+  is ended with an `evicted` event, after which the client should reload and
+  reconnect.
+  """
+  requested = frozenset(topic.strip() for topic in topics.split(",") if topic.strip())
+  unknown = requested - set(TOPICS)
+  if not requested or unknown:
+    raise HTTPException(status_code=400, detail=f"Unknown topics {sorted(unknown)}; choose from {list(TOPICS)}.")
+  if requested & ADMIN_TOPICS and current_user.type != AccountType.ADMIN:
+    raise HTTPException(status_code=403, detail=f"Unauthorized Access")
+  if not event_bus.enabled:
+    raise HTTPException(status_code=503, detail="Live events are disabled.")
+  try:
+    subscription = event_bus.subscribe(requested)
+  except SubscriberLimitReached:
+    raise HTTPException(status_code=503, detail="Too many live connections; try again later.")
+
+  async def stream():
+    try:
+      yield f"retry: {EVENT_RETRY_MILLISECONDS}\n\n".encode()
+      while True:
+        try:
+          item = await subscription.get(EVENT_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+          yield b": keepalive\n\n"
+          continue
+        if item is None:
+          yield f"event: {subscription.closed}\ndata: {{}}\n\n".encode()
+          return
+        topic, payload = item
+        yield b"event: " + topic.encode() + b"\ndata: " + payload + b"\n\n"
+    finally:
+      # Runs on client disconnect too, when the response cancels this generator
+      event_bus.unsubscribe(subscription)
+
+  return StreamingResponse(
+    stream(),
+    media_type="text/event-stream",
+    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+  )
@@ -0,0 +1,45 @@
+from typing import Annotated
+from fastapi import  APIRouter, Depends, HTTPException
+from crud.cars import car_entity_cache, car_facet_cache
+from crud.pagination import count_cache
+from crud.users import user_entity_cache
+from dependencies import get_current_active_user
+from models.users import AccountType, User
+from services.audit_log import audit_log_writer
+from services.event_bus import event_bus
+from services.hashing import hashing_pool
+from services.log_partitions import log_partition_maintenance
+from services.principal_cache import principal_cache_stats
+from services.result_cache import result_cache
+from services.single_flight import single_flight_stats
+from services.token_revocation import token_versions
+
+
+router = APIRouter(
+  prefix="/api/metrics",
+  tags=["metrics"],
+  dependencies=[
+    Depends(get_current_active_user)
+  ]
+)
+
+@router.get("", response_model = dict)
+async def get_metrics(
+  current_user:  Annotated[User, Depends(get_current_active_user)],
+):
+  if current_user.type != AccountType.ADMIN:
+    raise HTTPException(status_code=403, detail=f"Unauthorized Access")
+  return {
+    "principal_cache": principal_cache_stats(),
+    "password_hashing": hashing_pool.stats(),
+    "token_versions": token_versions.stats(),
+    "count_cache": count_cache.stats(),
+    "car_facet_cache": car_facet_cache.stats(),
+    "car_entity_cache": car_entity_cache.stats(),
+    "user_entity_cache": user_entity_cache.stats(),
+    "list_result_cache": result_cache.stats(),
+    "single_flight": single_flight_stats(),
+    "audit_log": audit_log_writer.stats(),
+    "system_log_partitions": log_partition_maintenance.stats(),
+    "event_bus": event_bus.stats(),
+  }
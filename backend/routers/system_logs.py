@@ -1,9 +1,12 @@
-from typing import Annotated, List, Optional
-from fastapi import  APIRouter, Depends, HTTPException
-from crud.system_logs import read_system_logs
+import datetime
+from typing import Annotated, Optional
+from fastapi import  APIRouter, Depends, HTTPException, Query, Response
+from crud.system_logs import SYSTEM_LOG_MAX_PAGE_SIZE, count_system_logs, read_system_logs, read_system_logs_by_cursor
 from dependencies import AsyncSessionDep, get_current_active_user
 from models.users import AccountType, User
-from schemas.system_logs import SystemLogsInDB
+from schemas.system_logs import SystemLogFilter, SystemLogsInDB
+from schemas.paginated_response import PaginatedResponse
+from services.json_response import serialize_page
 
 
 router = APIRouter(
@@ -14,20 +17,57 @@ router = APIRouter(
   ]
 )
 
-@router.get("", response_model = List[SystemLogsInDB])
+@router.get("", response_model = PaginatedResponse[SystemLogsInDB])
 async def get_system_logs(
   db: AsyncSessionDep,
   current_user:  Annotated[User, Depends(get_current_active_user)],
   page: int = 0,
-  page_size: int = 10,
-  search: Optional[str] = None
+  page_size: int = Query(10, ge=1, le=SYSTEM_LOG_MAX_PAGE_SIZE),
+  cursor: Optional[str] = None,
+  search: Optional[str] = None,
+  user_id: Optional[int] = None,
+  verb: Optional[str] = None,
+  entity_type: Optional[str] = None,
+  entity_id: Optional[int] = None,
+  entity_key: Optional[str] = None,
+  date_from: Optional[datetime.datetime] = Query(None, alias="from"),
+  date_to: Optional[datetime.datetime] = Query(None, alias="to"),
 ):
   if current_user.type != AccountType.ADMIN:
     raise HTTPException(status_code=500, detail=f"Unauthorized Access") 
-  return await read_system_logs(
-    db=db,
-    current_user=current_user,
-    offset=page,
-    limit=page_size,
-    search=search
+  log_filter = SystemLogFilter(
+    search=search,
+    user_id=user_id,
+    verb=verb,
+    entity_type=entity_type,
+    entity_id=entity_id,
+    entity_key=entity_key,
+    date_from=date_from,
+    date_to=date_to,
   )
+
+  # Passing `cursor` (empty for the first page) switches to keyset pagination on
+  # (timestamp, id). Keyset pages are not counted, so their cost stays flat however
+  # far back they are; total is null.
+  if cursor is not None:
+    logs, next_cursor = await read_system_logs_by_cursor(
+      db=db,
+      current_user=current_user,
+      log_filter=log_filter,
+      cursor=cursor,
+      limit=page_size,
+    )
+    page_data = {"data": logs, "total": None, "next_cursor": next_cursor}
+  else:
+    logs = await read_system_logs(
+      db=db,
+      current_user=current_user,
+      log_filter=log_filter,
+      offset=page * page_size,
+      limit=page_size,
+    )
+    total, total_is_estimate = await count_system_logs(db=db, log_filter=log_filter)
+    page_data = {"data": logs, "total": total, "total_is_estimate": total_is_estimate}
+
+  # Serialized here rather than by response_model, which would validate every row a second time
+  return Response(content=serialize_page(page_data, SystemLogsInDB), media_type="application/json")
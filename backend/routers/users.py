@@ -1,9 +1,15 @@
-from typing import Annotated, List, Optional
-from fastapi import  APIRouter, Depends
-from crud.users import create_user, read_user_by_id, read_users, update_user_by_id
+from typing import Annotated, Optional
+from fastapi import  APIRouter, Depends, Header, HTTPException, Query, Response
+from crud.pagination import parse_batch_ids, parse_fields
+from crud.users import count_users, create_user, read_user_cached, read_user_version, read_user_list_state, read_users, read_users_by_ids, update_user_by_id, user_entity_cache
 from dependencies import AsyncSessionDep, get_current_active_user
 from models.users import AccountStatus, AccountType, User
 from schemas.users import UserCreate, UserUpdate, UserInDB
+from schemas.batch_response import BatchResponse
+from schemas.paginated_response import PaginatedResponse
+from services.etags import entity_etag, etag_matches, if_match_versions, list_etag, not_modified, set_etag
+from services.json_response import serialize_page
+from services.result_cache import json_page_response, list_page_flight, result_cache
 
 
 router = APIRouter(
@@ -14,7 +20,7 @@ router = APIRouter(
   ]
 )
 
-@router.get("", response_model = List[UserInDB])
+@router.get("", response_model = PaginatedResponse[UserInDB])
 async def get_users(
   db: AsyncSessionDep,
   current_user: Annotated[User, Depends(get_current_active_user)],
@@ -22,28 +28,107 @@ async def get_users(
   page_size: int = 10,
   type: Optional[AccountType] = None,
   status: Optional[AccountStatus] = None,
-  search: Optional[str] = None
+  search: Optional[str] = None,
+  fields: Optional[str] = Query(None, description="Comma-separated sparse fieldset, e.g. email,firstname,lastname; id is always included"),
+  if_none_match: Annotated[Optional[str], Header()] = None,
 ):
-  return await read_users(
+  columns = parse_fields(fields, User, UserInDB)
+  # The list excludes the caller, so the caller is part of the key
+  key = (
+    ("viewer", current_user.id),
+    ("page", page),
+    ("page_size", page_size),
+    ("type", type.value if type else None),
+    ("status", status.value if status else None),
+    ("search", search or None),
+    ("fields", tuple(column.key for column in columns) if columns else None),
+  )
+  # Read from the database before the page, so a write committed through any worker changes
+  # it; a write committing while this request runs leaves the tag one request behind at most
+  state = await read_user_list_state(db)
+  etag = list_etag(User.__tablename__, key, state)
+  if etag_matches(if_none_match, etag):
+    return not_modified(etag)
+  cached = result_cache.get(User.__tablename__, key, state)
+  if cached is not None:
+    return json_page_response(cached, etag)
+
+  async def build_page() -> bytes:
+    total, total_is_estimate = await count_users(
+      db=db,
+      current_user=current_user,
+      type=type,
+      status=status,
+      search=search
+    )
+    users = await read_users(
+      db=db,
+      current_user=current_user,
+      offset=page * page_size,
+      limit=page_size,
+      type=type,
+      status=status,
+      search=search,
+      columns=columns,
+    )
+    page_data = {"data": users, "total": total, "total_is_estimate": total_is_estimate}
+
+    payload = serialize_page(page_data, UserInDB, sparse=columns is not None)
+    result_cache.set(User.__tablename__, key, state, payload)
+    return payload
+
+  # Identical concurrent misses share one count, one read and one serialization
+  payload = await list_page_flight.do((User.__tablename__, key, state), build_page)
+  return json_page_response(payload, etag)
+
+
+# GET /api/users:batch?ids=3,1,2
+@router.get(":batch", response_model=BatchResponse[UserInDB])
+async def get_users_batch(
+  db: AsyncSessionDep,
+  ids: str,
+):
+  users, missing = await read_users_by_ids(
+    ids=parse_batch_ids(ids),
     db=db,
-    current_user=current_user,
-    offset=page,
-    limit=page_size,
-    type=type,
-    status=status,
-    search=search
   )
+  return {"data": users, "missing": missing}
 
 
 @router.get("/{id}", response_model=UserInDB)
 async def get_user_by_id(
   id: int,
+  response: Response,
   db: AsyncSessionDep,
+  if_none_match: Annotated[Optional[str], Header()] = None,
 ):
-  return await read_user_by_id(
+  version = None
+  if if_none_match:
+    # A revalidation reads just the version from the database: user_entity_cache is per worker
+    # and can lag a write made through another one until its TTL runs out
+    version = await read_user_version(id, db)
+    if version is None:
+      raise HTTPException(status_code=404, detail="User not found")
+    etag = entity_etag(id, version)
+    if etag_matches(if_none_match, etag):
+      return not_modified(etag)
+
+  # The body is served from user_entity_cache when possible
+  user = await read_user_cached(
     id=id,
     db=db,
   )
+  if user is not None and version is not None and user["version"] != version:
+    await user_entity_cache.invalidate(id)
+    user = await read_user_cached(
+      id=id,
+      db=db,
+    )
+  if user is None:
+    raise HTTPException(status_code=404, detail="User not found")
+  etag = entity_etag(id, user["version"])
+  set_etag(response, etag)
+  return user
 
 @router.post("", response_model = dict)
 async def post_user(
@@ -63,12 +148,14 @@ async def put_user(
   id: int,
   db: AsyncSessionDep,
   current_user: Annotated[User, Depends(get_current_active_user)],
-  user_edit: UserUpdate
+  user_edit: UserUpdate,
+  if_match: Annotated[Optional[str], Header()] = None,
 ):
   
   return await update_user_by_id(
     id=id,
     db=db,
     current_user=current_user,
-    user_edit=user_edit
+    user_edit=user_edit,
+    expected_versions=if_match_versions(if_match, id)
   )
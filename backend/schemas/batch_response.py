@@ -0,0 +1,12 @@
+from typing import Generic, TypeVar, List
+
+from pydantic import BaseModel
+
+
+
+T = TypeVar("T")
+
+# Rows fetched by id in one call
+class BatchResponse(BaseModel, Generic[T]):
+    data: List[T]  # Found rows, in the order their ids were requested
+    missing: List[int]  # Requested ids with no row
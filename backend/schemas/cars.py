@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from enum import Enum
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 class TransmissionType(str, Enum):
   MANUAL = "MANUAL"
@@ -55,4 +55,75 @@ class CarInDB(CarBase):
 
   model_config = {
     "from_attributes": True
-  }
\ No newline at end of file
+  }
+
+class CarTombstone(BaseModel):
+  id: int
+  vin: str
+
+class CarChanges(BaseModel):
+  changed: List[CarInDB]
+  deleted: List[CarTombstone]
+  # Pass back as `since`; never goes backwards
+  next_token: int
+  has_more: bool
+
+class CarFacets(BaseModel):
+  total: int
+  year: Dict[str, int]
+  transmission_type: Dict[str, int]
+  status: Dict[str, int]
+  fuel_type: Dict[str, int]
+
+
+class CarImportError(BaseModel):
+  line: int
+  vin: Optional[str] = None
+  error: str
+
+class CarImportResult(BaseModel):
+  received: int
+  inserted: int
+  rejected: int
+  errors: List[CarImportError]
+  elapsed_seconds: float
+  rows_per_second: float
+
+class CarBulkFilter(BaseModel):
+  year: Optional[int] = None
+  make: Optional[str] = None
+  transmission_type: Optional[TransmissionType] = None
+  status: Optional[CarStatus] = None
+  fuel_type: Optional[FuelType] = None
+  search: Optional[str] = None
+
+class CarBulkSelection(BaseModel):
+  # Exactly one of the two: explicit ids, or every car matching the filter
+  ids: Optional[List[int]] = None
+  filter: Optional[CarBulkFilter] = None
+
+  @model_validator(mode="after")
+  def check_selection(self):
+    if (self.ids is None) == (self.filter is None):
+      raise ValueError("Provide either ids or filter")
+    if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+      raise ValueError("filter must set at least one field")
+    return self
+
+class CarBulkUpdate(CarBulkSelection):
+  status: Optional[CarStatus] = None
+  price: Optional[int] = None
+  price_change_percent: Optional[float] = None
+
+  @model_validator(mode="after")
+  def check_changes(self):
+    if self.status is None and self.price is None and self.price_change_percent is None:
+      raise ValueError("Nothing to update")
+    if self.price is not None and self.price_change_percent is not None:
+      raise ValueError("Use either price or price_change_percent")
+    return self
+
+class CarBulkResult(BaseModel):
+  affected: int
+  chunks: int
+  elapsed_seconds: float
@@ -1,5 +1,5 @@
 
-from typing import Generic, TypeVar, List
+from typing import Generic, Optional, TypeVar, List
 
 from pydantic import BaseModel
 
@@ -10,4 +10,6 @@ T = TypeVar("T")
 # Create a generic pagination schema
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]  # List of items of type T
-    total: int  # Total number of items
\ No newline at end of file
+    total: Optional[int]  # Total number of items; None when the endpoint skips counting
+    total_is_estimate: bool = False  # True when total comes from planner statistics
+    next_cursor: Optional[str] = None  # Only set in keyset mode; None on the last page
@@ -14,4 +14,23 @@ class SystemLogUpdate(SystemLogsBase):
 
 class SystemLogsInDB(SystemLogsBase):
   id: int
-  updated_at: datetime
\ No newline at end of file
+  updated_at: datetime
+  verb: Optional[str] = None
+  entity_type: Optional[str] = None
+  entity_id: Optional[int] = None
+  entity_key: Optional[str] = None
+  entity_ids: Optional[str] = None
+  entity_keys: Optional[str] = None
+
+
+class SystemLogFilter(BaseModel):
+  """Filters for the system log list; every one but `search` is served by an index."""
+  search: Optional[str] = None
+  user_id: Optional[int] = None
+  verb: Optional[str] = None
+  entity_type: Optional[str] = None
+  entity_id: Optional[int] = None
+  entity_key: Optional[str] = None
+  # Half-open range on timestamp: date_from <= timestamp < date_to
+  date_from: Optional[datetime] = None
+  date_to: Optional[datetime] = None
@@ -5,4 +5,8 @@ class Token(BaseModel):
   token_type: str
 
 class TokenData(BaseModel):
-  email: str | None = None
\ No newline at end of file
+  email: str | None = None
+  user_id: int | None = None
+  user_type: str | None = None
+  status: str | None = None
+  token_version: int | None = None
\ No newline at end of file
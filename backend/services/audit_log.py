@@ -0,0 +1,256 @@
+import asyncio
+import datetime
+import os
+import time
+from collections import deque
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import async_session
+from models.system_logs import System_Log
+from services.event_bus import event_bus
+from services.hashing import percentile
+
+load_dotenv()
+
+# "sync" writes each log row in the business transaction; "async" queues it and inserts in batches
+AUDIT_LOG_MODE = os.getenv("AUDIT_LOG_MODE", "sync").lower()
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "500"))
+AUDIT_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+# Past this many queued rows, new ones are written in-transaction again instead of growing the queue
+AUDIT_LOG_MAX_QUEUE = int(os.getenv("AUDIT_LOG_MAX_QUEUE", "10000"))
+# Failed batch inserts retried (one per flush interval) before the batch is written row by row
+AUDIT_LOG_FLUSH_RETRIES = int(os.getenv("AUDIT_LOG_FLUSH_RETRIES", "3"))
+
+# session.info key holding rows recorded in the open transaction
+_PENDING = "audit_log_pending"
+# session.info key holding rows to announce on the "logs" topic once the transaction commits
+_UNPUBLISHED = "audit_log_unpublished"
+
+
+class AuditLogWriter:
+  """Buffers committed audit rows and inserts them in multi-row batches.
+
+  Rows join the queue only when the transaction that recorded them commits, so a
+  rolled back request leaves no log behind. A flush runs when the queue reaches
+  `batch_size` or every `flush_interval` seconds. Rows carry the time they were
+  recorded (see audit_row), not the time they were flushed.
+
+  A batch that fails to insert is retried `flush_retries` times; after that its
+  rows are inserted one at a time and any row that still fails is logged and
+  dropped, so one bad row cannot stall the queue behind it.
+  """
+
+  def __init__(
+    self,
+    mode: str,
+    batch_size: int,
+    flush_interval: float,
+    max_queue: int,
+    flush_retries: int = AUDIT_LOG_FLUSH_RETRIES,
+    sample_size: int = 1024,
+  ):
+    self.mode = mode
+    self.batch_size = max(1, batch_size)
+    self.flush_interval = flush_interval
+    self.max_queue = max_queue
+    self.flush_retries = max(0, flush_retries)
+    # Failed attempts of the batch at the front of the queue
+    self._attempts = 0
+    self._queue: deque[dict] = deque()
+    self._wakeup: asyncio.Event | None = None
+    self._task: asyncio.Task | None = None
+
+    self.enqueued = 0
+    self.flushed = 0
+    self.flushes = 0
+    self.flush_failures = 0
+    self.overflowed = 0
+    self.dead_lettered = 0
+    self._flush_ms = deque(maxlen=sample_size)
+
+  def record(self, db: AsyncSession, rows: list[dict]):
+    """Log `rows` for the transaction open on `db`, in whichever mode is configured."""
+    if event_bus.enabled:
+      db.info.setdefault(_UNPUBLISHED, []).extend(rows)
+    pending = db.info.get(_PENDING, ())
+    if self.mode != "async" or len(self._queue) + len(pending) + len(rows) > self.max_queue:
+      if self.mode == "async":
+        self.overflowed += len(rows)
+      db.add_all([System_Log(**row) for row in rows])
+      return
+    db.info.setdefault(_PENDING, []).extend(rows)
+
+  def _enqueue(self, rows: list[dict]):
+    self._queue.extend(rows)
+    self.enqueued += len(rows)
+    if self._wakeup is not None and len(self._queue) >= self.batch_size:
+      self._wakeup.set()
+
+  async def flush(self) -> bool:
+    """Insert up to one batch; False when it failed and went back to the front of the queue."""
+    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+    if not batch:
+      return True
+
+    started = time.perf_counter()
+    try:
+      async with async_session() as db:
+        await db.execute(insert(System_Log), batch)
+        await db.commit()
+    except Exception as e:
+      self.flush_failures += 1
+      self._attempts += 1
+      print(f"Audit log flush failed (attempt {self._attempts}): {e}")
+      if self._attempts <= self.flush_retries:
+        self._queue.extendleft(reversed(batch))
+        return False
+      self._attempts = 0
+      await self._flush_rows(batch)
+      return True
+
+    self._attempts = 0
+    self._flush_ms.append((time.perf_counter() - started) * 1000)
+    self.flushed += len(batch)
+    self.flushes += 1
+    return True
+
+  async def _flush_rows(self, rows: list[dict]):
+    """Insert a batch that keeps failing one row at a time; rows that still fail are logged and dropped."""
+    async with async_session() as db:
+      for row in rows:
+        try:
+          await db.execute(insert(System_Log), [row])
+          await db.commit()
+          self.flushed += 1
+        except Exception as e:
+          await db.rollback()
+          self.dead_lettered += 1
+          print(f"Audit log row dropped: {e}; row: {row}")
+
+  async def _run(self):
+    while True:
+      try:
+        await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+      except asyncio.TimeoutError:
+        pass
+      self._wakeup.clear()
+      while self._queue and await self.flush():
+        pass
+
+  def start(self):
+    if self.mode == "async" and self._task is None:
+      self._wakeup = asyncio.Event()
+      self._task = asyncio.create_task(self._run())
+
+  async def stop(self):
+    """Stop the flusher and write out whatever is still queued."""
+    if self._task is not None:
+      self._task.cancel()
+      try:
+        await self._task
+      except asyncio.CancelledError:
+        pass
+      self._task = None
+    # Ends: a batch that keeps failing is written row by row (or dropped) after its retries
+    while self._queue:
+      await self.flush()
+
+  def stats(self) -> dict:
+    return {
+      "mode": self.mode,
+      "queue_depth": len(self._queue),
+      "max_queue": self.max_queue,
+      "batch_size": self.batch_size,
+      "flush_interval_seconds": self.flush_interval,
+      "enqueued": self.enqueued,
+      "flushed": self.flushed,
+      "flushes": self.flushes,
+      "flush_failures": self.flush_failures,
+      "flush_retries": self.flush_retries,
+      "dead_lettered": self.dead_lettered,
+      "overflowed_to_sync": self.overflowed,
+      "flush_ms_p50": round(percentile(self._flush_ms, 0.50), 3),
+      "flush_ms_p95": round(percentile(self._flush_ms, 0.95), 3),
+    }
+
+
+audit_log_writer = AuditLogWriter(
+  mode=AUDIT_LOG_MODE,
+  batch_size=AUDIT_LOG_BATCH_SIZE,
+  flush_interval=AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+  max_queue=AUDIT_LOG_MAX_QUEUE,
+)
+
+
+def audit_row(
+  action: str,
+  user_id: int,
+  verb: str,
+  entity_type: str,
+  entity_id: Optional[int] = None,
+  entity_key: Optional[str] = None,
+  entity_ids: Optional[list[int]] = None,
+  entity_keys: Optional[list[str]] = None,
+) -> dict:
+  """One system_logs row. `user_id` is the actor; `action` stays as the human-readable summary.
+
+  A bulk change passes the chunk's `entity_ids` / `entity_keys` instead of one entity.
+  The timestamp is taken here, when the event is recorded, so rows queued in async
+  mode keep the time of the event. Every key is always present so queued rows can
+  share one executemany INSERT.
+  """
+  return {
+    # Naive UTC, the same clock as the database's now() (database.py sets the session to UTC)
+    "timestamp": datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+    "action": action,
+    "user_id": user_id,
+    "verb": verb,
+    "entity_type": entity_type,
+    "entity_id": entity_id,
+    "entity_key": entity_key,
+    "entity_ids": _entity_list(entity_ids),
+    "entity_keys": _entity_list(entity_keys),
+  }
+
+
+def _entity_list(values: Optional[list]) -> Optional[str]:
+  """",1,2,3,": comma-wrapped so the lookups can match one entry with LIKE '%,2,%'."""
+  if not values:
+    return None
+  return "," + ",".join(str(value) for value in values) + ","
+
+
+def record_audit_log(
+  db: AsyncSession,
+  action: str,
+  user_id: int,
+  verb: str,
+  entity_type: str,
+  entity_id: Optional[int] = None,
+  entity_key: Optional[str] = None,
+  entity_ids: Optional[list[int]] = None,
+  entity_keys: Optional[list[str]] = None,
+):
+  audit_log_writer.record(
+    db, [audit_row(action, user_id, verb, entity_type, entity_id, entity_key, entity_ids, entity_keys)]
+  )
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session: Session):
+  rows = session.info.pop(_PENDING, None)
+  if rows:
+    audit_log_writer._enqueue(rows)
+  published = session.info.pop(_UNPUBLISHED, None)
+  if published:
+    # One event per transaction; a bulk change arrives as one batch of rows
+    event_bus.publish("logs", "created", {"rows": published})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session):
+  session.info.pop(_PENDING, None)
+  session.info.pop(_UNPUBLISHED, None)
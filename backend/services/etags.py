@@ -0,0 +1,80 @@
+import hashlib
+from typing import Hashable, Iterable, Optional
+from fastapi import HTTPException, Response
+
+# Browsers store the response but revalidate with If-None-Match before every reuse
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+# Per-process write counters, for caches that only need to see this process's writes
+_table_generations: dict[str, int] = {}
+
+
+def bump_generation(table: str):
+  """Record that `table` changed in this process."""
+  _table_generations[table] = _table_generations.get(table, 0) + 1
+
+
+def table_generation(table: str) -> int:
+  return _table_generations.get(table, 0)
+
+
+def list_etag(table: str, params: Iterable[tuple[str, str]], state: Hashable) -> str:
+  """ETag for a list query: the table's change marker plus the normalized query.
+
+  `state` must be read from the database (see read_car_list_state), never from
+  process memory, so a write through any worker changes the tag on every worker.
+  """
+  normalized = "&".join(f"{key}={value}" for key, value in sorted(params))
+  digest = hashlib.blake2b(
+    f"{table}:{state}:{normalized}".encode(),
+    digest_size=12,
+  ).hexdigest()
+  return f'"{digest}"'
+
+
+def entity_etag(id: int, version: int) -> str:
+  return f'"{id}.{version}"'
+
+
+def set_etag(response: Response, etag: str):
+  response.headers["ETag"] = etag
+  response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+  return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def _split_etags(header: str) -> list[str]:
+  return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+  """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+  if not if_none_match:
+    return False
+  for tag in _split_etags(if_none_match):
+    if tag == "*" or tag.removeprefix("W/") == etag:
+      return True
+  return False
+
+
+def if_match_versions(if_match: Optional[str], id: int) -> Optional[list[int]]:
+  """Row versions an If-Match header allows for entity `id`.
+
+  None means no precondition (header absent or "*"). A tag that names another
+  entity or is not one of ours can never match, so the request fails with 412.
+  """
+  if not if_match or if_match.strip() == "*":
+    return None
+  versions = []
+  for tag in _split_etags(if_match):
+    # If-Match uses strong comparison, so weak tags never match
+    if tag.startswith("W/"):
+      continue
+    entity_id, _, version = tag.strip('"').partition(".")
+    if entity_id == str(id) and version.isdigit():
+      versions.append(int(version))
+  if not versions:
+    raise HTTPException(status_code=412, detail="Precondition Failed")
+  return versions
@@ -0,0 +1,295 @@
+import asyncio
+import datetime
+import json
+import os
+from collections import defaultdict
+from typing import AsyncIterator, Callable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "local" fans out within this process; "broker" goes through an EventBrokerClient (see below); "off" disables
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "local").lower()
+# Events buffered per subscriber; a subscriber that falls this far behind is evicted
+EVENT_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "256"))
+EVENT_MAX_SUBSCRIBERS = int(os.getenv("EVENT_MAX_SUBSCRIBERS", "1000"))
+# Events waiting to be sent to the broker; past this they are dropped (and counted)
+EVENT_BROKER_QUEUE_SIZE = int(os.getenv("EVENT_BROKER_QUEUE_SIZE", "10000"))
+EVENT_BROKER_CHANNEL = os.getenv("EVENT_BROKER_CHANNEL", "app_events")
+
+TOPICS = ("cars", "users", "logs")
+
+
+class SubscriberLimitReached(Exception):
+  pass
+
+
+class Subscription:
+  """One listener's bounded queue of encoded events, for the topics it joined."""
+
+  def __init__(self, topics: frozenset[str], max_queue: int):
+    self.topics = topics
+    self.queue: asyncio.Queue[Optional[tuple[str, bytes]]] = asyncio.Queue(maxsize=max_queue)
+    # Why the subscription ended: "evicted", "shutdown", or None while it is live
+    self.closed: Optional[str] = None
+
+  def offer(self, topic: str, payload: bytes) -> bool:
+    """Queue an event without waiting; False when the queue is full."""
+    try:
+      self.queue.put_nowait((topic, payload))
+      return True
+    except asyncio.QueueFull:
+      return False
+
+  def close(self, reason: str):
+    """Drop what is still queued and wake the reader with the end-of-stream marker."""
+    self.closed = reason
+    while not self.queue.empty():
+      self.queue.get_nowait()
+    self.queue.put_nowait(None)
+
+  async def get(self, timeout: float) -> Optional[tuple[str, bytes]]:
+    """Next (topic, payload), or None once closed. Raises asyncio.TimeoutError when idle."""
+    return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+
+
+class EventFanout:
+  """Carries published events to every process's `deliver`. Never blocks the publisher."""
+
+  deliver: Optional[Callable[[str, bytes], None]] = None
+
+  def start(self, deliver: Callable[[str, bytes], None]):
+    self.deliver = deliver
+
+  def publish(self, topic: str, payload: bytes):
+    raise NotImplementedError
+
+  async def stop(self):
+    pass
+
+  def stats(self) -> dict:
+    return {}
+
+
+class LocalFanout(EventFanout):
+  """Single process: events go straight to this process's subscribers."""
+
+  def publish(self, topic: str, payload: bytes):
+    if self.deliver is not None:
+      self.deliver(topic, payload)
+
+
+class EventBrokerClient:
+  """The two calls a cross-worker pub/sub broker must offer.
+
+  A Redis adapter maps them onto PUBLISH and SUBSCRIBE; every subscriber,
+  including the publishing process, receives each message once.
+  """
+
+  async def publish(self, channel: str, message: bytes):
+    raise NotImplementedError
+
+  def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+    raise NotImplementedError
+
+
+class LocalBrokerClient(EventBrokerClient):
+  """In-process stand-in for a pub/sub broker, for development and single-worker runs.
+
+  Messages only ever cross it as bytes, so anything that works here works against
+  a real broker.
+  """
+
+  def __init__(self):
+    self._channels: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+  async def publish(self, channel: str, message: bytes):
+    for queue in self._channels[channel]:
+      queue.put_nowait(message)
+
+  async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+    queue: asyncio.Queue[bytes] = asyncio.Queue()
+    self._channels[channel].add(queue)
+    try:
+      while True:
+        yield await queue.get()
+    finally:
+      self._channels[channel].discard(queue)
+
+
+class BrokerFanout(EventFanout):
+  """Shares events between workers through an EventBrokerClient.
+
+  Publishing only queues the event; a sender task forwards the queue to the
+  broker and a receiver task delivers what the broker sends back, this
+  process's own events included, so every worker sees every event once.
+  """
+
+  def __init__(self, client: EventBrokerClient, channel: str = EVENT_BROKER_CHANNEL, max_queue: int = EVENT_BROKER_QUEUE_SIZE):
+    self.client = client
+    self.channel = channel
+    self.max_queue = max_queue
+    self._outgoing: asyncio.Queue[bytes] | None = None
+    self._tasks: list[asyncio.Task] = []
+    self.sent = 0
+    self.received = 0
+    self.dropped = 0
+    self.failures = 0
+
+  def start(self, deliver: Callable[[str, bytes], None]):
+    super().start(deliver)
+    if not self._tasks:
+      self._outgoing = asyncio.Queue(maxsize=self.max_queue)
+      self._tasks = [asyncio.create_task(self._send()), asyncio.create_task(self._receive())]
+
+  def publish(self, topic: str, payload: bytes):
+    if self._outgoing is None:
+      return
+    try:
+      self._outgoing.put_nowait(topic.encode() + b"\n" + payload)
+    except asyncio.QueueFull:
+      self.dropped += 1
+
+  async def _send(self):
+    while True:
+      message = await self._outgoing.get()
+      try:
+        await self.client.publish(self.channel, message)
+        self.sent += 1
+      except Exception as e:
+        self.failures += 1
+        print(f"Event broker publish failed: {e}")
+
+  async def _receive(self):
+    while True:
+      try:
+        async for message in self.client.subscribe(self.channel):
+          topic, _, payload = message.partition(b"\n")
+          self.received += 1
+          self.deliver(topic.decode(), payload)
+      except Exception as e:
+        self.failures += 1
+        print(f"Event broker subscription failed: {e}")
+        await asyncio.sleep(1)
+
+  async def stop(self):
+    for task in self._tasks:
+      task.cancel()
+    for task in self._tasks:
+      try:
+        await task
+      except asyncio.CancelledError:
+        pass
+    self._tasks = []
+    self._outgoing = None
+
+  def stats(self) -> dict:
+    return {
+      "client": type(self.client).__name__,
+      "outgoing": self._outgoing.qsize() if self._outgoing is not None else 0,
+      "sent": self.sent,
+      "received": self.received,
+      "dropped": self.dropped,
+      "failures": self.failures,
+    }
+
+
+class EventBus:
+  """Topic rooms of subscribers, fed by write paths after they commit.
+
+  Each event is encoded once and the same bytes are queued for every
+  subscriber in its room. Publishing never waits on a subscriber: one whose
+  queue is full is evicted (its stream ends and the client reconnects and
+  reloads) rather than slowing writes or growing without bound.
+  """
+
+  def __init__(self, fanout: Optional[EventFanout], max_queue: int, max_subscribers: int):
+    self.fanout = fanout
+    self.max_queue = max_queue
+    self.max_subscribers = max_subscribers
+    self._rooms: dict[str, set[Subscription]] = {topic: set() for topic in TOPICS}
+    self._subscriptions: set[Subscription] = set()
+    self.published = 0
+    self.delivered = 0
+    self.evicted = 0
+
+  @property
+  def enabled(self) -> bool:
+    return self.fanout is not None
+
+  def start(self):
+    if self.fanout is not None:
+      self.fanout.start(self._deliver)
+
+  async def stop(self):
+    """End every open stream, then stop the fanout."""
+    for subscription in list(self._subscriptions):
+      self.unsubscribe(subscription)
+      subscription.close("shutdown")
+    if self.fanout is not None:
+      await self.fanout.stop()
+
+  def subscribe(self, topics: frozenset[str]) -> Subscription:
+    if len(self._subscriptions) >= self.max_subscribers:
+      raise SubscriberLimitReached()
+    subscription = Subscription(topics, self.max_queue)
+    self._subscriptions.add(subscription)
+    for topic in topics:
+      self._rooms[topic].add(subscription)
+    return subscription
+
+  def unsubscribe(self, subscription: Subscription):
+    self._subscriptions.discard(subscription)
+    for topic in subscription.topics:
+      self._rooms[topic].discard(subscription)
+
+  def publish(self, topic: str, type: str, data: dict):
+    """Announce a committed change; call only after the transaction that made it commits."""
+    if self.fanout is None:
+      return
+    event = {
+      "topic": topic,
+      "type": type,
+      "data": data,
+      "at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    self.published += 1
+    self.fanout.publish(topic, json.dumps(event, separators=(",", ":"), default=str).encode())
+
+  def _deliver(self, topic: str, payload: bytes):
+    for subscription in list(self._rooms.get(topic, ())):
+      if subscription.offer(topic, payload):
+        self.delivered += 1
+      else:
+        self.unsubscribe(subscription)
+        subscription.close("evicted")
+        self.evicted += 1
+
+  def stats(self) -> dict:
+    return {
+      "backend": EVENT_BUS_BACKEND,
+      "subscribers": len(self._subscriptions),
+      "max_subscribers": self.max_subscribers,
+      "rooms": {topic: len(members) for topic, members in self._rooms.items()},
+      "queue_size": self.max_queue,
+      "published": self.published,
+      "delivered": self.delivered,
+      "evicted": self.evicted,
+      "fanout": self.fanout.stats() if self.fanout is not None else None,
+    }
+
+
+def _default_fanout() -> Optional[EventFanout]:
+  if EVENT_BUS_BACKEND == "off":
+    return None
+  if EVENT_BUS_BACKEND == "broker":
+    # Swap in a networked client (e.g. Redis pub/sub) here for multi-worker deployments
+    return BrokerFanout(LocalBrokerClient())
+  return LocalFanout()
+
+
+event_bus = EventBus(
+  fanout=_default_fanout(),
+  max_queue=EVENT_SUBSCRIBER_QUEUE_SIZE,
+  max_subscribers=EVENT_MAX_SUBSCRIBERS,
+)
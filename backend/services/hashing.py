@@ -0,0 +1,120 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+load_dotenv()
+
+# "thread" is enough because bcrypt releases the GIL; "process" isolates it completely
+HASHING_EXECUTOR = os.getenv("HASHING_EXECUTOR", "thread").lower()
+HASHING_WORKERS = int(os.getenv("HASHING_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Calls allowed to wait for a free worker before new ones are rejected with 503
+HASHING_MAX_QUEUE = int(os.getenv("HASHING_MAX_QUEUE", "32"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+  return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+  return pwd_context.verify(plain_password, hashed_password)
+
+
+def _timed(fn, *args):
+  # Wall clock, so the start time is comparable when this runs in a child process
+  return time.time(), fn(*args)
+
+
+def percentile(samples, fraction: float) -> float:
+  if not samples:
+    return 0.0
+  ordered = sorted(samples)
+  return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class HashingPool:
+  """Runs bcrypt off the event loop on a fixed number of workers with a bounded wait queue."""
+
+  def __init__(self, kind: str, workers: int, max_queue: int, sample_size: int = 1024):
+    self.kind = kind
+    self.workers = max(1, workers)
+    self.max_queue = max(0, max_queue)
+    self._executor: Executor | None = None
+
+    self.in_flight = 0
+    self.completed = 0
+    self.rejected = 0
+    self._queue_wait_ms = deque(maxlen=sample_size)
+    self._latency_ms = deque(maxlen=sample_size)
+
+  def _get_executor(self) -> Executor:
+    if self._executor is None:
+      if self.kind == "process":
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+      else:
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+    return self._executor
+
+  async def run(self, fn, *args):
+    if self.in_flight >= self.workers + self.max_queue:
+      self.rejected += 1
+      raise HTTPException(
+        status_code=503,
+        detail="Server is busy, please try again shortly.",
+        headers={"Retry-After": "1"},
+      )
+
+    self.in_flight += 1
+    submitted = time.time()
+    try:
+      loop = asyncio.get_running_loop()
+      started, result = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+    finally:
+      self.in_flight -= 1
+
+    finished = time.time()
+    self.completed += 1
+    self._queue_wait_ms.append(max(0.0, started - submitted) * 1000)
+    self._latency_ms.append((finished - submitted) * 1000)
+    return result
+
+  def shutdown(self):
+    if self._executor is not None:
+      self._executor.shutdown(wait=True, cancel_futures=True)
+      self._executor = None
+
+  def stats(self) -> dict:
+    return {
+      "executor": self.kind,
+      "workers": self.workers,
+      "max_queue": self.max_queue,
+      "in_flight": self.in_flight,
+      "queued": max(0, self.in_flight - self.workers),
+      "completed": self.completed,
+      "rejected": self.rejected,
+      "queue_wait_ms_p50": round(percentile(self._queue_wait_ms, 0.50), 3),
+      "queue_wait_ms_p95": round(percentile(self._queue_wait_ms, 0.95), 3),
+      "latency_ms_p50": round(percentile(self._latency_ms, 0.50), 3),
+      "latency_ms_p95": round(percentile(self._latency_ms, 0.95), 3),
+    }
+
+
+hashing_pool = HashingPool(
+  kind=HASHING_EXECUTOR,
+  workers=HASHING_WORKERS,
+  max_queue=HASHING_MAX_QUEUE,
+)
+
+
+async def hash_password_async(password: str) -> str:
+  return await hashing_pool.run(_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+  return await hashing_pool.run(_verify, plain_password, hashed_password)
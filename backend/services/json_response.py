@@ -0,0 +1,54 @@
+import os
+from typing import Any, Dict
+import orjson
+from dotenv import load_dotenv
+from fastapi import Response
+from schemas.paginated_response import PaginatedResponse
+
+load_dotenv()
+
+# "pydantic" validates list rows into their response schema before dumping;
+# "orjson" dumps the already valid database rows directly
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "pydantic").lower()
+
+
+def dump_json(content: Any) -> bytes:
+  """orjson writes enums as their value and naive datetimes as ISO 8601, matching the schemas."""
+  return orjson.dumps(content)
+
+
+class FastJSONResponse(Response):
+  """JSON response rendered with orjson instead of the stdlib encoder.
+
+  The content must already be plain data (dicts, lists, scalars, enums,
+  datetimes); nothing is passed through jsonable_encoder.
+  """
+  media_type = "application/json"
+
+  def render(self, content: Any) -> bytes:
+    return dump_json(content)
+
+
+def _row_dict(row, schema, sparse: bool) -> dict:
+  if sparse:
+    return row._asdict()
+  # Columns straight off the entity; the database already enforces what the schema checks
+  return {name: getattr(row, name) for name in schema.model_fields}
+
+
+def serialize_page(page_data: dict, schema, sparse: bool = False) -> bytes:
+  """JSON for a list page.
+
+  By default full rows go through `schema` and sparse-fieldset rows (plain
+  Core rows) are dumped as mappings. With JSON_SERIALIZER=orjson neither is
+  validated: each row becomes a dict of its schema's fields and the page is
+  encoded by orjson in one call.
+  """
+  if JSON_SERIALIZER == "orjson":
+    envelope = {name: page_data.get(name, field.default) for name, field in PaginatedResponse.model_fields.items()}
+    envelope["data"] = [_row_dict(row, schema, sparse) for row in page_data["data"]]
+    return dump_json(envelope)
+  if sparse:
+    page_data = {**page_data, "data": [row._asdict() for row in page_data["data"]]}
+    return PaginatedResponse[Dict[str, Any]].model_validate(page_data).model_dump_json().encode()
+  return PaginatedResponse[schema].model_validate(page_data, from_attributes=True).model_dump_json().encode()
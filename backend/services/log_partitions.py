@@ -0,0 +1,264 @@
+import asyncio
+import datetime
+import os
+import re
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import engine
+from models.system_logs import System_Log
+
+load_dotenv()
+
+# Months of audit history to keep; older monthly partitions are removed whole. 0 (default) keeps everything.
+SYSTEM_LOG_RETENTION_MONTHS = int(os.getenv("SYSTEM_LOG_RETENTION_MONTHS", "0"))
+# "drop" deletes expired partitions; "detach" keeps them as standalone archive tables
+SYSTEM_LOG_RETENTION_ACTION = os.getenv("SYSTEM_LOG_RETENTION_ACTION", "drop").lower()
+# Monthly partitions kept created ahead of the current month
+SYSTEM_LOG_PARTITIONS_AHEAD = int(os.getenv("SYSTEM_LOG_PARTITIONS_AHEAD", "3"))
+SYSTEM_LOG_MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("SYSTEM_LOG_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+# Multi-worker deployments can leave this on in a single worker only
+SYSTEM_LOG_MAINTENANCE = os.getenv("SYSTEM_LOG_MAINTENANCE", "true").lower() in ("1", "true", "yes")
+# Rows per DELETE when the table is not partitioned (SQLite, or migrations not applied)
+SYSTEM_LOG_RETENTION_DELETE_CHUNK = int(os.getenv("SYSTEM_LOG_RETENTION_DELETE_CHUNK", "5000"))
+
+TABLE = System_Log.__tablename__
+# PostgreSQL partitions are tables of their own, MySQL partitions live inside the table
+PG_PARTITION_PREFIX = f"{TABLE}_p"
+MYSQL_PARTITION_PREFIX = "p"
+MYSQL_FUTURE_PARTITION = "p_future"
+
+
+def month_start(day: datetime.date) -> datetime.date:
+  return day.replace(day=1)
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+  index = day.year * 12 + day.month - 1 + months
+  return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def upcoming_months(today: datetime.date, ahead: int) -> list[datetime.date]:
+  """First days of the current month and the `ahead` months after it."""
+  first = month_start(today)
+  return [add_months(first, offset) for offset in range(ahead + 1)]
+
+
+def pg_partition_ddl(start: datetime.date) -> str:
+  return (
+    f"CREATE TABLE IF NOT EXISTS {PG_PARTITION_PREFIX}{start:%Y%m} PARTITION OF {TABLE} "
+    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+  )
+
+
+def mysql_partition_clause(start: datetime.date) -> str:
+  return f"PARTITION {MYSQL_PARTITION_PREFIX}{start:%Y%m} VALUES LESS THAN ('{add_months(start, 1).isoformat()}')"
+
+
+def _parse_bound(value: Optional[str]) -> Optional[datetime.datetime]:
+  """Upper bound from a PostgreSQL partition expression or MySQL PARTITION_DESCRIPTION."""
+  if not value:
+    return None
+  found = re.search(r"(\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}:\d{2})?)'\)?\s*$", value)
+  return datetime.datetime.fromisoformat(found.group(1)) if found else None
+
+
+async def list_partitions(conn: AsyncConnection) -> Optional[list[tuple[str, Optional[datetime.datetime]]]]:
+  """(partition, exclusive upper bound) pairs, None bound meaning unbounded.
+
+  Returns None when system_logs is not a partitioned table.
+  """
+  dialect = conn.dialect.name
+  if dialect == "postgresql":
+    result = await conn.execute(text(
+      "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+      "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+      "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+      "WHERE parent.relname = :table AND parent.relkind = 'p' AND pg_table_is_visible(parent.oid)"
+    ), {"table": TABLE})
+    rows = result.all()
+    if not rows:
+      return None
+    return [(name, _parse_bound(bound)) for name, bound in rows]
+
+  if dialect in ("mysql", "mariadb"):
+    result = await conn.execute(text(
+      "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+      "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+      "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": TABLE})
+    rows = result.all()
+    if not rows:
+      return None
+    return [(name, None if bound == "MAXVALUE" else _parse_bound(bound)) for name, bound in rows]
+
+  return None
+
+
+async def ensure_future_partitions(conn: AsyncConnection, today: datetime.date, ahead: int) -> list[str]:
+  """Create the monthly partitions up to `ahead` months out; returns the ones created."""
+  partitions = await list_partitions(conn)
+  if partitions is None:
+    return []
+  months = upcoming_months(today, ahead)
+  existing = {name for name, _ in partitions}
+
+  if conn.dialect.name == "postgresql":
+    created = []
+    for start in months:
+      if f"{PG_PARTITION_PREFIX}{start:%Y%m}" not in existing:
+        await conn.execute(text(pg_partition_ddl(start)))
+        created.append(f"{PG_PARTITION_PREFIX}{start:%Y%m}")
+    return created
+
+  # MySQL: new months are split off the MAXVALUE partition, which stays empty while we keep ahead
+  highest = max((bound for _, bound in partitions if bound is not None), default=None)
+  missing = [
+    start for start in months
+    if f"{MYSQL_PARTITION_PREFIX}{start:%Y%m}" not in existing
+    and (highest is None or datetime.datetime.combine(start, datetime.time()) >= highest)
+  ]
+  if not missing:
+    return []
+  clauses = ", ".join(mysql_partition_clause(start) for start in missing)
+  await conn.execute(text(
+    f"ALTER TABLE {TABLE} REORGANIZE PARTITION {MYSQL_FUTURE_PARTITION} INTO "
+    f"({clauses}, PARTITION {MYSQL_FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+  ))
+  return [f"{MYSQL_PARTITION_PREFIX}{start:%Y%m}" for start in missing]
+
+
+async def remove_expired_partitions(
+  conn: AsyncConnection,
+  today: datetime.date,
+  retention_months: int,
+  action: str,
+) -> list[str]:
+  """Drop (or detach into archive tables) every partition wholly older than the retention window."""
+  if retention_months <= 0:
+    return []
+  partitions = await list_partitions(conn)
+  if partitions is None:
+    return []
+  cutoff = datetime.datetime.combine(add_months(month_start(today), -retention_months), datetime.time())
+  expired = [name for name, bound in partitions if bound is not None and bound <= cutoff]
+
+  for name in expired:
+    if conn.dialect.name == "postgresql":
+      await conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+      if action != "detach":
+        await conn.execute(text(f"DROP TABLE {name}"))
+    else:
+      if action == "detach":
+        # Swap the partition's rows into an empty archive table, then drop the (now empty) partition
+        archive = f"{TABLE}_archive_{name}"
+        await conn.execute(text(f"CREATE TABLE {archive} LIKE {TABLE}"))
+        await conn.execute(text(f"ALTER TABLE {archive} REMOVE PARTITIONING"))
+        await conn.execute(text(f"ALTER TABLE {TABLE} EXCHANGE PARTITION {name} WITH TABLE {archive}"))
+      await conn.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {name}"))
+  return expired
+
+
+async def delete_expired_rows(conn: AsyncConnection, today: datetime.date, retention_months: int) -> int:
+  """Retention for an unpartitioned table: chunked DELETEs by primary key."""
+  if retention_months <= 0:
+    return 0
+  cutoff = datetime.datetime.combine(add_months(month_start(today), -retention_months), datetime.time())
+  deleted = 0
+  while True:
+    result = await conn.execute(
+      select(System_Log.id).where(System_Log.timestamp < cutoff).order_by(System_Log.id).limit(SYSTEM_LOG_RETENTION_DELETE_CHUNK)
+    )
+    ids = result.scalars().all()
+    if not ids:
+      return deleted
+    await conn.execute(delete(System_Log).where(System_Log.id.in_(ids)))
+    await conn.commit()
+    deleted += len(ids)
+
+
+class LogPartitionMaintenance:
+  """Keeps monthly system_logs partitions created ahead of time and expires old ones."""
+
+  def __init__(self, interval: float, ahead: int, retention_months: int, action: str):
+    self.interval = interval
+    self.ahead = ahead
+    self.retention_months = retention_months
+    self.action = action
+    self._task: asyncio.Task | None = None
+    self.partitioned: Optional[bool] = None
+    self.partitions = 0
+    self.created = 0
+    self.removed = 0
+    self.rows_deleted = 0
+    self.failures = 0
+    self.ran_at: datetime.datetime | None = None
+    # Why the latest run failed, cleared by the next successful one; surfaced in stats()
+    self.last_error: Optional[str] = None
+    self.failed_at: datetime.datetime | None = None
+
+  async def run_once(self):
+    # UTC, like the timestamps being partitioned (see database.py)
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    async with engine.connect() as conn:
+      partitions = await list_partitions(conn)
+      self.partitioned = partitions is not None
+      if self.partitioned:
+        self.created += len(await ensure_future_partitions(conn, today, self.ahead))
+        self.removed += len(await remove_expired_partitions(conn, today, self.retention_months, self.action))
+        self.partitions = len(await list_partitions(conn) or [])
+      else:
+        self.rows_deleted += await delete_expired_rows(conn, today, self.retention_months)
+      await conn.commit()
+    self.ran_at = datetime.datetime.now(datetime.timezone.utc)
+    self.last_error = None
+
+  async def _run(self):
+    while True:
+      try:
+        await self.run_once()
+      except Exception as e:
+        self.failures += 1
+        self.last_error = f"{type(e).__name__}: {e}"
+        self.failed_at = datetime.datetime.now(datetime.timezone.utc)
+        print(f"System log partition maintenance failed: {self.last_error}")
+      await asyncio.sleep(self.interval)
+
+  def start(self):
+    if self._task is None:
+      self._task = asyncio.create_task(self._run())
+
+  async def stop(self):
+    if self._task is not None:
+      self._task.cancel()
+      try:
+        await self._task
+      except asyncio.CancelledError:
+        pass
+      self._task = None
+
+  def stats(self) -> dict:
+    return {
+      "enabled": SYSTEM_LOG_MAINTENANCE,
+      "partitioned": self.partitioned,
+      "partitions": self.partitions,
+      "retention_months": self.retention_months,
+      "retention_action": self.action,
+      "partitions_ahead": self.ahead,
+      "created": self.created,
+      "removed": self.removed,
+      "rows_deleted": self.rows_deleted,
+      "failures": self.failures,
+      "ran_at": self.ran_at.isoformat() if self.ran_at else None,
+      "last_error": self.last_error,
+      "failed_at": self.failed_at.isoformat() if self.failed_at else None,
+    }
+
+
+log_partition_maintenance = LogPartitionMaintenance(
+  interval=SYSTEM_LOG_MAINTENANCE_INTERVAL_SECONDS,
+  ahead=SYSTEM_LOG_PARTITIONS_AHEAD,
+  retention_months=SYSTEM_LOG_RETENTION_MONTHS,
+  action=SYSTEM_LOG_RETENTION_ACTION,
+)
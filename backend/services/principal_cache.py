@@ -0,0 +1,38 @@
+import os
+from dotenv import load_dotenv
+from services.ttl_cache import TTLCache
+
+load_dotenv()
+
+# Invalidation below only reaches this process. On other workers a deactivated or demoted
+# user stays authorized until their entry expires: up to this long, or only until the next
+# token version refresh (TOKEN_VERSION_REFRESH_SECONDS) when STATELESS_AUTH keeps that table
+# loaded, since get_current_user checks cache hits against it. Lower it to narrow the window.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "1024"))
+
+# Authenticated users keyed by the JWT subject (email). Every cache hit is one
+# SELECT on the users table that get_current_user did not have to run.
+principal_cache = TTLCache(
+  max_size=PRINCIPAL_CACHE_MAX_SIZE,
+  ttl=PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(*subjects: str | None):
+  for subject in subjects:
+    if subject:
+      principal_cache.pop(subject)
+
+
+def invalidate_principal_id(user_id: int):
+  """Drop a user's entry when only the id is known (e.g. after an UPDATE ... RETURNING)."""
+  for subject, user in principal_cache.items():
+    if user.id == user_id:
+      principal_cache.pop(subject)
+
+
+def principal_cache_stats() -> dict:
+  stats = principal_cache.stats()
+  stats["db_round_trips_saved"] = principal_cache.hits
+  return stats
@@ -0,0 +1,115 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+from dotenv import load_dotenv
+from fastapi import Response
+from services.etags import ETAG_CACHE_CONTROL
+from services.single_flight import SingleFlight
+
+load_dotenv()
+
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Pages bigger than this are served but never cached, so one huge page cannot flush the rest
+RESULT_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+# Entries are also checked against the table's change marker, so this only bounds memory use
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "60"))
+
+
+class ResultCache:
+  """Serialized list pages, keyed by table and normalized query.
+
+  Each entry remembers the table's change marker (read from the database, so
+  shared by all workers) it was read under, and is dropped on the first lookup
+  after the marker moves on. The marker must move when a write commits, not
+  when it runs (see crud.cars.read_car_list_state): one that can miss a late
+  commit would keep serving the old page until the next write. Bounded by total
+  payload bytes, evicting least recently used pages first.
+  """
+
+  def __init__(
+    self,
+    max_bytes: int = RESULT_CACHE_MAX_BYTES,
+    max_entry_bytes: int = RESULT_CACHE_MAX_ENTRY_BYTES,
+    ttl: float = RESULT_CACHE_TTL_SECONDS,
+  ):
+    self.max_bytes = max_bytes
+    self.max_entry_bytes = max_entry_bytes
+    self.ttl = ttl
+    # (table, key) -> (state, expires_at, payload)
+    self._entries: "OrderedDict[tuple[str, Hashable], tuple[Hashable, float, bytes]]" = OrderedDict()
+    self.bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.stale = 0
+    self.evictions = 0
+    self.oversize = 0
+
+  def get(self, table: str, key: Hashable, state: Hashable) -> Optional[bytes]:
+    entry = self._entries.get((table, key))
+    if entry is None:
+      self.misses += 1
+      return None
+
+    entry_state, expires_at, payload = entry
+    if entry_state != state or expires_at <= time.monotonic():
+      self._remove((table, key))
+      self.stale += 1
+      self.misses += 1
+      return None
+
+    self._entries.move_to_end((table, key))
+    self.hits += 1
+    return payload
+
+  def set(self, table: str, key: Hashable, state: Hashable, payload: bytes):
+    """Store a page read under `state`, which must be taken before the read started."""
+    if len(payload) > self.max_entry_bytes or self.max_bytes <= 0:
+      self.oversize += 1
+      return
+    self._remove((table, key))
+    self._entries[(table, key)] = (state, time.monotonic() + self.ttl, payload)
+    self.bytes += len(payload)
+    while self.bytes > self.max_bytes:
+      _, (_, _, evicted) = self._entries.popitem(last=False)
+      self.bytes -= len(evicted)
+      self.evictions += 1
+
+  def _remove(self, entry_key: tuple[str, Hashable]):
+    entry = self._entries.pop(entry_key, None)
+    if entry is not None:
+      self.bytes -= len(entry[2])
+
+  def clear(self):
+    self._entries.clear()
+    self.bytes = 0
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      "entries": len(self._entries),
+      "bytes": self.bytes,
+      "max_bytes": self.max_bytes,
+      "max_entry_bytes": self.max_entry_bytes,
+      "ttl_seconds": self.ttl,
+      "hits": self.hits,
+      "misses": self.misses,
+      "stale": self.stale,
+      "evictions": self.evictions,
+      "oversize": self.oversize,
+      "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+result_cache = ResultCache()
+# Concurrent misses for the same page (same table, key and state) build it once
+list_page_flight = SingleFlight("list_pages")
+
+
+def json_page_response(payload: bytes, etag: str) -> Response:
+  """Send an already serialized page as-is, skipping response_model validation."""
+  return Response(
+    content=payload,
+    media_type="application/json",
+    headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL},
+  )
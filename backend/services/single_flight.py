@@ -0,0 +1,85 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Hashable
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# name -> SingleFlight, for /api/metrics
+_flights: dict[str, "SingleFlight"] = {}
+
+
+class _LeaderCancelled(Exception):
+  """The call everyone was waiting on was cancelled with its request; waiters run their own."""
+
+
+def _consume(future: asyncio.Future):
+  # Marks the exception retrieved when nobody was waiting on it
+  if not future.cancelled():
+    future.exception()
+
+
+class SingleFlight:
+  """Coalesces concurrent calls with the same key into one execution.
+
+  The first caller (the leader) runs the call, on its own session; callers that
+  arrive while it is in flight await the same result or exception instead of
+  querying. Keys must capture everything the result depends on, including a
+  write generation, so a call made after a write never joins a flight started
+  before it. Results are shared, so they must be treated as read-only.
+  """
+
+  def __init__(self, name: str):
+    self.name = name
+    self._calls: dict[Hashable, asyncio.Future] = {}
+    self.executions = 0
+    self.coalesced = 0
+    _flights[name] = self
+
+  async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+    if not SINGLE_FLIGHT_ENABLED:
+      return await call()
+
+    future = self._calls.get(key)
+    if future is not None:
+      self.coalesced += 1
+      try:
+        # Shielded so a waiter's own cancellation does not cancel the shared call
+        return await asyncio.shield(future)
+      except _LeaderCancelled:
+        self.coalesced -= 1
+        return await self.do(key, call)
+
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(_consume)
+    self._calls[key] = future
+    self.executions += 1
+    try:
+      result = await call()
+    except asyncio.CancelledError:
+      future.set_exception(_LeaderCancelled())
+      raise
+    except BaseException as e:
+      future.set_exception(e)
+      raise
+    else:
+      future.set_result(result)
+      return result
+    finally:
+      if self._calls.get(key) is future:
+        del self._calls[key]
+
+  def stats(self) -> dict:
+    calls = self.executions + self.coalesced
+    return {
+      "in_flight": len(self._calls),
+      "executions": self.executions,
+      "coalesced": self.coalesced,
+      "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+    }
+
+
+def single_flight_stats() -> dict:
+  return {name: flight.stats() for name, flight in _flights.items()}
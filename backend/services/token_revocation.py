@@ -0,0 +1,97 @@
+import asyncio
+import datetime
+import os
+from dotenv import load_dotenv
+from sqlalchemy import select
+from database import async_session
+from models.users import AccountStatus, User
+
+load_dotenv()
+
+# Opt-in: authorize from JWT claims alone instead of loading the user on every request
+STATELESS_AUTH = os.getenv("STATELESS_AUTH", "false").lower() in ("1", "true", "yes")
+TOKEN_VERSION_REFRESH_SECONDS = float(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "30"))
+
+
+class TokenVersionTable:
+  """In-memory copy of every user's token version and status.
+
+  A token is revoked once its `ver` claim is older than the version recorded here.
+  Local writes are applied immediately; other workers pick them up on the next refresh.
+  """
+
+  def __init__(self, refresh_interval: float):
+    self.refresh_interval = refresh_interval
+    self._entries: dict[int, tuple[int, AccountStatus]] = {}
+    self._task: asyncio.Task | None = None
+    self.refreshed_at: datetime.datetime | None = None
+    self.refresh_failures = 0
+    self.rejected = 0
+
+  def current(self, user_id: int) -> tuple[int, AccountStatus] | None:
+    return self._entries.get(user_id)
+
+  def is_revoked(self, user_id: int, version: int) -> bool:
+    entry = self._entries.get(user_id)
+    if entry is not None and version < entry[0]:
+      self.rejected += 1
+      return True
+    return False
+
+  def is_stale(self, user_id: int, version: int, status: AccountStatus) -> bool:
+    """Whether a cached user row is behind this table (its version or status changed since)."""
+    entry = self._entries.get(user_id)
+    return entry is not None and (version < entry[0] or status != entry[1])
+
+  def record(self, user_id: int, version: int, status: AccountStatus):
+    entry = self._entries.get(user_id)
+    if entry is None or version >= entry[0]:
+      self._entries[user_id] = (version, status)
+
+  async def refresh(self):
+    async with async_session() as db:
+      result = await db.execute(select(User.id, User.token_version, User.status))
+      rows = result.all()
+
+    entries = {row.id: (row.token_version, row.status) for row in rows}
+    # Never roll back a bump made locally after this snapshot was read
+    for user_id, entry in self._entries.items():
+      if user_id in entries and entry[0] > entries[user_id][0]:
+        entries[user_id] = entry
+    self._entries = entries
+    self.refreshed_at = datetime.datetime.now(datetime.timezone.utc)
+
+  async def _run(self):
+    while True:
+      await asyncio.sleep(self.refresh_interval)
+      try:
+        await self.refresh()
+      except Exception as e:
+        self.refresh_failures += 1
+        print(f"Token version refresh failed: {e}")
+
+  def start(self):
+    if self._task is None:
+      self._task = asyncio.create_task(self._run())
+
+  async def stop(self):
+    if self._task is not None:
+      self._task.cancel()
+      try:
+        await self._task
+      except asyncio.CancelledError:
+        pass
+      self._task = None
+
+  def stats(self) -> dict:
+    return {
+      "enabled": STATELESS_AUTH,
+      "users": len(self._entries),
+      "refresh_interval_seconds": self.refresh_interval,
+      "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+      "refresh_failures": self.refresh_failures,
+      "rejected_tokens": self.rejected,
+    }
+
+
+token_versions = TokenVersionTable(refresh_interval=TOKEN_VERSION_REFRESH_SECONDS)
@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Returned by TTLCache.get on a miss so a cached None can be told apart from "not cached"
+MISSING = object()
+
+
+class TTLCache:
+  """Size-bounded LRU cache whose entries expire after `ttl` seconds."""
+
+  def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+    self.max_size = max_size
+    self.ttl = ttl
+    self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, key: Hashable, default: Any = MISSING) -> Any:
+    entry = self._entries.get(key)
+    if entry is None:
+      self.misses += 1
+      return default
+
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+      del self._entries[key]
+      self.misses += 1
+      return default
+
+    self._entries.move_to_end(key)
+    self.hits += 1
+    return value
+
+  def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+    if self.max_size <= 0:
+      return
+    expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+    self._entries[key] = (expires_at, value)
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.max_size:
+      self._entries.popitem(last=False)
+      self.evictions += 1
+
+  def pop(self, key: Hashable, default: Any = None) -> Any:
+    entry = self._entries.pop(key, None)
+    return default if entry is None else entry[1]
+
+  def clear(self):
+    self._entries.clear()
+
+  def keys(self):
+    return list(self._entries.keys())
+
+  def items(self):
+    """Snapshot of (key, value) pairs, including expired ones; does not touch hit counters."""
+    return [(key, entry[1]) for key, entry in self._entries.items()]
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      "size": len(self._entries),
+      "max_size": self.max_size,
+      "ttl_seconds": self.ttl,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,51 @@
+from conftest import ADMIN_EMAIL, BASE_URL
+import httpx
+
+
+def refresh_cookie(client: httpx.AsyncClient) -> str:
+  return client.cookies.get("refresh_token", path="/auth")
+
+
+async def test_refresh_rotates_the_refresh_token(client):
+  first = refresh_cookie(client)
+
+  response = await client.post("/auth/refresh")
+  assert response.status_code == 200, response.text
+  second = refresh_cookie(client)
+  assert second and second != first
+
+  response = await client.get("/auth/me")
+  assert response.status_code == 200
+  assert response.json()["email"] == ADMIN_EMAIL
+
+
+async def test_reused_refresh_token_revokes_its_family(client, started_app):
+  stolen = refresh_cookie(client)
+  response = await client.post("/auth/refresh")
+  assert response.status_code == 200, response.text
+  current = refresh_cookie(client)
+
+  # Replaying the rotated token is treated as theft...
+  async with httpx.AsyncClient(transport=httpx.ASGITransport(app=started_app), base_url=BASE_URL) as attacker:
+    response = await attacker.post("/auth/refresh", headers={"Cookie": f"refresh_token={stolen}"})
+  assert response.status_code == 401
+  assert response.json()["detail"] == "Refresh token reuse detected"
+
+  # ...so the legitimate holder's newer token stops working as well
+  response = await client.post("/auth/refresh")
+  assert response.status_code == 401
+  assert refresh_cookie(client) == current
+
+
+async def test_refresh_without_a_token_is_unauthorized(anonymous_client):
+  response = await anonymous_client.post("/auth/refresh")
+  assert response.status_code == 401
+
+
+async def test_logout_revokes_the_refresh_token(client):
+  token = refresh_cookie(client)
+  response = await client.post("/auth/logout")
+  assert response.status_code == 200
+
+  response = await client.post("/auth/refresh", headers={"Cookie": f"refresh_token={token}"})
+  assert response.status_code == 401
@@ -0,0 +1,79 @@
+import uuid
+from conftest import create_car
+
+
+async def create_cars(client, count: int) -> tuple[str, list[dict]]:
+  make = f"BULK{uuid.uuid4().hex[:8].upper()}"
+  cars = [await create_car(client, make=make) for _ in range(count)]
+  return make, cars
+
+
+async def test_bulk_update_by_filter_runs_in_chunks(client):
+  make, cars = await create_cars(client, 5)
+  etags = [(await client.get(f"/api/cars/{car['id']}")).headers["ETag"] for car in cars]
+
+  response = await client.patch(
+    "/api/cars/bulk",
+    params={"chunk_size": 2},
+    json={"filter": {"make": make}, "status": "SOLD", "price_change_percent": 10},
+  )
+  assert response.status_code == 200, response.text
+  assert response.json()["affected"] == 5
+  assert response.json()["chunks"] == 3
+
+  for car, etag in zip(cars, etags):
+    # Each row's version moves, so outstanding ETags stop matching
+    response = await client.get(f"/api/cars/{car['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "SOLD"
+    assert response.json()["price"] == 550000
+
+
+async def test_bulk_update_by_ids_leaves_other_cars_alone(client):
+  make, cars = await create_cars(client, 3)
+  chosen = [cars[0]["id"], cars[2]["id"]]
+
+  response = await client.patch("/api/cars/bulk", json={"ids": chosen, "price": 123})
+  assert response.status_code == 200, response.text
+  assert response.json()["affected"] == 2
+
+  prices = {car["id"]: (await client.get(f"/api/cars/{car['id']}")).json()["price"] for car in cars}
+  assert prices == {cars[0]["id"]: 123, cars[1]["id"]: 500000, cars[2]["id"]: 123}
+
+
+async def test_bulk_update_rejects_invalid_requests(client):
+  # Neither ids nor filter
+  response = await client.patch("/api/cars/bulk", json={"status": "SOLD"})
+  assert response.status_code == 422
+  # An empty filter would select every car
+  response = await client.patch("/api/cars/bulk", json={"filter": {}, "status": "SOLD"})
+  assert response.status_code == 422
+  response = await client.patch("/api/cars/bulk", json={"ids": [1], "price": 1, "price_change_percent": 5})
+  assert response.status_code == 422
+  response = await client.patch("/api/cars/bulk", json={"ids": [1]})
+  assert response.status_code == 422
+  response = await client.patch("/api/cars/bulk", params={"chunk_size": 0}, json={"ids": [1], "price": 1})
+  assert response.status_code == 422
+
+
+async def test_bulk_delete_by_filter_and_ids(client):
+  make, cars = await create_cars(client, 4)
+
+  response = await client.request("DELETE", "/api/cars/bulk", json={"ids": [cars[0]["id"]]})
+  assert response.status_code == 200, response.text
+  assert response.json()["affected"] == 1
+
+  response = await client.request(
+    "DELETE", "/api/cars/bulk", params={"chunk_size": 2}, json={"filter": {"make": make}},
+  )
+  assert response.status_code == 200, response.text
+  assert response.json()["affected"] == 3
+  assert response.json()["chunks"] == 2
+
+  for car in cars:
+    assert (await client.get(f"/api/cars/{car['id']}")).status_code == 404
+
+
+async def test_bulk_endpoints_require_login(anonymous_client):
+  response = await anonymous_client.patch("/api/cars/bulk", json={"ids": [1], "price": 1})
+  assert response.status_code == 401
@@ -0,0 +1,87 @@
+import json
+import pytest
+from sqlalchemy import false
+import crud.car_import
+from conftest import CSV_HEADER, car_csv_row, car_payload, create_car, unique_vin
+
+
+async def import_csv(client, lines: list[str], **params):
+  body = "\n".join(lines) + "\n"
+  return await client.post("/api/cars/import", params=params, content=body, headers={"Content-Type": "text/csv"})
+
+
+async def test_csv_import_reports_rejected_rows_by_line(client):
+  existing = await create_car(client)
+  good = [unique_vin("IMP") for _ in range(3)]
+
+  response = await import_csv(client, [
+    CSV_HEADER,
+    car_csv_row(good[0]),
+    car_csv_row(good[1]),
+    "TOOFEW,2020",
+    car_csv_row(unique_vin("IMP"), year="nineteen"),
+    car_csv_row(good[0]),
+    car_csv_row(existing["vin"]),
+    "",
+    car_csv_row(good[2]),
+  ], batch_size=2)
+  assert response.status_code == 200, response.text
+  result = response.json()
+
+  assert (result["received"], result["inserted"], result["rejected"]) == (7, 3, 4)
+  errors = {error["line"]: error for error in result["errors"]}
+  assert sorted(errors) == [4, 5, 6, 7]
+  assert errors[4]["vin"] is None
+  assert errors[4]["error"] == "Expected 10 columns, got 2"
+  assert errors[5]["error"].startswith("year:")
+  assert errors[6] == {"line": 6, "vin": good[0], "error": "Duplicate VIN in this import"}
+  assert errors[7] == {"line": 7, "vin": existing["vin"], "error": "VIN already exists"}
+
+  for vin in good:
+    response = await client.get("/api/cars", params={"search": vin})
+    assert [car["vin"] for car in response.json()["data"]] == [vin]
+
+
+async def test_ndjson_import(client):
+  vin = unique_vin("NDJ")
+  body = "\n".join([json.dumps(car_payload(vin)), "not json", "[1, 2]"])
+  response = await client.post("/api/cars/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+  assert response.status_code == 200, response.text
+  result = response.json()
+  assert (result["received"], result["inserted"], result["rejected"]) == (3, 1, 2)
+  assert [error["line"] for error in result["errors"]] == [2, 3]
+  assert result["errors"][1]["error"] == "Each line must be a JSON object"
+
+
+async def test_import_caps_the_error_report_but_counts_every_rejection(client, monkeypatch):
+  monkeypatch.setattr(crud.car_import, "CAR_IMPORT_MAX_REPORTED_ERRORS", 2)
+  response = await import_csv(client, [CSV_HEADER, "a", "b", "c", car_csv_row(unique_vin("CAP"))])
+  assert response.status_code == 200, response.text
+  result = response.json()
+  assert result["rejected"] == 3
+  assert result["inserted"] == 1
+  assert [error["line"] for error in result["errors"]] == [2, 3]
+
+
+async def test_import_rejects_a_vin_inserted_after_the_duplicate_check(client, monkeypatch):
+  existing = await create_car(client)
+  fresh = unique_vin("RACE")
+
+  # The existence check sees nothing, as if the other writer committed right after it ran
+  real_select = crud.car_import.select
+  monkeypatch.setattr(crud.car_import, "select", lambda *columns: real_select(*columns).where(false()))
+
+  response = await import_csv(client, [CSV_HEADER, car_csv_row(fresh), car_csv_row(existing["vin"])])
+  assert response.status_code == 200, response.text
+  result = response.json()
+  assert (result["inserted"], result["rejected"]) == (1, 1)
+  assert result["errors"] == [{"line": 3, "vin": existing["vin"], "error": "VIN already exists"}]
+
+  response = await client.get("/api/cars", params={"search": fresh})
+  assert [car["vin"] for car in response.json()["data"]] == [fresh]
+
+
+@pytest.mark.parametrize("batch_size", [0, 10001])
+async def test_import_batch_size_is_bounded(client, batch_size):
+  response = await import_csv(client, [CSV_HEADER], batch_size=batch_size)
+  assert response.status_code == 422
@@ -0,0 +1,113 @@
+import uuid
+from conftest import car_payload, create_car
+
+
+async def test_car_if_none_match_returns_304_until_the_car_changes(client):
+  car = await create_car(client)
+  url = f"/api/cars/{car['id']}"
+
+  response = await client.get(url)
+  assert response.status_code == 200
+  etag = response.headers["ETag"]
+  assert etag == f'"{car["id"]}.0"'
+
+  response = await client.get(url, headers={"If-None-Match": etag})
+  assert response.status_code == 304
+  assert response.headers["ETag"] == etag
+
+  response = await client.put(url, json={"color": "RED"}, headers={"If-Match": etag})
+  assert response.status_code == 200, response.text
+
+  response = await client.get(url, headers={"If-None-Match": etag})
+  assert response.status_code == 200
+  assert response.json()["color"] == "RED"
+  assert response.headers["ETag"] != etag
+
+
+async def test_car_if_match_with_a_stale_tag_fails_with_412(client):
+  car = await create_car(client)
+  url = f"/api/cars/{car['id']}"
+  stale = (await client.get(url)).headers["ETag"]
+
+  response = await client.put(url, json={"price": 1}, headers={"If-Match": stale})
+  assert response.status_code == 200, response.text
+
+  response = await client.put(url, json={"price": 2}, headers={"If-Match": stale})
+  assert response.status_code == 412
+  response = await client.delete(url, headers={"If-Match": stale})
+  assert response.status_code == 412
+  # A tag for another car never matches
+  response = await client.delete(url, headers={"If-Match": f'"{car["id"] + 1000}.1"'})
+  assert response.status_code == 412
+
+  current = (await client.get(url)).headers["ETag"]
+  response = await client.delete(url, headers={"If-Match": current})
+  assert response.status_code == 200, response.text
+  assert (await client.get(url)).status_code == 404
+
+
+async def test_car_if_none_match_for_a_missing_car_is_404(client):
+  response = await client.get("/api/cars/999999", headers={"If-None-Match": '"999999.0"'})
+  assert response.status_code == 404
+
+
+async def test_car_list_etag_changes_with_a_write(client):
+  response = await client.get("/api/cars")
+  assert response.status_code == 200
+  etag = response.headers["ETag"]
+
+  response = await client.get("/api/cars", headers={"If-None-Match": etag})
+  assert response.status_code == 304
+
+  await create_car(client)
+  response = await client.get("/api/cars", headers={"If-None-Match": etag})
+  assert response.status_code == 200
+  assert response.headers["ETag"] != etag
+
+
+def user_payload(email: str, **overrides) -> dict:
+  payload = {
+    "email": email,
+    "password": "secret-password",
+    "firstname": "Test",
+    "lastname": "User",
+    "contact_num": "09170000000",
+    "type": "MANAGER",
+    "status": "ACTIVE",
+  }
+  payload.update(overrides)
+  return payload
+
+
+async def create_user(client) -> dict:
+  email = f"user-{uuid.uuid4().hex[:8]}@example.com"
+  response = await client.post("/api/users", json=user_payload(email))
+  assert response.status_code == 200, response.text
+  response = await client.get("/api/users", params={"page_size": 100})
+  assert response.status_code == 200, response.text
+  [user] = [user for user in response.json()["data"] if user["email"] == email]
+  return user
+
+
+async def test_user_conditional_get_and_update(client):
+  user = await create_user(client)
+  url = f"/api/users/{user['id']}"
+
+  response = await client.get(url)
+  assert response.status_code == 200
+  etag = response.headers["ETag"]
+
+  response = await client.get(url, headers={"If-None-Match": etag})
+  assert response.status_code == 304
+
+  edit = user_payload(user["email"], lastname="Changed")
+  response = await client.put(url, json=edit, headers={"If-Match": etag})
+  assert response.status_code == 200, response.text
+
+  response = await client.put(url, json=edit, headers={"If-Match": etag})
+  assert response.status_code == 412
+
+  response = await client.get(url, headers={"If-None-Match": etag})
+  assert response.status_code == 200
+  assert response.json()["lastname"] == "CHANGED"
+  assert response.headers["ETag"] != etag
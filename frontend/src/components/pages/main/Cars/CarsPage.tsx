@@ -1,4 +1,4 @@
-import type { Car } from "@/lib/types";
+import type { Car, PaginatedResponse } from "@/lib/types";
 import { useEffect, useState } from "react";
 import axios from "axios";
 
@@ -19,14 +19,14 @@ const CarsPage = () => {
 
   const fetchCars = () => {
     axios
-      .get("/api/cars", {
+      .get<PaginatedResponse<Car>>("/api/cars", {
         headers: {
           "Content-Type": "application/json",
         },
         withCredentials: true,
       })
       .then((res) => {
-        setCars(res.data);
+        setCars(res.data.data);
       })
       .catch((error: any) => {
         console.error("Error fetching cars:", error);
@@ -1,43 +1,61 @@
 import { useEffect, useState } from "react";
 import axios from "axios";
-import type { SystemLog } from "@/lib/types";
+import type { PaginatedResponse, SystemLog } from "@/lib/types";
+import { Button } from "@/components/ui/button";
 import { DataTable } from "./data-table";
 import { columns } from "./columns";
 
+const PAGE_SIZE = 50;
+
 const SystemLogsPage = () => {
   const [logs, setLogs] = useState<SystemLog[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  const fetchLogs = () => {
+  // Keyset pages (cursor=) are neither counted nor offset, so older pages cost the same as the first
+  const fetchLogs = (cursor: string = "") => {
     axios
-      .get('/api/system_logs?page=0&page_size=50', {
+      .get<PaginatedResponse<SystemLog>>("/api/system_logs", {
+        params: { cursor, page_size: PAGE_SIZE },
         headers: {
           'Content-Type': 'application/json',
         },
         withCredentials: true
       })
       .then((res) => {
-        setLogs(res.data)
+        setLogs((current) => cursor ? [...current, ...res.data.data] : res.data.data)
+        setNextCursor(res.data.next_cursor ?? null)
       })
       .catch((error: any) => {
         console.error("Error fetching system logs:", error);
       });
-      
+
   }
 
   useEffect(() => {
     document.title = "System Logs";
     fetchLogs();
+
+    // Reload the newest page when new logs are committed instead of polling
+    const reload = () => fetchLogs();
+    const events = new EventSource("/api/events?topics=logs", { withCredentials: true });
+    events.addEventListener("logs", reload);
+    events.addEventListener("evicted", reload);
+    return () => events.close();
   }, []);
 
   return (
     <div className="flex flex-col items-center space-y-8 min-h-screen mt-25">
-      <h1 className="text-3xl font-bold">System Logs (Last 50 logs)</h1>
+      <h1 className="text-3xl font-bold">System Logs</h1>
       <div>
         <DataTable columns={columns} data={logs} />
       </div>
+      {nextCursor && (
+        <Button variant="outline" onClick={() => fetchLogs(nextCursor)}>
+          Load older logs
+        </Button>
+      )}
     </div>
   );
 };
 
 export default SystemLogsPage;
-
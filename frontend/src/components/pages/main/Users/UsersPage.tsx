@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import axios from "axios";
-import type { User } from "@/lib/types";
+import type { PaginatedResponse, User } from "@/lib/types";
 import { DataTable } from "./data-table";
 import { columns } from "./columns";
 import UserForm from "@/components/UserForm";
@@ -10,14 +10,14 @@ const UsersPage = () => {
 
   const fetchUsers = () => {
     axios
-      .get("/api/users", {
+      .get<PaginatedResponse<User>>("/api/users", {
         headers: {
           "Content-Type": "application/json",
         },
         withCredentials: true,
       })
       .then((res) => {
-        setUsers(res.data);
+        setUsers(res.data.data);
       })
       .catch((error: any) => {
         console.error("Error fetching users", error);
@@ -4,6 +4,12 @@ export interface SystemLog {
   action: string;
   timestamp: Date;
   updated_at: Date;   
+  verb: string | null;
+  entity_type: string | null;
+  entity_id: number | null;
+  entity_key: string | null;
+  entity_ids: string | null;
+  entity_keys: string | null;
 } 
 
 export interface Car {
@@ -69,3 +75,10 @@ export enum AccountStatus {
   ACTIVE = "ACTIVE",
   INACTIVE = "INACTIVE"
 }
+
+export interface PaginatedResponse<T> {
+  data: T[];
+  total: number | null;
+  total_is_estimate: boolean;
+  next_cursor?: string | null;
+}
@@ -19,6 +19,34 @@ import UsersPage from "./components/pages/main/Users/UsersPage";
 import CarsPage from "./components/pages/main/Cars/CarsPage";
 import Unauthorized from "./components/pages/main/Unauthorized";
 import ProfilePage from "./components/pages/main/ProfilePage";
+import axios, { AxiosError, InternalAxiosRequestConfig } from "axios";
+
+// Trade the refresh cookie for a new access token once, then replay the request
+let refreshing: Promise<unknown> | null = null;
+axios.interceptors.response.use(undefined, async (error: AxiosError) => {
+  const request = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+  if (
+    error.response?.status !== 401 ||
+    !request ||
+    request._retried ||
+    // /auth/me must refresh like any other call; only the token endpoints themselves are excluded
+    ["/auth/refresh", "/auth/login", "/auth/logout"].some((url) => request.url?.startsWith(url))
+  ) {
+    return Promise.reject(error);
+  }
+  request._retried = true;
+  refreshing ??= axios
+    .post("/auth/refresh", null, { withCredentials: true })
+    .finally(() => {
+      refreshing = null;
+    });
+  try {
+    await refreshing;
+  } catch {
+    return Promise.reject(error);
+  }
+  return axios(request);
+});
 
 const router = createBrowserRouter(
   createRoutesFromElements(